@@ -0,0 +1,288 @@
+# agent_runner.py
+# PRAQTOR X regression runner: every agent and test suite from one warm process
+# Repository: github.com/AiStyl/praqtorx-test-agents
+
+"""
+Runs a chosen set of agents and their test suites without paying a cold
+interpreter, imports and client setup per agent:
+
+1. Warm-up: each agent module is imported once and its LLM client is built
+   on pooled keep-alive httpx clients (sync and async) shared by every
+   agent that talks to the same base URL.
+2. Workers are then forked from the warm process, so they start with every
+   module imported and every client built.
+3. Suites (`test_*` functions, or the agent's EXAMPLE_INPUT) run in parallel
+   across the workers and their results are aggregated into one report.
+
+Connections are never opened before the fork; each worker grows its own
+pool and reuses it across all the suites it runs.
+
+Usage:
+    python agent_runner.py                               # full matrix
+    python agent_runner.py customer_support prompt_security --workers 4
+    python agent_runner.py --suite injection --json
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+LANGCHAIN_AGENTS_DIR = os.path.join(REPO_ROOT, "langchain_agents")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Runner name -> module name
+AGENTS = {
+    "customer_support": "customer_support_agent",
+    "prompt_security": "prompt_security_agent",
+    "financial_transfer": "financial_transfer_agent",
+    "data_extraction": "data_extraction_agent",
+    "research_assistant": "research_assistant",
+    "faq_chatbot": "faq_chatbot",
+}
+
+# Imported during warm-up so forked workers do not pay for them on first call
+WARM_IMPORTS = ("langchain_core.messages", "langchain_openai")
+
+# Output lines that mean the proxy (or the agent) refused a request
+BLOCKED_RE = re.compile(r"\[BLOCKED\]|BLOCKED/ERROR|(?:Result|Agent): Error:")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SHARED HTTP CLIENTS
+# ═══════════════════════════════════════════════════════════════════════════
+_http_clients = {}
+_http_lock = threading.Lock()
+
+def shared_http_client(base_url: str, max_connections: int = 20, asynchronous: bool = False):
+    """One pooled keep-alive httpx.Client (or AsyncClient) per base URL in this process.
+
+    The async client serves ResilientLLM, which calls ``ainvoke`` on its own
+    event loop; it opens no connection until that loop first uses it.
+    """
+    with _http_lock:
+        client = _http_clients.get((base_url, asynchronous))
+        if client is None:
+            import httpx
+
+            client = (httpx.AsyncClient if asynchronous else httpx.Client)(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+            _http_clients[(base_url, asynchronous)] = client
+    return client
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WARM-UP
+# ═══════════════════════════════════════════════════════════════════════════
+_modules = {}
+
+def base_url_for(module) -> str:
+    return getattr(module, "PRAQTOR_PROXY_URL", OPENAI_BASE_URL)
+
+def suites_for(module) -> dict:
+    """Suites an agent exposes: its test_* functions, else its example input."""
+    suites = {
+        name: obj for name, obj in vars(module).items()
+        if name.startswith("test_") and callable(obj)
+    }
+    if not suites and hasattr(module, "EXAMPLE_INPUT"):
+        # run() routes the request to a model (langchain_agents/model_router.py) when the agent has one
+        run = getattr(module, "run", None) or (
+            lambda query: module.get_agent_executor().invoke({"input": query})
+        )
+        suites["example"] = lambda: print(run(module.EXAMPLE_INPUT))
+    return suites
+
+def warm_up(names) -> dict:
+    """Import agents and build their clients; returns {agent: [problems]}."""
+    if LANGCHAIN_AGENTS_DIR not in sys.path:
+        sys.path.append(LANGCHAIN_AGENTS_DIR)
+    for name in WARM_IMPORTS:
+        importlib.import_module(name)
+
+    problems = {}
+    for name in names:
+        try:
+            module = importlib.import_module(AGENTS[name])
+        except Exception as e:
+            problems[name] = [f"import failed: {type(e).__name__}: {e}"]
+            continue
+        _modules[name] = module
+        try:
+            base_url = base_url_for(module)
+            clients = {"http_client": shared_http_client(base_url)}
+            if hasattr(module, "get_resilient_llm"):
+                # ResilientLLM runs ainvoke, which never touches the sync client
+                clients["http_async_client"] = shared_http_client(base_url, asynchronous=True)
+            module.get_llm(**clients)
+        except Exception as e:
+            problems.setdefault(name, []).append(f"LLM client: {type(e).__name__}: {e}")
+        # Agent objects are built eagerly here; suites that only call the LLM
+        # still run if this fails
+        for factory in ("get_agent", "get_agent_executor"):
+            if hasattr(module, factory):
+                try:
+                    getattr(module, factory)()
+                except Exception as e:
+                    problems.setdefault(name, []).append(f"{factory}: {type(e).__name__}: {e}")
+    return problems
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WORKERS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def run_suite(agent: str, suite: str) -> dict:
+    """Run one suite with its output captured; executes inside a worker."""
+    output = io.StringIO()
+    error = None
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            suites_for(_modules[agent])[suite]()
+        except Exception:
+            error = traceback.format_exc(limit=3)
+    text = output.getvalue()
+    return {
+        "agent": agent,
+        "suite": suite,
+        "status": "error" if error else "ok",
+        "seconds": round(time.perf_counter() - started, 3),
+        "blocked": len(BLOCKED_RE.findall(text)),
+        "lines": text.count("\n"),
+        "pid": os.getpid(),
+        "output": text,
+        "error": error,
+    }
+
+def failed_result(agent: str, suite: str, error: str) -> dict:
+    """Result for a suite whose worker died before it could report."""
+    return {
+        "agent": agent,
+        "suite": suite,
+        "status": "error",
+        "seconds": 0.0,
+        "blocked": 0,
+        "lines": 0,
+        "pid": None,
+        "output": "",
+        "error": error,
+    }
+
+def run_matrix(names, suite_pattern=None, workers=None, on_result=None) -> dict:
+    """Warm up, fork workers and run every matching (agent, suite) pair."""
+    started = time.perf_counter()
+    problems = warm_up(names)
+    warm_seconds = time.perf_counter() - started
+
+    tasks = [
+        (agent, suite)
+        for agent in names if agent in _modules
+        for suite in suites_for(_modules[agent])
+        if not suite_pattern or re.search(suite_pattern, suite)
+    ]
+    workers = workers if workers is not None else min(len(tasks), 8)
+    results = []
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # Fork inherits the warm interpreter; all workers start before any
+        # executor thread exists in this process
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(run_suite, agent, suite): (agent, suite) for agent, suite in tasks}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # A worker that crashes (segfault, os._exit, OOM kill) breaks
+                    # the pool: every suite still pending fails here, one by one
+                    results.append(failed_result(*futures[future], f"worker failed: {type(e).__name__}: {e}"))
+                if on_result is not None:
+                    on_result(results[-1])
+    else:
+        for agent, suite in tasks:
+            results.append(run_suite(agent, suite))
+            if on_result is not None:
+                on_result(results[-1])
+
+    order = {task: i for i, task in enumerate(tasks)}
+    results.sort(key=lambda r: order[(r["agent"], r["suite"])])
+    return {
+        "agents": list(names),
+        "problems": problems,
+        "workers": workers,
+        "warm_up_seconds": round(warm_seconds, 3),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "suite_seconds": round(sum(r["seconds"] for r in results), 3),
+        "results": results,
+    }
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPORT
+# ═══════════════════════════════════════════════════════════════════════════
+
+def print_report(report: dict, show_output=False):
+    print("=" * 70)
+    print("PRAQTOR X Regression Matrix")
+    print("=" * 70)
+    for agent, messages in report["problems"].items():
+        for message in messages:
+            print(f"[warm-up] {agent}: {message}")
+    print(f"{'agent':<20} {'suite':<30} {'status':<6} {'blocked':>7} {'seconds':>8}")
+    print("-" * 70)
+    for r in report["results"]:
+        print(f"{r['agent']:<20} {r['suite']:<30} {r['status']:<6} {r['blocked']:>7} {r['seconds']:>8.2f}")
+        if show_output and r["output"]:
+            print("    " + r["output"].rstrip().replace("\n", "\n    "))
+        if r["error"]:
+            print("    " + r["error"].rstrip().replace("\n", "\n    "))
+    failed = sum(r["status"] != "ok" for r in report["results"])
+    print("-" * 70)
+    print(f"{len(report['results'])} suites, {failed} failed, "
+          f"{sum(r['blocked'] for r in report['results'])} blocked responses")
+    print(f"Warm-up {report['warm_up_seconds']:.2f}s, wall {report['wall_seconds']:.2f}s "
+          f"for {report['suite_seconds']:.2f}s of suite time on {report['workers']} workers")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run agent test suites from one warm process")
+    parser.add_argument("agents", nargs="*", help=f"agents to run (default: all of {', '.join(AGENTS)})")
+    parser.add_argument("--suite", help="only run suites whose name matches this regex")
+    parser.add_argument("--workers", type=int, help="forked worker processes (0 or 1 runs in-process)")
+    parser.add_argument("--list", action="store_true", help="list agents and their suites")
+    parser.add_argument("--json", action="store_true", help="print the aggregated report as JSON")
+    parser.add_argument("--show-output", action="store_true", help="print each suite's captured output")
+    args = parser.parse_args()
+
+    names = args.agents or list(AGENTS)
+    unknown = [name for name in names if name not in AGENTS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+
+    if args.list:
+        sys.path.append(LANGCHAIN_AGENTS_DIR)
+        for name in names:
+            print(f"{name}: {', '.join(suites_for(importlib.import_module(AGENTS[name])))}")
+        sys.exit(0)
+
+    progress = None if args.json else (
+        lambda r: print(f"[{r['status']}] {r['agent']}.{r['suite']} ({r['seconds']:.2f}s)", file=sys.stderr)
+    )
+    report = run_matrix(names, suite_pattern=args.suite, workers=args.workers, on_result=progress)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, show_output=args.show_output)
+    failed = any(r["status"] != "ok" for r in report["results"])
+    sys.exit(1 if failed or not report["results"] else 0)
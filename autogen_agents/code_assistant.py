@@ -5,8 +5,10 @@ AutoGen multi-agent system for code generation and execution.
 RISK: HIGH - Can generate and execute arbitrary code.
 """
 
-from autogen import AssistantAgent, UserProxyAgent, config_list_from_json
 import os
+import threading
+
+from csv_stats import summarize_csv_directory
 
 
 # Configuration
@@ -22,40 +24,111 @@ llm_config = {
     "temperature": 0,
 }
 
-# Assistant agent - generates code
-assistant = AssistantAgent(
-    name="CodeAssistant",
-    llm_config=llm_config,
-    system_message="""You are a helpful AI assistant that writes Python code.
-    When asked to solve a problem, write clean, efficient code.
-    Always explain your code."""
-)
-
-# User proxy - can execute code (DANGEROUS)
-user_proxy = UserProxyAgent(
-    name="UserProxy",
-    human_input_mode="NEVER",  # Autonomous execution
-    max_consecutive_auto_reply=10,
-    is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
-    code_execution_config={
-        "work_dir": "/tmp/autogen_code",
-        "use_docker": False,  # Executes directly on host (DANGEROUS)
-    },
-)
-
-# Data analyst agent
-data_analyst = AssistantAgent(
-    name="DataAnalyst",
-    llm_config=llm_config,
-    system_message="""You are a data analyst. You analyze data and create visualizations.
-    You can read files from the filesystem and process them."""
-)
+HISTORY_TOKEN_BUDGET = int(os.getenv("AUTOGEN_HISTORY_TOKEN_BUDGET", "6000"))
+
+# autogen takes seconds to import and the executor forks a worker pool, so
+# the agents are built on first use rather than at import time
+_agents = None
+_init_lock = threading.RLock()
+
+
+def build_agents():
+    """Create the assistant, user proxy and data analyst agents."""
+    from autogen import AssistantAgent, UserProxyAgent, register_function
+
+    from exec_cache import CachingCodeExecutor
+    from history_budget import HistoryCompactor, estimate_tokens
+    from sandbox_pool import WarmPoolCodeExecutor
+
+    # Assistant agent - generates code
+    assistant = AssistantAgent(
+        name="CodeAssistant",
+        llm_config=llm_config,
+        system_message="""You are a helpful AI assistant that writes Python code.
+        When asked to solve a problem, write clean, efficient code.
+        Always explain your code."""
+    )
+
+    # Pre-forked, pre-imported interpreters; executes directly on host (DANGEROUS)
+    # Identical code blocks over unchanged input files replay their cached result
+    code_executor = CachingCodeExecutor(
+        WarmPoolCodeExecutor(
+            work_dir="/tmp/autogen_code",
+            timeout=60,
+            size=int(os.getenv("AUTOGEN_SANDBOX_WORKERS", "4")),
+            max_runs_per_worker=50,
+        ),
+        cache_dir=os.getenv("AUTOGEN_EXEC_CACHE_DIR"),
+    )
+
+    # User proxy - can execute code (DANGEROUS)
+    user_proxy = UserProxyAgent(
+        name="UserProxy",
+        human_input_mode="NEVER",  # Autonomous execution
+        max_consecutive_auto_reply=10,
+        is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
+        code_execution_config={
+            "executor": code_executor,  # No Docker isolation (DANGEROUS)
+        },
+    )
+
+    # Data analyst agent
+    data_analyst = AssistantAgent(
+        name="DataAnalyst",
+        llm_config=llm_config,
+        system_message="""You are a data analyst. You analyze data and create visualizations.
+        You can read files from the filesystem and process them.
+        For summary statistics over CSV files, call summarize_csv_directory instead
+        of loading the files into memory."""
+    )
+
+    # Streaming, process-parallel CSV aggregation; safe on directories larger than RAM
+    register_function(
+        summarize_csv_directory,
+        caller=data_analyst,
+        executor=user_proxy,
+        name="summarize_csv_directory",
+        description="Summary statistics (count, mean, std, min/max, approximate quantiles) "
+                    "for every numeric column across all CSV files in a directory",
+    )
+
+    # Keep every request within a token budget as the auto-reply loop grows the history
+    for agent in (assistant, data_analyst):
+        agent.register_hook(
+            "process_all_messages_before_reply",
+            HistoryCompactor(
+                max_tokens=HISTORY_TOKEN_BUDGET,
+                reserved_tokens=estimate_tokens(agent.system_message),
+            ),
+        )
+
+    return {
+        "assistant": assistant,
+        "code_executor": code_executor,
+        "user_proxy": user_proxy,
+        "data_analyst": data_analyst,
+    }
+
+
+def get_agents():
+    global _agents
+    with _init_lock:
+        if _agents is None:
+            _agents = build_agents()
+        return _agents
+
+
+def __getattr__(name):
+    if name in ("assistant", "code_executor", "user_proxy", "data_analyst"):
+        return get_agents()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def run_code_task(task: str):
     """Run a code generation and execution task."""
-    user_proxy.initiate_chat(
-        assistant,
+    agents = get_agents()
+    agents["user_proxy"].initiate_chat(
+        agents["assistant"],
         message=task
     )
 
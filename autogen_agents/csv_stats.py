@@ -0,0 +1,225 @@
+"""
+CSV Summary Statistics
+======================
+Memory-bounded, parallel summary statistics over directories of CSV files.
+
+Files are split into byte ranges that are streamed row by row in worker
+processes. Each range produces a small partial aggregate per column
+(count, mean, M2 for variance, min, max and a fixed-size bottom-k sample
+for approximate quantiles), and the partials are merged in the parent, so
+memory stays constant no matter how large the input is.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import csv
+import glob
+import heapq
+import itertools
+import math
+import os
+import random
+import zlib
+
+
+SPLIT_BYTES = 64 * 1024 * 1024
+SAMPLE_SIZE = 2048
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+
+class ColumnStats:
+    """Mergeable running statistics for one numeric column."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "missing", "sample")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.missing = 0
+        self.sample = []  # heap of (-priority, value): keeps the k lowest priorities
+
+    def add(self, value: float, priority: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._offer(priority, value)
+
+    def _offer(self, priority, value):
+        if len(self.sample) < SAMPLE_SIZE:
+            heapq.heappush(self.sample, (-priority, value))
+        elif priority < -self.sample[0][0]:
+            heapq.heapreplace(self.sample, (-priority, value))
+
+    def merge(self, other: "ColumnStats"):
+        """Fold ``other`` into this aggregate (Chan et al. parallel variance)."""
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.mean += delta * other.count / total
+            self.count = total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            for neg_priority, value in other.sample:
+                self._offer(-neg_priority, value)
+        self.missing += other.missing
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0, "missing": self.missing}
+        values = sorted(value for _, value in self.sample)
+        return {
+            "count": self.count,
+            "missing": self.missing,
+            "mean": self.mean,
+            "std": math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {q: values[round(q * (len(values) - 1))] for q in QUANTILES},
+        }
+
+
+def _read_header(path):
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        return next(csv.reader(f), [])
+
+
+def column_names(header) -> list:
+    """Header names made unique the way pandas does: a repeated ``a`` becomes ``a.1``."""
+    names = []
+    seen = set(header)
+    counts = {}
+    for name in header:
+        if name in counts:
+            while True:
+                counts[name] += 1
+                unique = f"{name}.{counts[name]}"
+                if unique not in seen:
+                    break
+            seen.add(unique)
+            names.append(unique)
+        else:
+            counts[name] = 0
+            names.append(name)
+    return names
+
+
+def _split_file(path, split_bytes):
+    """Byte ranges of roughly ``split_bytes`` covering the file after its header."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+    ranges = []
+    while start < size:
+        end = min(start + split_bytes, size)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _aggregate_range(path, start, end, width, seed):
+    """Stream rows whose first byte lies in [start, end) and aggregate the
+    first ``width`` fields of each into a list of ColumnStats by position.
+
+    A range that does not begin at the header boundary skips its first
+    partial line; the previous range reads past ``end`` to finish it. This
+    assumes quoted fields do not contain newlines, which holds for the
+    machine-generated CSVs this tool targets.
+    """
+    rng = random.Random(seed)
+    columns = [ColumnStats() for _ in range(width)]
+    rows = 0
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        position = f.tell()
+        for raw in f:
+            if position >= end:
+                break
+            position += len(raw)
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            fields = next(csv.reader([line]), [])
+            rows += 1
+            for column, value in zip(columns, fields):
+                try:
+                    value = float(value)
+                except ValueError:
+                    column.missing += 1
+                    continue
+                if math.isnan(value):
+                    column.missing += 1
+                else:
+                    column.add(value, rng.random())
+            for column in columns[len(fields):]:
+                column.missing += 1
+    return rows, columns
+
+
+def aggregate_csv_files(paths, workers=None, split_bytes=SPLIT_BYTES) -> dict:
+    """Merge per-column statistics across ``paths`` using a process pool."""
+    tasks = []
+    names = {}
+    for path in paths:
+        # Columns are aggregated by position and merged across files by name
+        names[path] = column_names(_read_header(path))
+        for i, (start, end) in enumerate(_split_file(path, split_bytes)):
+            tasks.append((path, start, end, len(names[path]), zlib.crc32(f"{path}:{i}".encode())))
+
+    total_rows = 0
+    merged = {}
+    workers = workers or os.cpu_count() or 1
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep only a couple of partials per worker in flight so memory stays bounded
+        pending = {pool.submit(_aggregate_range, *task): task[0] for task in itertools.islice(tasks, 2 * workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                rows, columns = future.result()
+                total_rows += rows
+                for name, column in zip(names[path], columns):
+                    merged.setdefault(name, ColumnStats()).merge(column)
+                task = next(tasks, None)
+                if task is not None:
+                    pending[pool.submit(_aggregate_range, *task)] = task[0]
+    return {
+        "files": len(paths),
+        "rows": total_rows,
+        "columns": {name: column.summary() for name, column in merged.items()},
+    }
+
+
+def summarize_csv_directory(directory: str, pattern: str = "*.csv") -> str:
+    """Compute summary statistics (count, mean, std, min/max, approximate quantiles)
+    for every numeric column across all CSV files in a directory, streaming the
+    files in parallel without loading them into memory."""
+    paths = sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+    if not paths:
+        return f"No files matching {pattern} in {directory}"
+    result = aggregate_csv_files(paths)
+    lines = [f"{result['files']} files, {result['rows']} rows"]
+    for name, stats in result["columns"].items():
+        if not stats["count"]:
+            lines.append(f"{name}: non-numeric ({stats['missing']} values)")
+            continue
+        q = stats["quantiles"]
+        lines.append(
+            f"{name}: count={stats['count']} missing={stats['missing']} "
+            f"mean={stats['mean']:.6g} std={stats['std']:.6g} "
+            f"min={stats['min']:.6g} p25~{q[0.25]:.6g} p50~{q[0.5]:.6g} "
+            f"p75~{q[0.75]:.6g} p99~{q[0.99]:.6g} max={stats['max']:.6g}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,185 @@
+"""
+Execution Cache
+===============
+Content-hashed result cache for AutoGen code blocks.
+
+Entries are keyed by a hash of the language and code, and record
+fingerprints (size and mtime) of every input path the code references.
+Relative paths are resolved against the directory the wrapped executor
+runs code in: its ``execution_dir``, else its ``work_dir``.
+A re-run of identical code replays the stored output as long as those
+inputs are unchanged; if any referenced file changed, the entry is
+invalidated and the block runs again.
+
+Only Python blocks that exited 0 are stored. Shell blocks (``date``,
+``ls``) and Python that imports or calls anything clock-, random-,
+environment- or network-dependent always run.
+"""
+
+import ast
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from autogen.coding.base import CommandLineCodeResult
+
+
+# String literals that look like filesystem paths or glob patterns
+PATH_LITERAL_RE = re.compile(r"""(?P<q>['"])(?P<path>(?:/|\./|\.\./|~/)[^'"\n]*|[^'"\s/]+\.[A-Za-z0-9]{1,8})(?P=q)""")
+CACHEABLE_LANGUAGES = ("python", "py", "python3")
+# Python importing any of these is treated as non-deterministic and never cached
+NONDETERMINISTIC_MODULES = frozenset(
+    "random time datetime uuid secrets requests urllib urllib3 httpx aiohttp socket http "
+    "subprocess platform psutil multiprocessing threading asyncio sqlite3 psycopg2 sqlalchemy boto3".split()
+)
+# Calls that read the clock, randomness, the environment or live directories
+NONDETERMINISTIC_RE = re.compile(
+    r"\b(?:np|numpy|torch|tf|jax|pd|pandas)\.random\b"
+    r"|\bos\.(?:urandom|getpid|environ|getenv|listdir|scandir|walk|system|popen)\b"
+    r"|\.(?:now|today|utcnow)\s*\("
+    r"|\b(?:input|__import__|eval|exec)\s*\("
+)
+MAX_DIR_ENTRIES = 10000
+
+
+def _stat_fingerprint(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def fingerprint_path(path: str):
+    """Fingerprint a file, directory listing or glob pattern; None if missing."""
+    path = os.path.expanduser(path)
+    if glob.has_magic(path):
+        return {p: _stat_fingerprint(p) for p in sorted(glob.glob(path))[:MAX_DIR_ENTRIES]}
+    if os.path.isdir(path):
+        entries = {}
+        for root, _, files in os.walk(path):
+            for name in files:
+                full = os.path.join(root, name)
+                entries[full] = _stat_fingerprint(full)
+                if len(entries) >= MAX_DIR_ENTRIES:
+                    return entries
+        return entries
+    return _stat_fingerprint(path)
+
+
+def is_cacheable(language: str, code: str) -> bool:
+    """Whether a block's result can be replayed: deterministic-looking Python only."""
+    if language.lower() not in CACHEABLE_LANGUAGES or NONDETERMINISTIC_RE.search(code):
+        return False
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        else:
+            continue
+        if any(module.split(".")[0] in NONDETERMINISTIC_MODULES for module in modules):
+            return False
+    return True
+
+
+def referenced_paths(code: str) -> list:
+    """Paths mentioned as string literals in the code, in first-seen order."""
+    seen = []
+    for match in PATH_LITERAL_RE.finditer(code):
+        path = match.group("path")
+        if path not in seen:
+            seen.append(path)
+    return seen
+
+
+class CachingCodeExecutor:
+    """Wraps an AutoGen CodeExecutor with an on-disk execution result cache."""
+
+    def __init__(self, executor, cache_dir=None):
+        self.executor = executor
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "autogen_exec_cache")
+        # Relative paths in code resolve where the executor runs it, not here
+        base_dir = getattr(executor, "execution_dir", None) or getattr(executor, "work_dir", None)
+        self.base_dir = os.path.abspath(base_dir or os.getcwd())
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def code_extractor(self):
+        return self.executor.code_extractor
+
+    def _entry_path(self, language: str, code: str) -> str:
+        digest = hashlib.sha256(f"{language}\0{code}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _inputs(self, code: str) -> dict:
+        return {
+            path: fingerprint_path(os.path.join(self.base_dir, os.path.expanduser(path)))
+            for path in referenced_paths(code)
+        }
+
+    def _lookup(self, path: str, code: str):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._inputs(code) != entry["inputs"]:
+            try:
+                os.remove(path)  # an input changed since this result was recorded
+            except OSError:
+                pass  # already removed or replaced by another process
+            return None
+        return entry
+
+    def _store(self, path: str, code: str, exit_code: int, output: str):
+        entry = {
+            "inputs": self._inputs(code),
+            "exit_code": exit_code,
+            "output": output,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def execute_code_blocks(self, code_blocks: list) -> CommandLineCodeResult:
+        outputs = []
+        exit_code = 0
+        for block in code_blocks:
+            language = block.language.lower()
+            cacheable = is_cacheable(language, block.code)
+            path = self._entry_path(language, block.code)
+            entry = self._lookup(path, block.code) if cacheable else None
+            if entry is not None:
+                self.hits += 1
+                exit_code, output = entry["exit_code"], entry["output"]
+            else:
+                self.misses += 1
+                result = self.executor.execute_code_blocks([block])
+                exit_code, output = result.exit_code, result.output
+                # Failures (timeouts, crashed or OOM-killed workers) must run again
+                if cacheable and exit_code == 0:
+                    self._store(path, block.code, exit_code, output)
+            outputs.append(output)
+            if exit_code != 0:
+                break
+        return CommandLineCodeResult(exit_code=exit_code, output="".join(outputs))
+
+    def restart(self) -> None:
+        self.executor.restart()
+
+    def clear(self):
+        """Drop every cached result."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,165 @@
+"""
+History Budget
+==============
+Token-budgeted conversation history compaction for AutoGen chats.
+
+Registered as a ``process_all_messages_before_reply`` hook, it rewrites the
+copy of the history that is sent to the model (the stored conversation is
+left untouched):
+
+1. Execution outputs older than the most recent turns are cut to a head
+   and tail excerpt.
+2. Code blocks that re-send an earlier block with edits are replaced by a
+   unified diff against the previous version, except in the newest message.
+3. If the history is still over budget, the oldest turns after the task
+   message are folded into a single short summary message.
+"""
+
+import difflib
+import re
+
+
+CODE_BLOCK_RE = re.compile(r"```(\w*)\n(.*?)```", re.DOTALL)
+EXEC_OUTPUT_PREFIX = "exitcode:"
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def estimate_tokens(text: str) -> int:
+        """Count tokens locally with tiktoken."""
+        return len(_encoding.encode(text, disallowed_special=()))
+except Exception:  # tiktoken missing or its encoding data unavailable offline
+    def estimate_tokens(text: str) -> int:
+        """Approximate token count (about four characters per token)."""
+        return len(text) // 4 + 1
+
+
+def message_tokens(message: dict) -> int:
+    """Estimated tokens for one chat message, including per-message overhead."""
+    content = message.get("content") or ""
+    if not isinstance(content, str):
+        content = str(content)
+    extra = str(message.get("tool_calls") or message.get("function_call") or "")
+    return estimate_tokens(content) + (estimate_tokens(extra) if extra else 0) + 4
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    tokens = estimate_tokens(text)
+    keep = max_tokens * 2  # characters kept at each end
+    # Token-dense text can be over budget yet short in characters; head and
+    # tail would then overlap and the "truncated" text come out longer
+    if tokens <= max_tokens or 2 * keep >= len(text):
+        return text
+    omitted = text[keep:-keep].count("\n")
+    truncated = f"{text[:keep]}\n... [{omitted} lines truncated] ...\n{text[-keep:]}"
+    return truncated if estimate_tokens(truncated) < tokens else text
+
+
+class HistoryCompactor:
+    """Keeps each request's message history within ``max_tokens``.
+
+    ``reserved_tokens`` covers the system message, which AutoGen prepends
+    after hooks run. The newest ``keep_recent`` messages are never altered.
+    """
+
+    def __init__(self, max_tokens=6000, reserved_tokens=0, keep_recent=4, max_output_tokens=300):
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.keep_recent = keep_recent
+        self.max_output_tokens = max_output_tokens
+        self.last_stats = {}
+
+    def __call__(self, messages: list) -> list:
+        if not messages:
+            return messages
+        before = sum(message_tokens(m) for m in messages)
+        messages = [dict(m) for m in messages]
+        cutoff = max(len(messages) - self.keep_recent, 0)
+
+        for message in messages[:cutoff]:
+            content = message.get("content")
+            if isinstance(content, str) and (
+                message.get("role") in ("tool", "function") or content.startswith(EXEC_OUTPUT_PREFIX)
+            ):
+                message["content"] = _truncate(content, self.max_output_tokens)
+
+        self._diff_resent_code(messages, cutoff)
+
+        budget = self.max_tokens - self.reserved_tokens
+        total = sum(message_tokens(m) for m in messages)
+        if total > budget and len(messages) > self.keep_recent + 1:
+            messages = self._fold_oldest(messages, budget)
+
+        self.last_stats = {
+            "tokens_before": before,
+            "tokens_after": sum(message_tokens(m) for m in messages),
+            "messages": len(messages),
+        }
+        return messages
+
+    def _diff_resent_code(self, messages: list, cutoff: int):
+        """Replace re-sent code blocks in ``messages[:cutoff]`` with diffs against
+        their previous version; the newest ``keep_recent`` messages stay intact."""
+        last_code = {}
+        newest_with_code = max(
+            (i for i, m in enumerate(messages)
+             if isinstance(m.get("content"), str) and CODE_BLOCK_RE.search(m["content"])),
+            default=-1,
+        )
+        for i, message in enumerate(messages[:cutoff]):
+            content = message.get("content")
+            if not isinstance(content, str) or "```" not in content:
+                continue
+
+            def replace(match):
+                language, code = match.group(1), match.group(2)
+                previous = last_code.get(language)
+                last_code[language] = code
+                if i == newest_with_code or previous is None or previous == code:
+                    return match.group(0)
+                if difflib.SequenceMatcher(None, previous, code).quick_ratio() < 0.5:
+                    return match.group(0)  # a new program, not a revision
+                diff = "".join(difflib.unified_diff(
+                    previous.splitlines(keepends=True), code.splitlines(keepends=True),
+                    "previous", "revised", n=1,
+                ))
+                return f"```diff\n{diff}```"
+
+            message["content"] = CODE_BLOCK_RE.sub(replace, content)
+
+    def _fold_oldest(self, messages: list, budget: int) -> list:
+        """Summarize the oldest turns after the first message until under budget."""
+        head, tail = messages[:1], messages[1:]
+        folded = []
+        total = sum(message_tokens(m) for m in messages)
+        reserve = message_tokens({"content": "[9999 earlier messages condensed]"})
+        while len(tail) > self.keep_recent and total + reserve > budget:
+            dropped = tail.pop(0)
+            folded.append(dropped)
+            total -= message_tokens(dropped)
+            # Tool results must stay paired with the call that produced them
+            while tail and tail[0].get("role") == "tool":
+                dropped = tail.pop(0)
+                folded.append(dropped)
+                total -= message_tokens(dropped)
+        if not folded:
+            return messages
+        lines = []
+        for message in folded:
+            first_line = (message.get("content") or "").strip().split("\n", 1)[0]
+            speaker = message.get("name") or message.get("role", "")
+            lines.append(f"- {speaker}: {first_line[:120]}")
+        # The summary itself must fit: keep the newest lines that do
+        header = f"[{len(folded)} earlier messages condensed]"
+        allowance = budget - total - message_tokens({"content": header})
+        kept = []
+        for line in reversed(lines):
+            cost = estimate_tokens(line + "\n")
+            if cost > allowance:
+                break
+            kept.append(line)
+            allowance -= cost
+        summary = {"role": "user", "content": "\n".join([header] + kept[::-1])}
+        return head + [summary] + tail
@@ -0,0 +1,273 @@
+"""
+Sandbox Pool
+============
+Warm worker pool backing AutoGen code execution.
+
+Workers are forked from a forkserver that has already imported the heavy
+data libraries (numpy, pandas), so a code block pays neither interpreter
+startup nor import cost. Each worker runs under resource limits and is
+recycled after a fixed number of runs so state leaked by generated code
+does not accumulate.
+
+Blocks run in the executor's ``work_dir``, as with AutoGen's local
+executor, so files written by one block are there for the next block and
+the next turn. Exit codes follow the shell: 124 for a timeout, 128+N for
+a worker killed by signal N.
+"""
+
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import subprocess
+import sys
+import threading
+import tempfile
+import traceback
+
+from autogen.coding.base import CommandLineCodeResult
+from autogen.coding.markdown_code_extractor import MarkdownCodeExtractor
+
+
+PYTHON_LANGUAGES = ("python", "py", "python3", "Python")
+SHELL_LANGUAGES = ("bash", "shell", "sh")
+DEFAULT_PRELOAD = ("numpy", "pandas")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WORKER PROCESS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _apply_limits(memory_limit_mb, max_file_mb, max_open_files):
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if max_file_mb:
+        limit = max_file_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limit, limit))
+    if max_open_files:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (max_open_files, max_open_files))
+
+
+class _Timeout(BaseException):
+    """Raised by the alarm; not an Exception, so generated code cannot swallow it."""
+
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+
+def _run_python(code, timeout):
+    """Execute code in a fresh namespace; returns the exit code."""
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    signal.alarm(timeout)
+    try:
+        exec(compile(code, "<code_block>", "exec"), namespace)
+        return 0
+    except _Timeout:
+        print("Code execution timed out", file=sys.stderr)
+        return 124
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        signal.alarm(0)
+
+
+def _run_task(task):
+    """Run one code block in ``work_dir`` with stdout/stderr sent to ``capture_path``."""
+    code, language, work_dir, capture_path, timeout = task
+    saved = os.dup(1), os.dup(2)
+    cwd = os.getcwd()
+    with open(capture_path, "wb") as capture:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(capture.fileno(), 1)
+        os.dup2(capture.fileno(), 2)
+        try:
+            os.chdir(work_dir)
+            if language in SHELL_LANGUAGES:
+                try:
+                    exit_code = subprocess.run(["bash", "-c", code], timeout=timeout).returncode
+                except subprocess.TimeoutExpired:
+                    print("Code execution timed out", file=sys.stderr)
+                    exit_code = 124
+            else:
+                exit_code = _run_python(code, timeout)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.chdir(cwd)
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+    return exit_code
+
+
+def _worker_main(conn, limits, max_runs):
+    """Serve tasks over ``conn`` until ``max_runs`` is reached or the pipe closes."""
+    _apply_limits(*limits)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    for _ in range(max_runs):
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        conn.send(_run_task(task))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# POOL
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _read_capture(path):
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def _death_status(exitcode):
+    """(exit_code, message) for a worker that died mid-task, shell style."""
+    if exitcode is not None and exitcode < 0:
+        name = signal.Signals(-exitcode).name
+        return 128 - exitcode, f"Sandbox worker killed by {name} (resource limit exceeded?)"
+    return (1 if exitcode is None else exitcode), f"Sandbox worker exited with status {exitcode}"
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.runs = 0
+
+
+class SandboxPool:
+    """Pool of pre-forked, pre-imported worker interpreters."""
+
+    def __init__(
+        self,
+        size=4,
+        max_runs_per_worker=50,
+        preload=DEFAULT_PRELOAD,
+        memory_limit_mb=2048,
+        max_file_mb=512,
+        max_open_files=256,
+    ):
+        self.size = size
+        self.max_runs_per_worker = max_runs_per_worker
+        self.limits = (memory_limit_mb, max_file_mb, max_open_files)
+        self._ctx = multiprocessing.get_context("forkserver")
+        # Modules that fail to import are skipped by the forkserver
+        self._ctx.set_forkserver_preload(list(preload) + [__name__])
+        self._idle = queue.Queue()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.limits, self.max_runs_per_worker),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _retire(self, worker, replace=True):
+        """Stop ``worker`` and, unless the pool is closing, start a warm replacement."""
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        if replace and not self._closed:
+            threading.Thread(target=lambda: self._idle.put(self._spawn()), daemon=True).start()
+
+    def run(self, code, language="python", work_dir=None, timeout=60):
+        """Execute one code block on an idle worker; returns (exit_code, output)."""
+        if self._closed:
+            raise RuntimeError("SandboxPool is closed")
+        work_dir = os.path.abspath(work_dir or os.getcwd())
+        # Created by the parent so the output survives a worker that dies mid-task
+        fd, capture_path = tempfile.mkstemp(prefix="sandbox_", suffix=".out")
+        os.close(fd)
+        worker = self._idle.get()
+        try:
+            try:
+                worker.conn.send((code, language, work_dir, capture_path, timeout))
+                # Give the in-worker alarm a chance to fire before killing the worker
+                if not worker.conn.poll(timeout + 5):
+                    self._retire(worker)
+                    return 124, _read_capture(capture_path) + "Code execution timed out"
+                exit_code = worker.conn.recv()
+            except (EOFError, OSError):
+                self._retire(worker)
+                exit_code, message = _death_status(worker.process.exitcode)
+                return exit_code, _read_capture(capture_path) + message
+            worker.runs += 1
+            if worker.runs >= self.max_runs_per_worker:
+                self._retire(worker)
+            else:
+                self._idle.put(worker)
+            return exit_code, _read_capture(capture_path)
+        finally:
+            os.remove(capture_path)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            self._retire(worker, replace=False)
+
+
+class WarmPoolCodeExecutor:
+    """AutoGen CodeExecutor that runs code blocks on a SandboxPool.
+
+    Every block runs in ``work_dir``, so files persist across blocks and turns.
+    """
+
+    def __init__(self, work_dir="/tmp/autogen_code", timeout=60, **pool_kwargs):
+        self.work_dir = os.path.abspath(work_dir)
+        self.timeout = timeout
+        self._pool_kwargs = pool_kwargs
+        os.makedirs(work_dir, exist_ok=True)
+        self.pool = SandboxPool(**pool_kwargs)
+
+    @property
+    def execution_dir(self):
+        """Directory code blocks run in; relative paths in code resolve here."""
+        return self.work_dir
+
+    @property
+    def code_extractor(self):
+        return MarkdownCodeExtractor()
+
+    def execute_code_blocks(self, code_blocks: list) -> CommandLineCodeResult:
+        outputs = []
+        exit_code = 0
+        for block in code_blocks:
+            language = block.language.lower()
+            if language not in PYTHON_LANGUAGES + SHELL_LANGUAGES:
+                return CommandLineCodeResult(exit_code=1, output=f"unknown language {language}")
+            exit_code, output = self.pool.run(block.code, language, self.work_dir, self.timeout)
+            outputs.append(output)
+            if exit_code != 0:
+                break
+        return CommandLineCodeResult(exit_code=exit_code, output="".join(outputs))
+
+    def restart(self) -> None:
+        self.pool.close()
+        self.pool = SandboxPool(**self._pool_kwargs)
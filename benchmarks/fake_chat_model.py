@@ -0,0 +1,181 @@
+"""
+Fake Chat Model
+===============
+Deterministic in-process stand-in for ChatOpenAI used by the benchmarks.
+
+Latency is drawn from a configurable distribution, seeded per request and
+turn so a run is reproducible regardless of thread scheduling. A tool-call
+script maps prompt patterns to the tool calls the model "decides" to make
+on its first turn; once tool results are in the conversation it answers.
+Prompts matching a block pattern raise the same kind of error the proxy
+produces, which exercises the agents' error paths.
+
+Latency specs are described in latency.py.
+"""
+
+import asyncio
+import contextvars
+import json
+import random
+import re
+import time
+import zlib
+from typing import Any, Iterator, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from latency import LatencyDistribution
+
+
+class ProxyBlockedError(Exception):
+    """Raised for prompts matching a block pattern, like a proxy 403."""
+
+
+class ToolScript:
+    """Ordered (pattern, tool calls) rules; the first matching pattern wins."""
+
+    def __init__(self, rules=()):
+        self.rules = [(re.compile(pattern, re.I), calls) for pattern, calls in rules]
+
+    @classmethod
+    def from_json(cls, path: str, agent: str) -> "ToolScript":
+        """Load ``{"agent": [{"match": regex, "calls": [{"name", "args"}]}]}``."""
+        with open(path) as f:
+            spec = json.load(f).get(agent, [])
+        return cls([(rule["match"], [(c["name"], c.get("args", {})) for c in rule["calls"]])
+                    for rule in spec])
+
+    def calls_for(self, prompt: str) -> list:
+        for pattern, calls in self.rules:
+            if pattern.search(prompt):
+                return calls
+        return []
+
+
+class _RequestState:
+    def __init__(self, request_id: int = 0):
+        self.id = request_id
+        self.model_seconds = 0.0
+
+
+# A context variable rather than a thread-local, so the state follows calls
+# that hop to executor threads or event loops (e.g. resilient_llm.py)
+_request = contextvars.ContextVar("fake_chat_request")
+
+
+def set_request_id(request_id: int):
+    """Tag model calls made in this context with a request id (seeds latency)."""
+    _request.set(_RequestState(request_id))
+
+
+def model_seconds() -> float:
+    """Simulated model time spent in this context since set_request_id()."""
+    state = _request.get(None)
+    return state.model_seconds if state else 0.0
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with scripted tool calls and sampled latency."""
+
+    latency: Any = None
+    token_latency: Any = None
+    script: Any = None
+    block_patterns: List[str] = []
+    seed: int = 0
+    reply: str = "Thanks for reaching out. I've looked into this and everything is in order."
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _rng(self, turn: int) -> random.Random:
+        state = _request.get(None)
+        request_id = state.id if state else 0
+        return random.Random(zlib.crc32(f"{self.seed}:{request_id}:{turn}".encode()))
+
+    @staticmethod
+    def _account(seconds: float):
+        state = _request.get(None)
+        if state is not None:
+            state.model_seconds += seconds
+
+    def _sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+        self._account(seconds)
+
+    def _respond(self, messages: List[BaseMessage], tools_bound: bool) -> AIMessage:
+        delay, message = self._decide(messages, tools_bound)
+        self._sleep(delay)
+        return message
+
+    def _decide(self, messages: List[BaseMessage], tools_bound: bool):
+        """(latency, reply) for a conversation; raises for blocked prompts."""
+        prompt = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        if isinstance(prompt, list):
+            prompt = " ".join(str(part) for part in prompt)
+        for pattern in self.block_patterns:
+            if re.search(pattern, prompt, re.I):
+                raise ProxyBlockedError(f"Error code: 403 - Request blocked by policy ({pattern})")
+        turn = sum(isinstance(m, AIMessage) for m in messages)
+        delay = (self.latency or LatencyDistribution()).sample(self._rng(turn))
+
+        tool_results = [m for m in messages if isinstance(m, ToolMessage)]
+        calls = self.script.calls_for(prompt) if (self.script and tools_bound and not tool_results) else []
+        if calls:
+            tool_calls = [
+                {"name": name, "args": args, "id": f"call_{turn}_{i}"}
+                for i, (name, args) in enumerate(calls)
+            ]
+            return delay, AIMessage(content="", tool_calls=tool_calls)
+        if tool_results:
+            return delay, AIMessage(content=f"{self.reply} ({len(tool_results)} tool results considered)")
+        return delay, AIMessage(content=self.reply)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._respond(messages, tools_bound=bool(kwargs.get("tools")))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, message = self._decide(messages, tools_bound=bool(kwargs.get("tools")))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._account(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages, tools_bound=bool(kwargs.get("tools")))
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="", tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ]))
+            return
+        rng = self._rng(-1)
+        for token in re.findall(r"\S+\s*", message.content):
+            if self.token_latency is not None:
+                self._sleep(self.token_latency.sample(rng))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def fake_model(latency="fixed:0", token_latency=None, script=None, block_patterns=(), seed=0,
+               **kwargs) -> FakeChatModel:
+    """Build a FakeChatModel from latency spec strings."""
+    return FakeChatModel(
+        latency=LatencyDistribution(latency),
+        token_latency=LatencyDistribution(token_latency) if token_latency else None,
+        script=script,
+        block_patterns=list(block_patterns),
+        seed=seed,
+        **kwargs,
+    )
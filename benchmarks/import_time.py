@@ -0,0 +1,145 @@
+"""
+Import-Time Benchmark
+=====================
+Cold-start cost of every agent module.
+
+Each agent is imported in a fresh interpreter under ``python -X importtime``
+(the workflows start one process per run, so this is what every run pays).
+The report shows the module's cumulative import time, the wall time of the
+whole process and its heaviest direct imports, and fails when an agent is
+over its budget or cannot be imported at all (a missing dependency included:
+an agent nobody can import has no cold start to measure).
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --budget-ms 500 customer_support
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (path relative to the repo root, import budget in milliseconds)
+AGENTS = {
+    "customer_support": ("customer_support_agent.py", 1500),
+    "prompt_security": ("prompt_security_agent.py", 1500),
+    "financial_transfer": ("financial_transfer_agent.py", 1500),
+    "research_assistant": ("langchain_agents/research_assistant.py", 300),
+    "faq_chatbot": ("langchain_agents/faq_chatbot.py", 300),
+    "data_extraction": ("langchain_agents/data_extraction_agent.py", 300),
+    "content_crew": ("crewai_agents/content_crew.py", 300),
+    "financial_crew": ("crewai_agents/financial_crew.py", 500),
+    "code_assistant": ("autogen_agents/code_assistant.py", 300),
+}
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse ``-X importtime`` output into (depth, module, self_us, cumulative_us)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((depth, stripped.strip(), self_us, cumulative_us))
+    return entries
+
+
+def measure(path: str) -> dict:
+    """Import the agent at ``path`` once in a fresh interpreter."""
+    directory, filename = os.path.split(os.path.join(REPO_ROOT, path))
+    module = os.path.splitext(filename)[0]
+    env = dict(os.environ)
+    # Keep credential checks from failing the import when nothing is configured
+    env.setdefault("OPENAI_API_KEY", "sk-import-benchmark")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=directory, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    entries = parse_importtime(proc.stderr)
+    if proc.returncode != 0:
+        last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"
+        return {"error": last_line, "wall_ms": wall_ms}
+
+    # The agent module is the outermost entry for its own name
+    own = [e for e in entries if e[1] == module and e[0] == 0]
+    import_ms = own[-1][3] / 1000 if own else None
+    # Direct imports of the agent are the depth-1 entries recorded before it
+    index = entries.index(own[-1]) if own else len(entries)
+    direct = []
+    for depth, name, _, cumulative_us in reversed(entries[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, cumulative_us / 1000))
+    direct.sort(key=lambda item: item[1], reverse=True)
+    return {"error": None, "import_ms": import_ms, "wall_ms": wall_ms, "heaviest": direct[:5]}
+
+
+def run(names, repeat=3, budget_ms=None) -> list:
+    """Measure each agent ``repeat`` times and compare the median to its budget."""
+    results = []
+    for name in names:
+        path, default_budget = AGENTS[name]
+        budget = budget_ms if budget_ms is not None else default_budget
+        runs = [measure(path) for _ in range(repeat)]
+        failed = next((r for r in runs if r["error"]), None)
+        if failed:
+            results.append({"agent": name, "status": "import failed",
+                            "detail": failed["error"], "budget_ms": budget})
+            continue
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        results.append({
+            "agent": name,
+            "status": "ok" if import_ms <= budget else "over budget",
+            "import_ms": round(import_ms, 1),
+            "wall_ms": round(statistics.median(r["wall_ms"] for r in runs), 1),
+            "budget_ms": budget,
+            "heaviest": [(module, round(ms, 1)) for module, ms in runs[-1]["heaviest"]],
+        })
+    return results
+
+
+def print_report(results):
+    print(f"{'agent':<20} {'import ms':>10} {'wall ms':>9} {'budget':>8}  status")
+    print("-" * 64)
+    for r in results:
+        if "import_ms" not in r:
+            print(f"{r['agent']:<20} {'-':>10} {'-':>9} {r['budget_ms']:>8}  {r['status']}: {r['detail']}")
+            continue
+        print(f"{r['agent']:<20} {r['import_ms']:>10.1f} {r['wall_ms']:>9.1f} {r['budget_ms']:>8}  {r['status']}")
+        heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in r["heaviest"][:3])
+        if heaviest:
+            print(f"{'':<20} heaviest: {heaviest}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure agent cold-start import time")
+    parser.add_argument("agents", nargs="*", help=f"agents to measure (default: all of {', '.join(AGENTS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per agent")
+    parser.add_argument("--budget-ms", type=float, help="override every per-agent budget")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    unknown = [name for name in args.agents if name not in AGENTS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+
+    results = run(args.agents or list(AGENTS), repeat=args.repeat, budget_ms=args.budget_ms)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    sys.exit(0 if all(r["status"] == "ok" for r in results) else 1)
@@ -0,0 +1,35 @@
+"""
+Latency Distributions
+=====================
+Injected latency for the fake chat model and the local proxy.
+
+Specs are ``kind:param[:param]`` with times in milliseconds:
+    fixed:50   uniform:20:80   lognormal:50:0.4 (median, sigma)   exp:50 (mean)
+"""
+
+import math
+import random
+
+
+class LatencyDistribution:
+    """Samples latencies in seconds from a ``kind:param[:param]`` spec in ms."""
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, *params = spec.split(":")
+        params = [float(p) for p in params]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exp": 1}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"invalid latency spec {spec!r}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [p / 1000 if i == 0 or kind == "uniform" else p for i, p in enumerate(params)]
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * math.exp(rng.gauss(0.0, sigma))
+        return rng.expovariate(1.0 / self.params[0]) if self.params[0] else 0.0
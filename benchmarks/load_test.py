@@ -0,0 +1,339 @@
+"""
+Load Test
+=========
+Throughput and latency benchmark for the agents, run entirely in-process.
+
+ChatOpenAI is swapped for FakeChatModel (see fake_chat_model.py), so a run
+costs nothing, never touches the proxy and measures the orchestration
+around the model by itself: message building, AgentExecutor, tool
+dispatch and output parsing. A weighted mix of the legitimate and attack
+prompts from the agents' PROMPT_SUITES / TEST_PROMPTS is replayed either
+closed-loop (fixed concurrency) or open-loop (fixed arrival rate; latency
+is measured from the scheduled start, so queueing is included).
+
+The report gives throughput and p50/p95/p99 per agent and per tool, plus
+"non-model" time: request latency minus the simulated model latency.
+
+    python benchmarks/load_test.py --concurrency 16 --requests 2000
+    python benchmarks/load_test.py --rps 200 --duration 20 --latency lognormal:300:0.4
+    python benchmarks/load_test.py --agents customer_support=3,financial_transfer=1 --attack-share 0.2
+"""
+
+import argparse
+import collections
+import functools
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake-benchmark")
+
+from fake_chat_model import ToolScript, fake_model, model_seconds, set_request_id  # noqa: E402
+
+
+# Tool calls the fake model makes when tools are bound; read-only or simulated
+# tools only (transfer_funds just formats a message), between test accounts
+DEFAULT_SCRIPTS = {
+    "customer_support": [
+        (r"status of my order", [("query_customer_database", {"query": "SELECT * FROM orders WHERE id = 12345"})]),
+        (r"in stock", [("check_inventory", {"product_id": "PROD-001"})]),
+        (r"refund", [
+            ("query_customer_database", {"query": "SELECT * FROM orders WHERE id = 67890"}),
+            ("check_inventory", {"product_id": "PROD-002"}),
+            ("process_refund", {"order_id": "67890", "amount": 49.99, "reason": "Item damaged"}),
+        ]),
+    ],
+    "financial_transfer": [
+        (r"balance", [("get_account_balance", {"account_id": "ACC-001"})]),
+        (r"transfer", [("transfer_funds", {"from_account": "ACC-001", "to_account": "ACC-002", "amount": 250})]),
+    ],
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# AGENT DRIVERS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Blocked(Exception):
+    """The (fake) proxy refused the request."""
+
+
+def _raise_in_band_error(response: str):
+    if response.startswith("Error:"):
+        raise (Blocked if "blocked" in response.lower() else RuntimeError)(response)
+
+
+def _customer_support(module, prompt):
+    _raise_in_band_error(module.chat(prompt))
+
+
+def _prompt_security(module, prompt):
+    module.send_prompt(prompt)
+
+
+def _financial_transfer(module, prompt):
+    module.get_agent_executor().invoke({"input": prompt})
+
+
+# name -> (module, driver, tools attribute)
+AGENTS = {
+    "customer_support": ("customer_support_agent", _customer_support, "TOOLS"),
+    "prompt_security": ("prompt_security_agent", _prompt_security, "TOOLS"),
+    "financial_transfer": ("financial_transfer_agent", _financial_transfer, "tools"),
+}
+
+
+def prompt_pool(module) -> list:
+    """(suite, prompt) pairs an agent's own tests send."""
+    if hasattr(module, "PROMPT_SUITES"):
+        return [(suite, p) for suite, prompts in module.PROMPT_SUITES.items() for p in prompts]
+    return [("policy_prompts", p) for p in module.TEST_PROMPTS]
+
+
+class ToolTimer:
+    """Wraps tool functions to record per-tool latency."""
+
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def wrap(self, tool):
+        func = tool.func
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.samples[tool.name].append(time.perf_counter() - started)
+
+        tool.func = timed
+
+
+def install_fake_models(names, args, tool_timer) -> dict:
+    """Import each agent, swap in a FakeChatModel and instrument its tools."""
+    import importlib
+
+    agents = {}
+    for name in names:
+        module_name, driver, tools_attr = AGENTS[name]
+        module = importlib.import_module(module_name)
+        if args.script:
+            script = ToolScript.from_json(args.script, name)
+        else:
+            script = ToolScript(DEFAULT_SCRIPTS.get(name, []))
+        module._llm = fake_model(
+            latency=args.latency,
+            token_latency=args.token_latency,
+            script=script,
+            block_patterns=args.block or (),
+            seed=args.seed,
+        )
+        for attr in ("_agent", "_agent_executor", "_llm_with_tools", "_resilient_llm"):
+            if hasattr(module, attr):
+                setattr(module, attr, None)
+        if hasattr(module, "get_agent_executor"):
+            module.get_agent_executor().verbose = False
+        for tool in getattr(module, tools_attr, []):
+            tool_timer.wrap(tool)
+        agents[name] = (module, driver, prompt_pool(module))
+    return agents
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LOAD GENERATION
+# ═══════════════════════════════════════════════════════════════════════════
+
+def request_plan(agents, weights, attack_share, seed):
+    """Deterministic request i -> (agent, suite, prompt) under the weighted mix."""
+    names = list(agents)
+    agent_weights = [weights.get(name, 1.0) for name in names]
+
+    def plan(i):
+        rng = random.Random(zlib.crc32(f"{seed}:{i}".encode()))
+        name = rng.choices(names, agent_weights)[0]
+        pool = agents[name][2]
+        legitimate = [item for item in pool if "legitimate" in item[0]]
+        attacks = [item for item in pool if "legitimate" not in item[0]]
+        if legitimate and attacks and attack_share is not None:
+            pool = attacks if rng.random() < attack_share else legitimate
+        suite, prompt = rng.choice(pool)
+        return name, suite, prompt
+
+    return plan
+
+
+def run_request(agents, plan, i, scheduled):
+    name, suite, prompt = plan(i)
+    module, driver, _ = agents[name]
+    set_request_id(i)
+    outcome = "ok"
+    try:
+        driver(module, prompt)
+    except Blocked:
+        outcome = "blocked"
+    except Exception as e:
+        outcome = "blocked" if "blocked" in str(e).lower() else "error"
+    finished = time.perf_counter()
+    return name, suite, finished - scheduled, model_seconds(), outcome, finished
+
+
+def closed_loop(agents, plan, concurrency, requests, duration):
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration if duration else None
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            i = next(counter)
+            if (requests and i >= requests) or (deadline and time.perf_counter() >= deadline):
+                return
+            result = run_request(agents, plan, i, time.perf_counter())
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def open_loop(agents, plan, rps, requests, duration, max_workers):
+    total = requests or int(rps * duration)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(run_request, agents, plan, i, scheduled))
+        return [future.result() for future in futures]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REPORT
+# ═══════════════════════════════════════════════════════════════════════════
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(q * len(sorted_values) + 0.5) - 1))]
+
+
+def summarize(values) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+    }
+
+
+def build_report(results, tool_timer, wall_seconds, config) -> dict:
+    by_agent = collections.defaultdict(list)
+    for result in results:
+        by_agent[result[0]].append(result)
+    agents = {}
+    for name, rows in sorted(by_agent.items()):
+        outcomes = collections.Counter(row[4] for row in rows)
+        agents[name] = {
+            "throughput_rps": round(len(rows) / wall_seconds, 2),
+            "outcomes": dict(outcomes),
+            "latency": summarize(row[2] for row in rows),
+            "non_model": summarize(max(row[2] - row[3], 0.0) for row in rows),
+        }
+    return {
+        "config": config,
+        "requests": len(results),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(results) / wall_seconds, 2),
+        "agents": agents,
+        "tools": {name: summarize(samples) for name, samples in sorted(tool_timer.samples.items())},
+    }
+
+
+def print_report(report):
+    print("=" * 86)
+    print(f"{report['requests']} requests in {report['wall_seconds']:.2f}s "
+          f"({report['throughput_rps']:.1f} req/s)  {report['config']}")
+    print("=" * 86)
+    header = f"{'':<22} {'count':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'non-model p50':>14}"
+    print(header)
+    for name, stats in report["agents"].items():
+        latency = stats["latency"]
+        print(f"{name:<22} {latency['count']:>7} {stats['throughput_rps']:>8.1f} {latency['p50_ms']:>9.2f} "
+              f"{latency['p95_ms']:>9.2f} {latency['p99_ms']:>9.2f} {stats['non_model']['p50_ms']:>14.3f}")
+        print(f"{'':<22} outcomes: {stats['outcomes']}")
+    if report["tools"]:
+        print("-" * 86)
+        for name, stats in report["tools"].items():
+            print(f"{'tool ' + name:<22} {stats['count']:>7} {'':>8} {stats['p50_ms']:>9.3f} "
+                  f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+
+
+def parse_weights(text: str) -> dict:
+    weights = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in AGENTS:
+            raise SystemExit(f"unknown agent {name!r}; choose from {', '.join(AGENTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent load test against an in-process fake model")
+    parser.add_argument("--agents", default=",".join(AGENTS), help="name[=weight],... (default: all, equal)")
+    parser.add_argument("--attack-share", type=float, help="fraction of attack prompts where an agent has both")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=8, help="closed loop with this many workers")
+    mode.add_argument("--rps", type=float, help="open loop at this arrival rate")
+    parser.add_argument("--requests", type=int, help="total requests (default 1000 unless --duration)")
+    parser.add_argument("--duration", type=float, help="run for this many seconds")
+    parser.add_argument("--max-workers", type=int, default=256, help="thread cap in open-loop mode")
+    parser.add_argument("--latency", default="lognormal:50:0.3", help="model latency spec (ms)")
+    parser.add_argument("--token-latency", help="per-token latency spec for streaming calls (ms)")
+    parser.add_argument("--script", help="JSON tool-call script (default: built-in scripts)")
+    parser.add_argument("--block", action="append", help="regex of prompts the fake proxy blocks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        args.requests = 1000
+
+    weights = parse_weights(args.agents)
+    tool_timer = ToolTimer()
+    agents = install_fake_models(list(weights), args, tool_timer)
+    plan = request_plan(agents, weights, args.attack_share, args.seed)
+
+    started = time.perf_counter()
+    if args.rps:
+        results = open_loop(agents, plan, args.rps, args.requests, args.duration, args.max_workers)
+    else:
+        results = closed_loop(agents, plan, args.concurrency, args.requests, args.duration)
+    wall = (max(r[5] for r in results) if results else time.perf_counter()) - started
+
+    config = {"mode": f"rps={args.rps}" if args.rps else f"concurrency={args.concurrency}",
+              "latency": args.latency, "seed": args.seed}
+    report = build_report(results, tool_timer, wall, config)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
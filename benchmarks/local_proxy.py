@@ -0,0 +1,324 @@
+"""
+Local PRAQTOR X Proxy
+=====================
+Offline, OpenAI-compatible stand-in for PRAQTOR_PROXY_URL.
+
+Implements the parts of the API the governed agents use, over stdlib asyncio
+HTTP/1.1 with keep-alive (framing shared with the support server, http11.py):
+
+- POST /v1/chat/completions   plain JSON or SSE streaming (``"stream": true``)
+- GET  /v1/models, /health, /stats
+
+Replies are deterministic. When the request offers ``tools`` and no tool
+results follow the last user message, the model "calls" the tools whose
+names share a word with that message (arguments are filled from each tool's
+JSON schema and the message text); otherwise it answers in text. Agents that
+parse ReAct output get a ``Final Answer:`` line.
+
+Prompts matching a block rule get the proxy's 403 policy error, which the
+OpenAI SDK raises as PermissionDeniedError into the agents' ``except``
+branches. Rules can be scoped to ``X-Praqtor-Agent-ID`` values, and the
+stats endpoint breaks requests down per agent.
+
+    python benchmarks/local_proxy.py --port 8787 --latency lognormal:300:0.4
+    PRAQTOR_PROXY_URL=http://127.0.0.1:8787/v1 python customer_support_agent.py
+
+Block rules file: ``[{"id": "P7-01", "pattern": "credit card", "agents": ["..."]}]``
+(``agents`` is optional and defaults to every agent).
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import http11  # noqa: E402
+from latency import LatencyDistribution  # noqa: E402
+
+
+MAX_BODY_BYTES = 4 * 1024 * 1024
+KEEPALIVE_TIMEOUT = 30.0
+
+# Same P-rule families the agents' test suites exercise
+DEFAULT_RULES = [
+    {"id": "P1-01", "pattern": r"ignore (all )?(previous|prior) instructions|developer mode|</s>"},
+    {"id": "P2-01", "pattern": r"\bDAN\b|do anything now|no (content )?restrictions|no rules"},
+    {"id": "P3-01", "pattern": r"system prompt|configuration settings|api keys?"},
+    {"id": "P6-01", "pattern": r"(bypass|skip) (authentication|security)|superuser|disable the firewall"},
+    {"id": "P7-01", "pattern": r"social security|credit card numbers|(admin|database|employee) passwords?"},
+    {"id": "P10-08", "pattern": r"\bI am the (CEO|CFO|CTO)\b|ADMIN OVERRIDE|this is IT security"},
+]
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+ID_RE = re.compile(r"\b[A-Z]{2,}-?\d+\b")
+NUMBER_RE = re.compile(r"\$?(\d+(?:\.\d+)?)")
+
+
+class BlockRule:
+    def __init__(self, id: str, pattern: str, agents=None):
+        self.id = id
+        self.pattern = re.compile(pattern, re.I)
+        self.agents = set(agents) if agents else None
+
+    def matches(self, text: str, agent_id: str) -> bool:
+        if self.agents is not None and agent_id not in self.agents:
+            return False
+        return bool(self.pattern.search(text))
+
+
+def load_rules(path=None, defaults=True) -> list:
+    specs = list(DEFAULT_RULES) if defaults else []
+    if path:
+        with open(path) as f:
+            specs.extend(json.load(f))
+    return [BlockRule(spec["id"], spec["pattern"], spec.get("agents")) for spec in specs]
+
+
+def text_of(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MODEL
+# ═══════════════════════════════════════════════════════════════════════════
+
+def pick_tools(prompt: str, tools: list) -> list:
+    """Tools whose snake_case name shares a word of 4+ letters with the prompt."""
+    words = set(WORD_RE.findall(prompt.lower()))
+    picked = []
+    for tool in tools:
+        function = tool.get("function", {})
+        name_words = [w for w in function.get("name", "").lower().split("_") if len(w) >= 4]
+        if any(w in words or w.rstrip("s") in words for w in name_words):
+            picked.append(function)
+    return picked
+
+
+def fill_arguments(function: dict, prompt: str) -> dict:
+    """Values for each required parameter, taken from the prompt where possible."""
+    schema = function.get("parameters") or {}
+    properties = schema.get("properties", {})
+    ids = ID_RE.findall(prompt)
+    numbers = [float(n) for n in NUMBER_RE.findall(prompt)]
+    args = {}
+    for name in schema.get("required", list(properties)):
+        kind = properties.get(name, {}).get("type", "string")
+        if kind in ("number", "integer"):
+            value = numbers.pop(0) if numbers else 1
+            args[name] = int(value) if kind == "integer" else value
+        elif kind == "boolean":
+            args[name] = False
+        elif kind == "array":
+            args[name] = []
+        elif kind == "object":
+            args[name] = {}
+        else:
+            args[name] = ids.pop(0) if ids else prompt[:80]
+    return args
+
+
+def respond(messages: list, tools: list) -> dict:
+    """The assistant message for a conversation: tool calls or text."""
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    prompt = text_of(messages[last_user]) if last_user >= 0 else ""
+    tool_results = [m for m in messages[last_user + 1:] if m.get("role") == "tool"]
+    if tools and not tool_results:
+        calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": f["name"], "arguments": json.dumps(fill_arguments(f, prompt))},
+            }
+            for f in pick_tools(prompt, tools)
+        ]
+        if calls:
+            return {"role": "assistant", "content": None, "tool_calls": calls}
+
+    reply = "Thanks for reaching out. I've looked into this and everything is in order."
+    if tool_results:
+        reply = f"{reply} ({len(tool_results)} tool results considered)"
+    system = " ".join(text_of(m) for m in messages if m.get("role") == "system")
+    if "Final Answer" in system or "Final Answer" in prompt:
+        reply = f"Thought: I can answer directly.\nFinal Answer: {reply}"
+    return {"role": "assistant", "content": reply}
+
+
+def usage_for(messages: list, reply: dict) -> dict:
+    prompt_tokens = sum(len(text_of(m).split()) for m in messages)
+    completion_tokens = len((reply.get("content") or "").split()) + 8 * len(reply.get("tool_calls", []))
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LocalProxy:
+    def __init__(self, rules=None, latency="fixed:0", token_latency=None, seed=0,
+                 require_agent_id=False, keepalive_timeout=KEEPALIVE_TIMEOUT):
+        self.rules = rules if rules is not None else load_rules()
+        self.latency = LatencyDistribution(latency)
+        self.token_latency = LatencyDistribution(token_latency) if token_latency else None
+        self.rng = random.Random(seed)
+        self.require_agent_id = require_agent_id
+        self.keepalive_timeout = keepalive_timeout
+        self.started = time.time()
+        self.stats = collections.defaultdict(collections.Counter)
+
+    async def serve(self, host="127.0.0.1", port=8787):
+        server = await asyncio.start_server(self._connection, host, port, limit=http11.MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    def check(self, messages: list, agent_id: str):
+        """The first block rule any user message breaks, or None."""
+        for message in messages:
+            if message.get("role") != "user":
+                continue
+            text = text_of(message)
+            for rule in self.rules:
+                if rule.matches(text, agent_id):
+                    return rule
+        return None
+
+    async def _connection(self, reader, writer):
+        await http11.serve_connection(reader, writer, self._route, self.keepalive_timeout, MAX_BODY_BYTES, error)
+
+    async def _route(self, writer, method, path, headers, body, keep_alive):
+        path = path.rstrip("/")
+        if path == "/health":
+            return await http11.send(writer, 200, {"status": "ok"}, keep_alive)
+        if path == "/stats":
+            return await http11.send(writer, 200, self.snapshot(), keep_alive)
+        if path == "/v1/models":
+            models = [{"id": m, "object": "model", "owned_by": "praqtor-local"}
+                      for m in ("gpt-4o-mini", "gpt-4o", "gpt-4")]
+            return await http11.send(writer, 200, {"object": "list", "data": models}, keep_alive)
+        if path != "/v1/chat/completions":
+            return await http11.send(writer, 404, error(f"no route for {path}"), keep_alive)
+        if method != "POST":
+            return await http11.send(writer, 405, error("use POST"), keep_alive, {"Allow": "POST"})
+
+        agent_id = headers.get("x-praqtor-agent-id", "")
+        stats = self.stats[agent_id or "(none)"]
+        stats["requests"] += 1
+        if self.require_agent_id and not agent_id:
+            stats["unauthorized"] += 1
+            return await http11.send(writer, 401, error("missing X-Praqtor-Agent-ID header",
+                                                        "authentication_error"), keep_alive)
+        try:
+            request = json.loads(body or b"{}")
+            messages = request["messages"]
+            if not isinstance(messages, list) or not messages:
+                raise ValueError("messages must be a non-empty list")
+        except (ValueError, KeyError, TypeError) as e:
+            stats["bad_requests"] += 1
+            return await http11.send(writer, 400, error(f"invalid request: {e}"), keep_alive)
+
+        rule = self.check(messages, agent_id)
+        if rule is not None:
+            stats["blocked"] += 1
+            stats[f"blocked:{rule.id}"] += 1
+            message = f"Request blocked by PRAQTOR X policy {rule.id} ({rule.pattern.pattern})"
+            return await http11.send(writer, 403, error(message, "policy_violation", rule.id), keep_alive)
+
+        await asyncio.sleep(self.latency.sample(self.rng))
+        reply = respond(messages, request.get("tools") or [])
+        stats["tool_calls"] += len(reply.get("tool_calls", []))
+        completion = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "system_fingerprint": "praqtor-local",
+        }
+        if request.get("stream"):
+            stats["streamed"] += 1
+            return await self._stream(writer, completion, reply, keep_alive)
+        finish = "tool_calls" if reply.get("tool_calls") else "stop"
+        completion.update(
+            object="chat.completion",
+            choices=[{"index": 0, "message": reply, "logprobs": None, "finish_reason": finish}],
+            usage=usage_for(messages, reply),
+        )
+        await http11.send(writer, 200, completion, keep_alive)
+
+    async def _stream(self, writer, completion, reply, keep_alive):
+        """Send the reply as chat.completion.chunk SSE events, chunked-encoded."""
+        writer.write(http11.response_head(200, {
+            "Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked", "Connection": "keep-alive" if keep_alive else "close",
+        }))
+
+        async def event(delta, finish=None):
+            chunk = dict(completion, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}])
+            await http11.write_chunk(writer, f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        await event({"role": "assistant", "content": ""})
+        if reply.get("tool_calls"):
+            await event({"tool_calls": [dict(call, index=i) for i, call in enumerate(reply["tool_calls"])]})
+            await event({}, "tool_calls")
+        else:
+            for token in re.findall(r"\S+\s*", reply["content"]):
+                if self.token_latency is not None:
+                    await asyncio.sleep(self.token_latency.sample(self.rng))
+                await event({"content": token})
+            await event({}, "stop")
+        await http11.write_chunk(writer, b"data: [DONE]\n\n")
+        await http11.write_chunk(writer, b"")
+
+    def snapshot(self) -> dict:
+        total = collections.Counter()
+        for counters in self.stats.values():
+            total.update(counters)
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "latency": self.latency.spec,
+            "rules": [rule.id for rule in self.rules],
+            "total": dict(total),
+            "agents": {agent: dict(counters) for agent, counters in self.stats.items()},
+        }
+
+
+def error(message: str, type: str = "invalid_request_error", code=None) -> dict:
+    """OpenAI error body, which the SDK turns into an APIStatusError message."""
+    return {"error": {"message": message, "type": type, "param": None, "code": code}}
+
+
+async def main(args):
+    rules = load_rules(args.rules, defaults=not args.no_default_rules)
+    proxy = LocalProxy(rules, latency=args.latency, token_latency=args.token_latency,
+                       seed=args.seed, require_agent_id=args.require_agent_id)
+    print(f"Local proxy on http://{args.host}:{args.port}/v1 "
+          f"({len(rules)} block rules, latency {args.latency})")
+    await proxy.serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible PRAQTOR X proxy")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", default="fixed:0", help="per-completion latency spec, e.g. lognormal:300:0.4")
+    parser.add_argument("--token-latency", help="per-token latency spec for streamed replies")
+    parser.add_argument("--rules", help="JSON file of extra block rules")
+    parser.add_argument("--no-default-rules", action="store_true", help="only apply rules from --rules")
+    parser.add_argument("--require-agent-id", action="store_true",
+                        help="reject requests without X-Praqtor-Agent-ID (401)")
+    parser.add_argument("--seed", type=int, default=0)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
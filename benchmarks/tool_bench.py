@@ -0,0 +1,322 @@
+"""
+Tool Micro-Benchmarks
+=====================
+Per-call cost of every offline tool function, with stored baselines.
+
+Each case calls one tool's underlying function in isolation (no agent, no
+LLM). After a warm-up, the call is repeated in timed rounds sized so that a
+round lasts at least ``--min-round-ms``; the per-call times of the rounds give
+min/median/mean/stdev/p95. A separate pass under tracemalloc records the
+peak and retained bytes of Python allocations for a single call, which shows tools that rebuild a
+database or a lookup table on every call.
+
+Tools that reach the network are not benchmarked. Tools that write files or
+run commands use a temporary directory and a harmless command.
+
+    python benchmarks/tool_bench.py                      # report only
+    python benchmarks/tool_bench.py --save               # refresh benchmarks/baselines/tools.json
+    python benchmarks/tool_bench.py --compare --threshold 0.25 check_inventory
+
+``--compare`` exits 1 when a tool's median time or peak allocation grows past
+the threshold relative to the baseline, or when a case in the baseline did
+not run (skipped or failed). Timings are machine-dependent, so refresh the
+baseline (and commit it) on the machine that runs the comparison; ``--save``
+only keeps older cases when they were recorded in the same environment.
+"""
+
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Files written by benchmarked tools land here
+SCRATCH_DIR = tempfile.mkdtemp(prefix="tool-bench-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, True)
+
+# case -> (agent module, tool attribute, keyword arguments)
+CASES = {
+    "customer_support.query_customer_database": (
+        "customer_support_agent", "query_customer_database",
+        {"query": "SELECT * FROM orders WHERE customer_id = 1"}),
+    "customer_support.send_customer_email": (
+        "customer_support_agent", "send_customer_email",
+        {"to_email": "jane@example.com", "subject": "Your order", "body": "It has shipped."}),
+    "customer_support.check_inventory": (
+        "customer_support_agent", "check_inventory", {"product_id": "PROD-002"}),
+    "customer_support.check_inventory_miss": (
+        "customer_support_agent", "check_inventory", {"product_id": "PROD-999"}),
+    "customer_support.check_inventory_batch": (
+        "customer_support_agent", "check_inventory", {"product_id": "PROD-001, PROD-002, PROD-003"}),
+    "customer_support.process_refund": (
+        "customer_support_agent", "process_refund",
+        {"order_id": "ORD-1001", "amount": 49.99, "reason": "damaged"}),
+    "customer_support.call_external_api": (
+        "customer_support_agent", "call_external_api",
+        {"endpoint": "https://api.example.com/v1/status", "data": {"id": 1}}),
+    "financial_transfer.transfer_funds": (
+        "financial_transfer_agent", "transfer_funds",
+        {"from_account": "ACC-001", "to_account": "ACC-002", "amount": 250.0}),
+    "financial_transfer.get_account_balance": (
+        "financial_transfer_agent", "get_account_balance", {"account_id": "ACC-001"}),
+    "financial_transfer.execute_sql": (
+        "financial_transfer_agent", "execute_sql", {"query": "SELECT 1"}),
+    "financial_transfer.generate_report": (
+        "financial_transfer_agent", "generate_report",
+        {"filename": os.path.relpath(os.path.join(SCRATCH_DIR, "report.txt"), "/tmp"),
+         "content": "Q3 summary\n" * 20}),
+    "financial_transfer.run_system_command": (
+        "financial_transfer_agent", "run_system_command", {"command": "true"}),
+    "faq_chatbot.search_knowledge_base": (
+        "faq_chatbot", "search_knowledge_base", {"query": "How long does shipping take?"}),
+    "faq_chatbot.search_knowledge_base_miss": (
+        "faq_chatbot", "search_knowledge_base", {"query": "Do you sell gift cards?"}),
+    "faq_chatbot.get_product_info": (
+        "faq_chatbot", "get_product_info", {"product_id": "PROD-001"}),
+    "data_extraction.run_shell_command": (
+        "data_extraction_agent", "run_shell_command", {"command": "true"}),
+    "data_extraction.write_file": (
+        "data_extraction_agent", "write_file",
+        {"content": "id,name\n1,Jane\n", "filepath": os.path.join(SCRATCH_DIR, "extract.csv")}),
+    "data_extraction.query_database": (
+        "data_extraction_agent", "query_database", {"sql": "SELECT id FROM customers"}),
+}
+
+
+def resolve(module_name: str, attr: str):
+    """The plain function behind a tool (``@tool`` objects expose it as ``.func``)."""
+    if os.path.join(REPO_ROOT, "langchain_agents") not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+        sys.path.insert(1, os.path.join(REPO_ROOT, "langchain_agents"))
+    module = __import__(module_name)
+    tool = getattr(module, attr)
+    return getattr(tool, "func", None) or tool
+
+
+def time_rounds(call, warmup: int, rounds: int, min_round_s: float) -> dict:
+    """Per-call seconds over ``rounds`` rounds, each at least ``min_round_s`` long."""
+    for _ in range(warmup):
+        call()
+    # Size rounds like timeit.autorange so short calls are not timer noise
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        if time.perf_counter() - started >= min_round_s or number >= 1_000_000:
+            break
+        number *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(number):
+                call()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+    return {
+        "calls_per_round": number,
+        "min_us": samples[0] * 1e6,
+        "median_us": statistics.median(samples) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+    }
+
+
+def trace_allocations(call, calls: int = 20) -> dict:
+    """Peak bytes allocated during one call and bytes retained per call."""
+    call()  # caches and lazy imports are not the tool's per-call cost
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        for _ in range(calls - 1):
+            call()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - before, "retained_bytes_per_call": max(0, after - before) // calls}
+
+
+def run(names, warmup=20, rounds=15, min_round_ms=20.0) -> dict:
+    results = {}
+    for name in names:
+        module_name, attr, kwargs = CASES[name]
+        try:
+            func = resolve(module_name, attr)
+        except ImportError as e:
+            results[name] = {"status": "skipped", "detail": f"{type(e).__name__}: {e}"}
+            continue
+        call = lambda: func(**kwargs)
+        try:
+            result = time_rounds(call, warmup, rounds, min_round_ms / 1000)
+            result.update(trace_allocations(call))
+        except Exception as e:
+            results[name] = {"status": "error", "detail": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = {"status": "ok", **{k: round(v, 3) if isinstance(v, float) else v
+                                            for k, v in result.items()}}
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, alloc_threshold: float,
+            min_delta_us: float = 1.0) -> list:
+    """(case, metric, baseline, current, change) for every regression past a threshold.
+
+    Time regressions smaller than ``min_delta_us`` in absolute terms are timer
+    noise on sub-microsecond tools and are not reported.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline["results"].get(name)
+        if current.get("status") != "ok" or not base or base.get("status") != "ok":
+            continue
+        for metric, limit in (("median_us", threshold), ("peak_bytes", alloc_threshold)):
+            if not base[metric]:
+                continue
+            change = current[metric] / base[metric] - 1
+            current.setdefault("change", {})[metric] = round(change, 3)
+            if metric == "median_us" and current[metric] - base[metric] < min_delta_us:
+                continue
+            if change > limit:
+                regressions.append((name, metric, base[metric], current[metric], change))
+    return regressions
+
+
+def unmeasured(results: dict, baseline: dict) -> list:
+    """Selected cases with a baseline that did not produce a measurement this run."""
+    return [
+        name for name, current in results.items()
+        if current.get("status") != "ok" and baseline["results"].get(name, {}).get("status") == "ok"
+    ]
+
+
+def save_baseline(path: str, results: dict) -> bool:
+    """Write ``results`` as the baseline at ``path``.
+
+    Cases that were not run this time are kept from the existing file only
+    when it was recorded in this environment; returns False when they were
+    dropped because it was not.
+    """
+    saved = {}
+    same_environment = True
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        same_environment = previous.get("environment") == environment()
+        if same_environment:
+            saved = previous.get("results", {})
+    saved.update({name: {k: v for k, v in r.items() if k != "change"}
+                  for name, r in results.items() if r["status"] == "ok"})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": saved}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return same_environment
+
+
+def print_report(results: dict, regressions=()):
+    regressed = {(name, metric) for name, metric, *_ in regressions}
+    print(f"{'tool':<44} {'median us':>10} {'p95 us':>9} {'stdev':>8} {'peak B':>9} {'kept B':>7}")
+    print("-" * 92)
+    for name, r in results.items():
+        if r["status"] != "ok":
+            print(f"{name:<44} {r['status']}: {r['detail']}")
+            continue
+        change = r.get("change", {})
+        flags = " ".join(
+            f"{metric.split('_')[0]} {change[metric]:+.0%}{' REGRESSED' if (name, metric) in regressed else ''}"
+            for metric in ("median_us", "peak_bytes") if metric in change
+        )
+        print(f"{name:<44} {r['median_us']:>10.1f} {r['p95_us']:>9.1f} {r['stdev_us']:>8.1f} "
+              f"{r['peak_bytes']:>9} {r['retained_bytes_per_call']:>7}  {flags}")
+    if regressions:
+        print("-" * 92)
+        for name, metric, base, current, change in regressions:
+            print(f"REGRESSION {name} {metric}: {base} -> {current} ({change:+.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark the agents' tool functions")
+    parser.add_argument("cases", nargs="*", help="regexes selecting cases (default: all)")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls before measuring")
+    parser.add_argument("--rounds", type=int, default=15, help="timed rounds per tool")
+    parser.add_argument("--min-round-ms", type=float, default=20.0, help="minimum duration of a round")
+    parser.add_argument("--baseline", default="tools", help="baseline name under benchmarks/baselines/")
+    parser.add_argument("--save", action="store_true", help="write the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median time growth (0.25 = 25%%)")
+    parser.add_argument("--min-delta-us", type=float, default=1.0,
+                        help="ignore time regressions smaller than this many microseconds")
+    parser.add_argument("--alloc-threshold", type=float, default=0.10, help="allowed peak allocation growth")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if not args.cases or any(re.search(p, name) for p in args.cases)]
+    if args.list or not names:
+        print("\n".join(names or CASES))
+        sys.exit(0 if names else 2)
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-tool-benchmark")
+    results = run(names, warmup=args.warmup, rounds=args.rounds, min_round_ms=args.min_round_ms)
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+
+    regressions = []
+    missing = []
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            parser.error(f"no baseline at {baseline_path}; run with --save first")
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print(f"warning: baseline recorded on {baseline.get('environment')}", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold, args.alloc_threshold,
+                              args.min_delta_us)
+        missing = unmeasured(results, baseline)
+        for name in missing:
+            print(f"warning: {name} has a baseline but was not measured: {results[name]['detail']}",
+                  file=sys.stderr)
+
+    if args.save and not save_baseline(baseline_path, results):
+        print(f"warning: {baseline_path} was recorded in another environment; "
+              "cases not run this time were dropped from it", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"results": results, "regressions": regressions, "unmeasured": missing}, indent=2))
+    else:
+        print_report(results, regressions)
+    failed = regressions or missing or any(r["status"] == "error" for r in results.values())
+    sys.exit(1 if failed else 0)
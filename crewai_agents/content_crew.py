@@ -5,73 +5,315 @@ CrewAI multi-agent system for content creation and publishing.
 RISK: MEDIUM - Can publish content externally but no financial access.
 """
 
-from crewai import Agent, Task, Crew, Process
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
-
-
-llm = ChatOpenAI(model="gpt-4", temperature=0.7)
-search_tool = SerperDevTool()
-
-
-# Agents
-researcher = Agent(
-    role="Content Researcher",
-    goal="Research topics thoroughly for accurate content",
-    backstory="Investigative journalist with fact-checking expertise",
-    tools=[search_tool],
-    llm=llm,
-    verbose=True
-)
-
-writer = Agent(
-    role="Content Writer",
-    goal="Create engaging, well-structured content",
-    backstory="Award-winning copywriter and blogger",
-    tools=[],
-    llm=llm,
-    verbose=True
-)
-
-editor = Agent(
-    role="Editor",
-    goal="Polish content and ensure quality standards",
-    backstory="Senior editor with 15 years at major publications",
-    tools=[],
-    llm=llm,
-    verbose=True
-)
-
-# Tasks
-research_task = Task(
-    description="Research the topic: {topic}",
-    expected_output="Comprehensive research notes with sources",
-    agent=researcher
-)
-
-writing_task = Task(
-    description="Write a blog post based on research",
-    expected_output="1000-word blog post",
-    agent=writer,
-    context=[research_task]
-)
-
-editing_task = Task(
-    description="Edit and polish the blog post",
-    expected_output="Final edited blog post ready for publication",
-    agent=editor,
-    context=[writing_task]
-)
-
-# Crew
-content_crew = Crew(
-    agents=[researcher, writer, editor],
-    tasks=[research_task, writing_task, editing_task],
-    process=Process.sequential,
-    verbose=True
-)
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import queue
+import re
+import threading
+import time
+
+
+# crewai, crewai_tools and langchain_openai take seconds to import, so they
+# are imported where the crew is built and the shared clients on first use
+_llm = None
+_search_tool = None
+_content_crew = None
+_init_lock = threading.RLock()
+
+
+def get_llm():
+    global _llm
+    with _init_lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+
+            _llm = ChatOpenAI(model="gpt-4", temperature=0.7)
+        return _llm
+
+
+def get_search_tool():
+    global _search_tool
+    with _init_lock:
+        if _search_tool is None:
+            from crewai_tools import SerperDevTool
+
+            _search_tool = SerperDevTool()
+        return _search_tool
+
+
+def build_content_crew(verbose=True):
+    """Build an independent researcher/writer/editor crew.
+
+    Each crew gets its own agents and tasks, since CrewAI keeps run state on
+    them, while the LLM client and search tool are shared module-wide.
+    """
+    from crewai import Agent, Task, Crew, Process
+
+    llm = get_llm()
+
+    # Agents
+    researcher = Agent(
+        role="Content Researcher",
+        goal="Research topics thoroughly for accurate content",
+        backstory="Investigative journalist with fact-checking expertise",
+        tools=[get_search_tool()],
+        llm=llm,
+        verbose=verbose
+    )
+
+    writer = Agent(
+        role="Content Writer",
+        goal="Create engaging, well-structured content",
+        backstory="Award-winning copywriter and blogger",
+        tools=[],
+        llm=llm,
+        verbose=verbose
+    )
+
+    editor = Agent(
+        role="Editor",
+        goal="Polish content and ensure quality standards",
+        backstory="Senior editor with 15 years at major publications",
+        tools=[],
+        llm=llm,
+        verbose=verbose
+    )
+
+    # Tasks
+    research_task = Task(
+        description="Research the topic: {topic}",
+        expected_output="Comprehensive research notes with sources",
+        agent=researcher
+    )
+
+    writing_task = Task(
+        description="Write a blog post based on research",
+        expected_output="1000-word blog post",
+        agent=writer,
+        context=[research_task]
+    )
+
+    editing_task = Task(
+        description="Edit and polish the blog post",
+        expected_output="Final edited blog post ready for publication",
+        agent=editor,
+        context=[writing_task]
+    )
+
+    # Crew
+    return Crew(
+        agents=[researcher, writer, editor],
+        tasks=[research_task, writing_task, editing_task],
+        process=Process.sequential,
+        verbose=verbose
+    )
+
+
+def get_content_crew():
+    global _content_crew
+    with _init_lock:
+        if _content_crew is None:
+            _content_crew = build_content_crew()
+        return _content_crew
+
+
+def __getattr__(name):
+    factories = {"llm": get_llm, "search_tool": get_search_tool, "content_crew": get_content_crew}
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _run_topic(topic: str) -> dict:
+    started = time.monotonic()
+    try:
+        result = build_content_crew(verbose=False).kickoff(inputs={"topic": topic})
+        return {"topic": topic, "result": result, "error": None,
+                "seconds": time.monotonic() - started}
+    except Exception as e:
+        return {"topic": topic, "result": None, "error": e,
+                "seconds": time.monotonic() - started}
+
+
+def kickoff_batch(topics, max_workers=4):
+    """Run one crew per topic concurrently and yield each article as it finishes.
+
+    ``topics`` may be any iterable, including a lazy queue reader; at most
+    ``max_workers`` crews run at once and only that many topics are pulled
+    ahead. Yields dicts with ``topic``, ``result``, ``error`` and ``seconds``
+    in completion order.
+    """
+    topics = iter(topics)
+    exhausted = object()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        for topic in topics:
+            pending.add(pool.submit(_run_topic, topic))
+            if len(pending) >= max_workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                topic = next(topics, exhausted)
+                if topic is not exhausted:
+                    pending.add(pool.submit(_run_topic, topic))
+
+
+def _parse_outline(text: str) -> list:
+    """Turn the researcher's outline into a list of section titles.
+
+    When any line is a list item or heading, only those lines are titles, so
+    a preamble such as "Here is the outline:" is dropped. Unmarked lines
+    ending in a colon are treated as preamble too.
+    """
+    marked, unmarked = [], []
+    for line in text.splitlines():
+        match = re.match(r"^\s*(?:[-*#]+|\d+[.)])\s*", line)
+        title = line[match.end():].strip() if match else line.strip()
+        if not title:
+            continue
+        if match:
+            marked.append(title)
+        elif not title.endswith(":"):
+            unmarked.append(title)
+    return marked or unmarked
+
+
+def _pipeline_stage(work, inbox, outbox, errors):
+    """Apply ``work`` to each (index, title, text) item until the None sentinel."""
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        if errors:
+            continue  # keep draining so upstream never blocks after a failure
+        index, title, text = item
+        try:
+            outbox.put((index, title, work(title, text)))
+        except Exception as e:
+            errors.append(e)
+    outbox.put(None)
+
+
+def kickoff_pipelined(topic: str, verbose=False, on_section=None, buffer_sections=2) -> str:
+    """Write one article with section-by-section handoff between the agents.
+
+    The researcher produces an outline and then researches it section by
+    section; the writer drafts each section as soon as its notes arrive and
+    the editor polishes each draft while the writer moves on. A final
+    consistency pass by the editor runs over the assembled article.
+    ``on_section(index, title, text)`` receives each edited section as soon
+    as it is ready.
+    """
+    from crewai import Task
+
+    researcher, writer, editor = build_content_crew(verbose=verbose).agents
+
+    outline = Task(
+        description=(
+            f"Plan a blog post about: {topic}. List 4 to 6 section titles, "
+            "one per line, with no other text."
+        ),
+        expected_output="Section titles, one per line",
+        agent=researcher,
+    ).execute_sync().raw
+    titles = _parse_outline(outline)
+
+    def research(title, _):
+        return Task(
+            description=f"Research the section '{title}' of a blog post about: {topic}",
+            expected_output="Research notes with sources for this section",
+            agent=researcher,
+        ).execute_sync().raw
+
+    def write(title, notes):
+        return Task(
+            description=(
+                f"Write the section '{title}' of a blog post about {topic}, "
+                "based on the research notes"
+            ),
+            expected_output="One blog post section of roughly 200 words",
+            agent=writer,
+        ).execute_sync(context=notes).raw
+
+    def edit(title, draft):
+        return Task(
+            description=f"Edit and polish the section '{title}'",
+            expected_output="The edited section",
+            agent=editor,
+        ).execute_sync(context=draft).raw
+
+    # Bounded queues keep a fast stage from running far ahead of the next one
+    titles_q = queue.Queue()
+    notes_q = queue.Queue(maxsize=buffer_sections)
+    drafts_q = queue.Queue(maxsize=buffer_sections)
+    edited_q = queue.Queue()
+    errors = []
+    stages = [
+        threading.Thread(target=_pipeline_stage, args=(research, titles_q, notes_q, errors)),
+        threading.Thread(target=_pipeline_stage, args=(write, notes_q, drafts_q, errors)),
+        threading.Thread(target=_pipeline_stage, args=(edit, drafts_q, edited_q, errors)),
+    ]
+    for stage in stages:
+        stage.start()
+    for index, title in enumerate(titles):
+        titles_q.put((index, title, None))
+    titles_q.put(None)
+
+    sections = []
+    while True:
+        item = edited_q.get()
+        if item is None:
+            break
+        sections.append(item)
+        if on_section is not None:
+            on_section(*item)
+    for stage in stages:
+        stage.join()
+    if errors:
+        raise errors[0]
+
+    draft = "\n\n".join(f"## {title}\n\n{text}" for _, title, text in sorted(sections))
+    return Task(
+        description=(
+            f"Do a final consistency pass over this blog post about {topic}: "
+            "smooth transitions, remove repetition and keep terminology consistent"
+        ),
+        expected_output="Final edited blog post ready for publication",
+        agent=editor,
+    ).execute_sync(context=draft).raw
 
 
 if __name__ == "__main__":
-    result = content_crew.kickoff(inputs={"topic": "AI Security Best Practices"})
-    print(result)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the content crew")
+    parser.add_argument("topics", nargs="*", help="topics to write about")
+    parser.add_argument("--topics-file", help="file with one topic per line")
+    parser.add_argument("--workers", type=int, default=4, help="max concurrent crews")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="hand off between agents section by section")
+    args = parser.parse_args()
+
+    topics = list(args.topics)
+    if args.topics_file:
+        with open(args.topics_file) as f:
+            topics.extend(line.strip() for line in f if line.strip())
+    if args.pipelined and len(topics) > 1:
+        parser.error("--pipelined writes a single topic; pass one topic or drop --pipelined")
+
+    if len(topics) <= 1:
+        topic = topics[0] if topics else "AI Security Best Practices"
+        if args.pipelined:
+            result = kickoff_pipelined(
+                topic, on_section=lambda i, title, _: print(f"[section {i + 1} ready] {title}")
+            )
+        else:
+            result = get_content_crew().kickoff(inputs={"topic": topic})
+        print(result)
+    else:
+        for article in kickoff_batch(topics, max_workers=args.workers):
+            status = f"ERROR: {article['error']}" if article["error"] else "done"
+            print(f"\n=== {article['topic']} ({status}, {article['seconds']:.1f}s) ===")
+            if article["result"] is not None:
+                print(article["result"])
@@ -5,18 +5,73 @@ CrewAI multi-agent system for financial analysis and trading.
 RISK: CRITICAL - Can execute trades and access financial data.
 """
 
-from crewai import Agent, Task, Crew, Process
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool
-from langchain_openai import ChatOpenAI
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
 import os
+import re
+import threading
+
+from order_book import OrderBook
+from page_cache import PageCache
+from portfolio_store import PortfolioStore
+
+
+# crewai, crewai_tools and langchain take seconds to import, so the LLM,
+# tools and crew are built on first use rather than at import time
+_llm = None
+_search_tool = None
+_scrape_tool = None
+_portfolio_risk_tool = None
+_financial_crew = None
+_init_lock = threading.RLock()
 
 
 # Initialize LLM
-llm = ChatOpenAI(model="gpt-4", temperature=0)
+def get_llm():
+    global _llm
+    with _init_lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+
+            _llm = ChatOpenAI(model="gpt-4", temperature=0)
+        return _llm
+
 
 # Tools
-search_tool = SerperDevTool()
-scrape_tool = ScrapeWebsiteTool()
+page_cache = PageCache(
+    cache_dir=os.getenv("FINANCIAL_PAGE_CACHE_DIR"),
+    ttl=float(os.getenv("FINANCIAL_PAGE_CACHE_TTL", "900")),
+)
+
+
+def get_search_tool():
+    global _search_tool
+    with _init_lock:
+        if _search_tool is None:
+            from crewai_tools import SerperDevTool
+
+            _search_tool = SerperDevTool()
+        return _search_tool
+
+
+def get_scrape_tool():
+    global _scrape_tool
+    with _init_lock:
+        if _scrape_tool is None:
+            from crewai_tools import ScrapeWebsiteTool
+
+            class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+                """ScrapeWebsiteTool that fetches and parses each URL once via the shared page cache."""
+
+                def _run(self, **kwargs):
+                    url = kwargs.get("website_url", self.website_url)
+                    fetch = functools.partial(ScrapeWebsiteTool._run, self, **kwargs)
+                    if not url:
+                        return fetch()
+                    return page_cache.get(url, fetch)
+
+            _scrape_tool = CachedScrapeWebsiteTool()
+        return _scrape_tool
 
 
 # Custom dangerous tools
@@ -25,74 +80,282 @@ def execute_trade(symbol: str, action: str, quantity: int) -> str:
     return f"EXECUTED: {action} {quantity} shares of {symbol}"
 
 
+# The trader only proposes trades and the risk manager approves them; the
+# approved trades of a run are then submitted as one batch, netted per symbol
+order_book = OrderBook(execute_trade, window=float(os.getenv("FINANCIAL_ORDER_WINDOW", "0.5")))
+
+# "TRADE: BUY 100 AAPL" from the trader, "APPROVED: BUY 100 AAPL" from the risk manager
+_TRADE_LINE_RE = r"^\W*{marker}\W*(BUY|SELL)\s+(\d+)\s+(?:shares\s+of\s+)?\$?([A-Za-z][A-Za-z.\-]*)"
+
+
+def parse_trades(text: str, marker: str = "TRADE") -> list:
+    """(symbol, action, quantity) for every ``MARKER: ACTION QTY SYMBOL`` line in ``text``."""
+    pattern = re.compile(_TRADE_LINE_RE.format(marker=re.escape(marker)), re.I | re.M)
+    return [(symbol.upper(), action.upper(), int(quantity))
+            for action, quantity, symbol in pattern.findall(text or "")
+            if int(quantity) > 0]
+
+
+def approved_trades(proposed: str, review: str) -> list:
+    """Trades the risk manager approved, capped at what the trader proposed.
+
+    An approval for a trade that was never proposed (or for more shares than
+    proposed) is not executed beyond the proposal.
+    """
+    remaining = {}
+    for symbol, action, quantity in parse_trades(proposed, "TRADE"):
+        remaining[symbol, action] = remaining.get((symbol, action), 0) + quantity
+    approved = []
+    for symbol, action, quantity in parse_trades(review, "APPROVED"):
+        quantity = min(quantity, remaining.get((symbol, action), 0))
+        if quantity:
+            remaining[symbol, action] -= quantity
+            approved.append((symbol, action, quantity))
+    return approved
+
+
+def execute_approved(proposed: str, review: str, source: str = None) -> list:
+    """Submit the approved trades of one run as a single netted batch; returns the fills."""
+    trades = approved_trades(proposed, review)
+    return [future.result() for future in order_book.submit_batch(trades, source=source)]
+
+
 def transfer_funds(amount: float, destination: str) -> str:
     """Transfer funds to external account."""
     return f"TRANSFERRED: ${amount} to {destination}"
 
 
+# Simulated book; production would load positions and marks from the OMS
+portfolio_store = PortfolioStore.from_positions(
+    [
+        ("ACC-001", "AAPL", 100), ("ACC-001", "GOOGL", 50), ("ACC-001", "MSFT", 75),
+        ("ACC-002", "NVDA", 400), ("ACC-002", "AAPL", 20),
+        ("ACC-003", "MSFT", 60), ("ACC-003", "GOOGL", 60), ("ACC-003", "AMZN", 60),
+    ],
+    prices={"AAPL": 190.0, "GOOGL": 140.0, "MSFT": 410.0, "NVDA": 880.0, "AMZN": 175.0},
+)
+
+
 def access_portfolio(account_id: str) -> str:
     """Access customer portfolio data."""
-    return f"Portfolio for {account_id}: AAPL: 100, GOOGL: 50, MSFT: 75"
+    return portfolio_store.account_summary(account_id)
 
 
-# Agents
-market_analyst = Agent(
-    role="Market Analyst",
-    goal="Analyze market trends and identify opportunities",
-    backstory="Expert financial analyst with 20 years experience",
-    tools=[search_tool, scrape_tool],
-    llm=llm,
-    verbose=True
-)
+def review_portfolio_risk(query: str = "") -> str:
+    """Summarize exposure, concentration and limit breaches across the whole book."""
+    return portfolio_store.book_summary(max_position_pct=0.25, max_gross=250000)
 
-trader = Agent(
-    role="Trader",
-    goal="Execute profitable trades based on analysis",
-    backstory="Experienced day trader specializing in tech stocks",
-    tools=[],  # Trade execution handled separately
-    llm=llm,
-    verbose=True
-)
 
-risk_manager = Agent(
-    role="Risk Manager", 
-    goal="Ensure all trades comply with risk limits",
-    backstory="Former hedge fund risk officer",
-    tools=[],
-    llm=llm,
-    verbose=True
-)
+def get_portfolio_risk_tool():
+    global _portfolio_risk_tool
+    with _init_lock:
+        if _portfolio_risk_tool is None:
+            from langchain_core.tools import Tool
 
-# Tasks
-analysis_task = Task(
-    description="Analyze current market conditions for {sector} sector",
-    expected_output="Detailed market analysis with buy/sell recommendations",
-    agent=market_analyst
-)
+            _portfolio_risk_tool = Tool(
+                name="PortfolioRisk",
+                func=review_portfolio_risk,
+                description="Book-wide exposure, concentration and limit breach summary"
+            )
+        return _portfolio_risk_tool
 
-trading_task = Task(
-    description="Execute recommended trades based on analysis",
-    expected_output="Trade execution confirmation",
-    agent=trader,
-    context=[analysis_task]
-)
 
-risk_task = Task(
-    description="Review trades for compliance with risk limits",
-    expected_output="Risk assessment and approval status",
-    agent=risk_manager,
-    context=[trading_task]
-)
+def build_agents(verbose=True):
+    """Create the analyst, trader and risk manager agents.
 
-# Crew
-financial_crew = Crew(
-    agents=[market_analyst, trader, risk_manager],
-    tasks=[analysis_task, trading_task, risk_task],
-    process=Process.sequential,
-    verbose=True
+    Agents keep per-run executor state, so concurrent runs need their own
+    instances; the LLM client and tools are shared.
+    """
+    from crewai import Agent
+
+    llm = get_llm()
+
+    market_analyst = Agent(
+        role="Market Analyst",
+        goal="Analyze market trends and identify opportunities",
+        backstory="Expert financial analyst with 20 years experience",
+        tools=[get_search_tool(), get_scrape_tool()],
+        llm=llm,
+        verbose=verbose
+    )
+
+    trader = Agent(
+        role="Trader",
+        goal="Execute profitable trades based on analysis",
+        backstory="Experienced day trader specializing in tech stocks",
+        tools=[],  # Trade execution handled separately, after the risk review
+        llm=llm,
+        verbose=verbose
+    )
+
+    risk_manager = Agent(
+        role="Risk Manager",
+        goal="Ensure all trades comply with risk limits",
+        backstory="Former hedge fund risk officer",
+        tools=[get_portfolio_risk_tool()],
+        llm=llm,
+        verbose=verbose
+    )
+    return market_analyst, trader, risk_manager
+
+
+TRADING_DESCRIPTION = (
+    "Propose trades for the {sector} sector based on the analysis. Do not execute them: "
+    "list each one on its own line as 'TRADE: BUY|SELL <quantity> <SYMBOL>'"
 )
+TRADING_OUTPUT = "Proposed trades, one 'TRADE: BUY|SELL <quantity> <SYMBOL>' line each"
+RISK_DESCRIPTION = (
+    "Review the proposed trades for compliance with risk limits. Repeat every trade you "
+    "approve on its own line as 'APPROVED: BUY|SELL <quantity> <SYMBOL>'; only approved "
+    "trades are executed"
+)
+RISK_OUTPUT = "Risk assessment, with one 'APPROVED: BUY|SELL <quantity> <SYMBOL>' line per approved trade"
+
+
+def build_financial_crew(verbose=True):
+    """Build the sequential analysis -> trading -> risk crew.
+
+    The crew only proposes and reviews trades; run_financial_crew() executes
+    the approved ones once the risk task is done.
+    """
+    from crewai import Task, Crew, Process
+
+    market_analyst, trader, risk_manager = build_agents(verbose)
+
+    # Tasks
+    analysis_task = Task(
+        description="Analyze current market conditions for {sector} sector",
+        expected_output="Detailed market analysis with buy/sell recommendations",
+        agent=market_analyst
+    )
+
+    trading_task = Task(
+        description=TRADING_DESCRIPTION,
+        expected_output=TRADING_OUTPUT,
+        agent=trader,
+        context=[analysis_task]
+    )
+
+    risk_task = Task(
+        description=RISK_DESCRIPTION,
+        expected_output=RISK_OUTPUT,
+        agent=risk_manager,
+        context=[trading_task]
+    )
+
+    # Crew
+    return Crew(
+        agents=[market_analyst, trader, risk_manager],
+        tasks=[analysis_task, trading_task, risk_task],
+        process=Process.sequential,
+        verbose=verbose
+    )
+
+
+def get_financial_crew():
+    global _financial_crew
+    with _init_lock:
+        if _financial_crew is None:
+            _financial_crew = build_financial_crew()
+        return _financial_crew
+
+
+def run_financial_crew(sector: str = "technology") -> dict:
+    """Run the crew for ``sector``, then execute the trades the risk manager approved."""
+    crew = get_financial_crew()
+    result = crew.kickoff(inputs={"sector": sector})
+    trades, risk = (task.output.raw for task in crew.tasks[1:])
+    return {"sector": sector, "trades": trades, "risk": risk,
+            "fills": execute_approved(trades, risk, source=sector), "result": result}
+
+
+def __getattr__(name):
+    factories = {
+        "llm": get_llm,
+        "search_tool": get_search_tool,
+        "scrape_tool": get_scrape_tool,
+        "portfolio_risk_tool": get_portfolio_risk_tool,
+        "financial_crew": get_financial_crew,
+    }
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+GICS_SECTORS = [
+    "energy", "materials", "industrials", "consumer discretionary",
+    "consumer staples", "health care", "financials", "information technology",
+    "communication services", "utilities", "real estate",
+]
+
+
+def _analyze_sector(sector: str) -> str:
+    from crewai import Task
+
+    market_analyst, _, _ = build_agents(verbose=False)
+    return Task(
+        description=f"Analyze current market conditions for {sector} sector",
+        expected_output="Detailed market analysis with buy/sell recommendations",
+        agent=market_analyst
+    ).execute_sync().raw
+
+
+def analyze_sectors(sectors, max_workers=6, verbose=False):
+    """Run the analysis stage for many sectors in parallel.
+
+    Analysts share the content-addressed page cache, so each market page is
+    fetched and parsed once across all sectors. Trading and risk review stay
+    serialized: they run one sector at a time, in the order analyses finish,
+    and a sector's approved trades are executed after its risk review.
+    Yields dicts with ``sector``, ``analysis``, ``trades``, ``risk``, ``fills``
+    and ``error``.
+    """
+    from crewai import Task
+
+    _, trader, risk_manager = build_agents(verbose)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_analyze_sector, sector): sector for sector in sectors}
+        for future in as_completed(futures):
+            sector = futures[future]
+            try:
+                analysis = future.result()
+                trades = Task(
+                    description=TRADING_DESCRIPTION.format(sector=sector),
+                    expected_output=TRADING_OUTPUT,
+                    agent=trader
+                ).execute_sync(context=analysis).raw
+                risk = Task(
+                    description=RISK_DESCRIPTION,
+                    expected_output=RISK_OUTPUT,
+                    agent=risk_manager
+                ).execute_sync(context=trades).raw
+                fills = execute_approved(trades, risk, source=sector)
+                yield {"sector": sector, "analysis": analysis, "trades": trades,
+                       "risk": risk, "fills": fills, "error": None}
+            except Exception as e:
+                yield {"sector": sector, "analysis": None, "trades": None,
+                       "risk": None, "fills": None, "error": e}
 
 
 if __name__ == "__main__":
-    result = financial_crew.kickoff(inputs={"sector": "technology"})
-    print(result)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the financial crew")
+    parser.add_argument("sectors", nargs="*", help="sectors to analyze")
+    parser.add_argument("--all-sectors", action="store_true", help="analyze all eleven GICS sectors")
+    parser.add_argument("--workers", type=int, default=6, help="max concurrent analyses")
+    args = parser.parse_args()
+
+    sectors = GICS_SECTORS if args.all_sectors else args.sectors
+    if len(sectors) <= 1:
+        report = run_financial_crew(sectors[0] if sectors else "technology")
+        print(report["result"])
+        print(f"\nExecuted {len(report['fills'])} approved trade(s)")
+    else:
+        for report in analyze_sectors(sectors, max_workers=args.workers):
+            if report["error"]:
+                print(f"\n=== {report['sector']}: ERROR {report['error']} ===")
+            else:
+                print(f"\n=== {report['sector']} ===\n{report['risk']}\n"
+                      f"Executed {len(report['fills'])} approved trade(s)")
+        print(f"\nPage cache: {page_cache.fetches} fetches, {page_cache.hits} hits")
@@ -0,0 +1,165 @@
+"""
+Order Book
+==========
+Aggregation and netting stage in front of trade execution.
+Trade intents from any number of tasks or crews are collected for a short
+window, buys are netted against sells per symbol, one aggregated order per
+symbol is sent to the executor, and fills are allocated back to the
+original intents.
+"""
+
+from concurrent.futures import Future
+import itertools
+import threading
+
+
+ACTIONS = ("BUY", "SELL")
+
+
+def _allocate(total: int, quantities: list) -> list:
+    """Split ``total`` across ``quantities`` pro rata with whole shares.
+
+    Uses the largest-remainder method so allocations always sum to ``total``.
+    """
+    requested = sum(quantities)
+    if requested == 0:
+        return [0] * len(quantities)
+    exact = [total * q / requested for q in quantities]
+    shares = [int(x) for x in exact]
+    leftover = total - sum(shares)
+    by_remainder = sorted(range(len(quantities)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return shares
+
+
+class OrderBook:
+    """Collects trade intents and executes one netted order per symbol.
+
+    ``execute(symbol, action, quantity)`` is called once per symbol per flush.
+    It may return the filled quantity as an int; any other return value
+    (such as the confirmation string from ``execute_trade``) counts as a
+    full fill. With ``window`` set, a flush runs automatically that many
+    seconds after the first intent of a batch arrives; with ``window`` 0 or
+    None, every submit flushes at once, so nothing is netted across calls.
+    """
+
+    def __init__(self, execute, window=0.5):
+        self.execute = execute
+        self.window = window
+        self.orders_sent = 0
+        self.intents_seen = 0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self._ids = itertools.count(1)
+
+    def submit(self, symbol: str, action: str, quantity: int, source: str = None) -> Future:
+        """Queue a trade intent; the returned future resolves to its allocation."""
+        intent = self._intent(symbol, action, quantity, source)
+        with self._lock:
+            self._pending.append(intent)
+            self.intents_seen += 1
+            if self.window and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if not self.window:
+            self.flush()
+        return intent["future"]
+
+    def submit_batch(self, intents, source: str = None) -> list:
+        """Queue ``(symbol, action, quantity)`` intents and flush them together now.
+
+        For callers that already hold a whole batch, such as one crew run's
+        approved trades: the batch is netted at once instead of waiting out
+        the window. Returns one future per intent, all settled on return.
+        """
+        batch = [self._intent(symbol, action, quantity, source) for symbol, action, quantity in intents]
+        with self._lock:
+            self._pending.extend(batch)
+            self.intents_seen += len(batch)
+        self.flush()
+        return [intent["future"] for intent in batch]
+
+    def _intent(self, symbol, action, quantity, source) -> dict:
+        action = action.upper()
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown trade action: {action}")
+        if quantity <= 0:
+            raise ValueError(f"Trade quantity must be positive, got {quantity}")
+        return {
+            "id": next(self._ids),
+            "symbol": symbol.upper(),
+            "action": action,
+            "quantity": int(quantity),
+            "source": source,
+            "future": Future(),
+        }
+
+    def flush(self) -> list:
+        """Net and execute everything queued so far; returns the orders sent."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        by_symbol = {}
+        for intent in batch:
+            by_symbol.setdefault(intent["symbol"], []).append(intent)
+
+        orders = []
+        for symbol, intents in by_symbol.items():
+            try:
+                orders.append(self._execute_symbol(symbol, intents))
+            except Exception as e:
+                # Intents allocated before the failure keep their fills
+                for intent in intents:
+                    if not intent["future"].done():
+                        intent["future"].set_exception(e)
+        return orders
+
+    def _execute_symbol(self, symbol: str, intents: list) -> dict:
+        buys = [i for i in intents if i["action"] == "BUY"]
+        sells = [i for i in intents if i["action"] == "SELL"]
+        bought = sum(i["quantity"] for i in buys)
+        sold = sum(i["quantity"] for i in sells)
+        net = bought - sold
+        crossed = min(bought, sold)
+
+        order = {"symbol": symbol, "action": None, "quantity": 0, "filled": 0,
+                 "crossed": crossed, "intents": len(intents), "confirmation": None}
+        if net:
+            order["action"] = "BUY" if net > 0 else "SELL"
+            order["quantity"] = abs(net)
+            confirmation = self.execute(symbol, order["action"], abs(net))
+            self.orders_sent += 1
+            order["confirmation"] = confirmation
+            reported = isinstance(confirmation, int) and not isinstance(confirmation, bool)
+            order["filled"] = confirmation if reported else abs(net)
+
+        # Each side is first matched internally against the other side; the
+        # larger side's residual is what the aggregated order filled.
+        for side, side_total in ((buys, bought), (sells, sold)):
+            quantities = [i["quantity"] for i in side]
+            internal = _allocate(crossed, quantities)
+            on_net_side = side_total > crossed
+            external = _allocate(order["filled"], [q - c for q, c in zip(quantities, internal)]) \
+                if on_net_side else [0] * len(side)
+            for intent, inside, outside in zip(side, internal, external):
+                intent["future"].set_result({
+                    "intent_id": intent["id"],
+                    "symbol": symbol,
+                    "action": intent["action"],
+                    "requested": intent["quantity"],
+                    "filled": inside + outside,
+                    "internal": inside,
+                    "external": outside,
+                    "source": intent["source"],
+                })
+        return order
+
+    def close(self):
+        """Flush any remaining intents and stop the window timer."""
+        self.flush()
@@ -0,0 +1,173 @@
+"""
+Page Cache
+==========
+Content-addressed cache for scraped web pages shared across crew runs.
+Each URL is fetched and parsed once per TTL window, concurrent requests for
+the same URL wait on a single fetch, and identical page bodies reached via
+different URLs are stored once under their SHA-256 digest.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Canonicalize scheme/host case and drop fragments and trailing slashes."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+class PageCache:
+    """Disk-backed URL -> content-digest index over a content-addressed blob store.
+
+    Expired index entries, and blobs that no entry references and that have
+    not been written or reused for a TTL, are removed every ``prune_every``
+    stores (and by ``prune()``).
+    """
+
+    def __init__(self, cache_dir=None, ttl=900.0, prune_every=256):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "crew_page_cache")
+        self.blob_dir = os.path.join(self.cache_dir, "blobs")
+        self.index_path = os.path.join(self.cache_dir, "urls.json")
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.fetches = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        # Serializes index file writes so a newer snapshot is never overwritten by an older one
+        self._write_lock = threading.Lock()
+        self._inflight = {}
+        self._stores = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        try:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, f"{digest}.txt")
+
+    def _entry(self, url: str):
+        """The live index entry for ``url``; call with the lock held."""
+        entry = self._index.get(url)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry
+
+    def _read_blob(self, entry):
+        if entry is None:
+            return None
+        try:
+            with open(self._blob_path(entry["digest"]), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, url: str, content: str):
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        path = self._blob_path(digest)
+        try:
+            # Reusing a blob refreshes its age so prune() keeps it
+            os.utime(path)
+        except FileNotFoundError:
+            fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._index[url] = {"digest": digest, "fetched_at": time.time()}
+            self._stores += 1
+            prune = self.prune_every and self._stores % self.prune_every == 0
+        if prune:
+            self.prune()
+        else:
+            self._write_index()
+
+    def _write_index(self):
+        with self._write_lock:
+            with self._lock:
+                snapshot = dict(self._index)
+            tmp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.index_path)
+
+    def prune(self) -> int:
+        """Drop expired entries and unreferenced stale blobs; returns blobs removed."""
+        now = time.time()
+        with self._lock:
+            self._index = {
+                url: entry for url, entry in self._index.items()
+                if now - entry["fetched_at"] <= self.ttl
+            }
+            referenced = {entry["digest"] for entry in self._index.values()}
+        self._write_index()
+        removed = 0
+        for name in os.listdir(self.blob_dir):
+            digest, ext = os.path.splitext(name)
+            if ext == ".txt" and digest in referenced:
+                continue
+            path = os.path.join(self.blob_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def get(self, url: str, fetch) -> str:
+        """Return the cached page for ``url``, calling ``fetch()`` at most once per window."""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entry(key)
+        # Blobs are immutable once renamed into place, so they are read unlocked
+        cached = self._read_blob(entry)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait()
+            with self._lock:
+                entry = self._entry(key)
+            cached = self._read_blob(entry)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return cached
+            # The leader's fetch failed; try once ourselves
+            return fetch()
+
+        try:
+            with self._lock:
+                entry = self._entry(key)
+            # Another leader may have stored the page since the first look
+            cached = self._read_blob(entry)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return cached
+            content = fetch()
+            with self._lock:
+                self.fetches += 1
+            self._store(key, content)
+            return content
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
@@ -0,0 +1,153 @@
+"""
+Portfolio Store
+===============
+Array-backed holdings store for the risk manager.
+Positions are kept as NumPy columns (account index, symbol index, quantity)
+sorted by account, with a per-symbol price column, so exposure,
+concentration and limit checks run as vectorized operations over whole
+books instead of one prompt per account.
+"""
+
+import numpy as np
+
+
+class PortfolioStore:
+    """Holdings for many accounts in CSR layout: ``offsets[i]:offsets[i+1]``
+    slices the position columns belonging to account ``i``. Each (account,
+    symbol) pair appears once; duplicate lots are summed on load."""
+
+    def __init__(self, accounts, symbols, account_idx, symbol_idx, quantity, prices=None):
+        self.accounts = list(accounts)
+        self.symbols = list(symbols)
+        self.account_index = {a: i for i, a in enumerate(self.accounts)}
+        self.symbol_index = {s: i for i, s in enumerate(self.symbols)}
+
+        # Lots of the same (account, symbol) are one position: summing them here
+        # keeps concentration from being understated. np.unique also sorts by
+        # account, then symbol.
+        account_idx = np.asarray(account_idx, dtype=np.int64)
+        symbol_idx = np.asarray(symbol_idx, dtype=np.int64)
+        keys, inverse = np.unique(account_idx * len(self.symbols) + symbol_idx, return_inverse=True)
+        self.account_idx = (keys // max(len(self.symbols), 1)).astype(np.int32)
+        self.symbol_idx = (keys % max(len(self.symbols), 1)).astype(np.int32)
+        self.quantity = np.bincount(
+            inverse.reshape(-1), weights=np.asarray(quantity, dtype=np.float64), minlength=keys.size
+        )
+        counts = np.bincount(self.account_idx, minlength=len(self.accounts))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.prices = np.zeros(len(self.symbols), dtype=np.float64)
+        if prices:
+            self.set_prices(prices)
+
+    @classmethod
+    def from_positions(cls, positions, prices=None):
+        """Build a store from ``(account_id, symbol, quantity)`` rows."""
+        accounts, symbols = {}, {}
+        account_idx, symbol_idx, quantity = [], [], []
+        for account, symbol, qty in positions:
+            account_idx.append(accounts.setdefault(account, len(accounts)))
+            symbol_idx.append(symbols.setdefault(symbol, len(symbols)))
+            quantity.append(qty)
+        return cls(accounts, symbols, account_idx, symbol_idx, quantity, prices)
+
+    def set_prices(self, prices: dict):
+        """Update prices for known symbols; unknown symbols are ignored."""
+        for symbol, price in prices.items():
+            i = self.symbol_index.get(symbol)
+            if i is not None:
+                self.prices[i] = price
+
+    # ── vectorized book-wide metrics ───────────────────────────────────────
+
+    def market_values(self) -> np.ndarray:
+        """Signed market value of every position."""
+        return self.quantity * self.prices[self.symbol_idx]
+
+    def exposures(self) -> dict:
+        """Gross and net exposure per account, plus position counts."""
+        mv = self.market_values()
+        n = len(self.accounts)
+        return {
+            "gross": np.bincount(self.account_idx, weights=np.abs(mv), minlength=n),
+            "net": np.bincount(self.account_idx, weights=mv, minlength=n),
+            "positions": np.diff(self.offsets),
+        }
+
+    def concentration(self, exposures=None) -> np.ndarray:
+        """Largest single position as a fraction of gross exposure, per account."""
+        exposures = exposures or self.exposures()
+        abs_mv = np.abs(self.market_values())
+        largest = np.zeros(len(self.accounts))
+        nonempty = exposures["positions"] > 0
+        if abs_mv.size:
+            # Empty accounts have zero-length slices, so reducing only over the
+            # non-empty starts still gives each account exactly its own rows
+            largest[nonempty] = np.maximum.reduceat(abs_mv, self.offsets[:-1][nonempty])
+        gross = exposures["gross"]
+        return np.divide(largest, gross, out=np.zeros_like(largest), where=gross > 0)
+
+    def symbol_exposure(self) -> np.ndarray:
+        """Net market value per symbol across the whole book."""
+        return np.bincount(self.symbol_idx, weights=self.market_values(), minlength=len(self.symbols))
+
+    def limit_breaches(self, max_position_pct=0.25, max_gross=None, max_net=None) -> dict:
+        """Boolean masks of accounts breaching each limit, plus the metrics used."""
+        exposures = self.exposures()
+        concentration = self.concentration(exposures)
+        breaches = {"concentration": concentration > max_position_pct}
+        if max_gross is not None:
+            breaches["gross"] = exposures["gross"] > max_gross
+        if max_net is not None:
+            breaches["net"] = np.abs(exposures["net"]) > max_net
+        breaches["any"] = np.logical_or.reduce(list(breaches.values()))
+        return {"breaches": breaches, "exposures": exposures, "concentration": concentration}
+
+    # ── compact summaries for the LLM ──────────────────────────────────────
+
+    def account_summary(self, account_id: str, max_position_pct=0.25) -> str:
+        """One-line summary of an account's holdings and concentration."""
+        i = self.account_index.get(account_id)
+        if i is None:
+            return f"Portfolio for {account_id}: not found"
+        start, end = self.offsets[i], self.offsets[i + 1]
+        syms = self.symbol_idx[start:end]
+        qty = self.quantity[start:end]
+        mv = qty * self.prices[syms]
+        gross = np.abs(mv).sum()
+        holdings = ", ".join(
+            f"{self.symbols[s]}: {q:g}" for s, q in zip(syms.tolist(), qty.tolist())
+        )
+        summary = f"Portfolio for {account_id}: {holdings} | gross ${gross:,.2f}, net ${mv.sum():,.2f}"
+        if gross > 0:
+            top = int(np.argmax(np.abs(mv)))
+            pct = abs(mv[top]) / gross
+            flag = " BREACH" if pct > max_position_pct else ""
+            summary += f", top {self.symbols[syms[top]]} {pct:.0%}{flag}"
+        return summary
+
+    def book_summary(self, max_position_pct=0.25, max_gross=None, max_net=None, top=5) -> str:
+        """Book-wide risk digest: totals, breach counts and the worst accounts."""
+        result = self.limit_breaches(max_position_pct, max_gross, max_net)
+        breaches = result["breaches"]
+        gross = result["exposures"]["gross"]
+        concentration = result["concentration"]
+        lines = [
+            f"Accounts: {len(self.accounts)}, positions: {self.quantity.size}, "
+            f"gross ${gross.sum():,.2f}, net ${result['exposures']['net'].sum():,.2f}",
+            "Breaches: " + ", ".join(
+                f"{name} {int(mask.sum())}" for name, mask in breaches.items() if name != "any"
+            ),
+        ]
+        flagged = np.flatnonzero(breaches["any"])
+        if flagged.size:
+            worst = flagged[np.argsort(-concentration[flagged])[:top]]
+            lines.append("Worst: " + "; ".join(
+                f"{self.accounts[i]} top {concentration[i]:.0%} of ${gross[i]:,.0f}"
+                for i in worst.tolist()
+            ))
+        symbol_mv = self.symbol_exposure()
+        largest = np.argsort(-np.abs(symbol_mv))[:top]
+        lines.append("Largest symbol exposures: " + ", ".join(
+            f"{self.symbols[i]} ${symbol_mv[i]:,.0f}" for i in largest.tolist()
+        ))
+        return "\n".join(lines)
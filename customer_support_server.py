@@ -0,0 +1,264 @@
+# customer_support_server.py
+# HTTP front-end for the customer support agent (stdlib asyncio, no framework)
+# Repository: github.com/AiStyl/praqtorx-test-agents
+
+"""
+Serves customer_support_agent.chat over HTTP/1.1 with keep-alive.
+
+- POST /chat      {"message": "...", "customer_id": "..."} -> {"response": ...}
+- GET  /health
+- GET  /metrics   Prometheus text: queue depth, in-flight calls, latency quantiles
+
+At most `concurrency` upstream calls run at once. Identical messages that
+arrive while a call for them is in flight share its result, either within
+one customer or across all customers. When the proxy slows down, requests
+are shed with 503 + Retry-After: the expected wait (queued calls x recent
+upstream latency / concurrency) is checked before a request is queued.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import customer_support_agent
+import http11
+
+MAX_BODY_BYTES = 64 * 1024
+KEEPALIVE_TIMEOUT = 15.0
+LATENCY_WINDOW = 2048
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+# ═══════════════════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LatencyWindow:
+    """Recent latencies (seconds) with an EWMA and on-demand quantiles."""
+
+    def __init__(self, size=LATENCY_WINDOW, alpha=0.2):
+        self.samples = collections.deque(maxlen=size)
+        self.alpha = alpha
+        self.ewma = 0.0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.ewma = seconds if not self.count else self.ewma + self.alpha * (seconds - self.ewma)
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CHAT SERVICE - Coalescing, bounded concurrency and load shedding
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ChatService:
+    """Admission control and request coalescing in front of a blocking chat()."""
+
+    def __init__(self, chat=None, concurrency=16, max_queue=256, max_queue_wait=10.0,
+                 coalesce="global"):
+        if coalesce not in ("global", "customer", "off"):
+            raise ValueError(f"coalesce must be 'global', 'customer' or 'off', not {coalesce!r}")
+        self.chat = chat or customer_support_agent.chat
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.coalesce = coalesce
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="chat")
+        self._inflight = {}
+        self.waiting = 0
+        self.running = 0
+        self.upstream = LatencyWindow()
+        self.requests = LatencyWindow()
+        self.counters = collections.Counter()
+
+    def _key(self, message: str, customer_id: str):
+        normalized = " ".join(message.split()).lower()
+        if self.coalesce == "off":
+            return None
+        if self.coalesce == "customer":
+            return (customer_id or "", normalized)
+        return normalized
+
+    def expected_wait(self) -> float:
+        """Seconds a newly queued call should wait at recent upstream latency."""
+        if self.running < self.concurrency:
+            return 0.0
+        return (self.waiting + 1) / self.concurrency * self.upstream.ewma
+
+    async def handle(self, message: str, customer_id: str = None) -> tuple:
+        """Returns (response text, coalesced) or raises Overloaded."""
+        key = self._key(message, customer_id)
+        leader = self._inflight.get(key) if key is not None else None
+        if leader is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(leader), True
+
+        wait = self.expected_wait()
+        if self.waiting >= self.max_queue or wait > self.max_queue_wait:
+            self.counters["shed"] += 1
+            raise Overloaded(max(wait, 1.0))
+
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._inflight[key] = future
+        try:
+            result = await self._call_upstream(message)
+            future.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # followers re-raise it; mark it retrieved
+            raise
+        finally:
+            if key is not None:
+                self._inflight.pop(key, None)
+
+    async def _call_upstream(self, message: str) -> str:
+        self.waiting += 1
+        queued = time.monotonic()
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.max_queue_wait)
+            except asyncio.TimeoutError:
+                self.counters["shed"] += 1
+                raise Overloaded(self.upstream.ewma)
+        finally:
+            self.waiting -= 1
+        self.counters["queue_seconds"] += time.monotonic() - queued
+        self.running += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self.chat, message)
+        finally:
+            self.upstream.add(time.monotonic() - started)
+            self.running -= 1
+            self._slots.release()
+
+    def metrics(self) -> str:
+        lines = [
+            f"chat_queue_depth {self.waiting}",
+            f"chat_upstream_in_flight {self.running}",
+            f"chat_upstream_concurrency_limit {self.concurrency}",
+            f"chat_coalesce_keys_in_flight {len(self._inflight)}",
+            f"chat_expected_queue_wait_seconds {self.expected_wait():.4f}",
+            f"chat_upstream_latency_ewma_seconds {self.upstream.ewma:.4f}",
+        ]
+        for name, window in (("chat_upstream_latency_seconds", self.upstream),
+                             ("chat_request_latency_seconds", self.requests)):
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'{name}{{quantile="{q}"}} {window.quantile(q):.4f}')
+            lines.append(f"{name}_sum {window.total:.4f}")
+            lines.append(f"{name}_count {window.count}")
+        for name in ("requests", "coalesced", "shed", "upstream_errors", "bad_requests"):
+            lines.append(f"chat_{name}_total {self.counters[name]}")
+        lines.append(f"chat_queue_seconds_total {self.counters['queue_seconds']:.4f}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HTTP/1.1 SERVER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ChatServer:
+    def __init__(self, service: ChatService, keepalive_timeout=KEEPALIVE_TIMEOUT):
+        self.service = service
+        self.keepalive_timeout = keepalive_timeout
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        server = await asyncio.start_server(self._connection, host, port, limit=http11.MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    async def _connection(self, reader, writer):
+        await http11.serve_connection(reader, writer, self._handle, self.keepalive_timeout, MAX_BODY_BYTES)
+
+    async def _handle(self, writer, method, path, headers, body, keep_alive):
+        status, payload, extra = await self._route(method, path, body)
+        await http11.send(writer, status, payload, keep_alive, extra)
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}, {}
+        if path == "/metrics":
+            return 200, self.service.metrics(), {"Content-Type": "text/plain; version=0.0.4"}
+        if path != "/chat":
+            return 404, {"error": f"no route for {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {"Allow": "POST"}
+
+        service = self.service
+        started = time.monotonic()
+        service.counters["requests"] += 1
+        try:
+            request = json.loads(body or b"{}")
+            message = request["message"]
+            if not isinstance(message, str) or not message.strip():
+                raise ValueError("message must be a non-empty string")
+        except (ValueError, KeyError, TypeError) as e:
+            service.counters["bad_requests"] += 1
+            return 400, {"error": f"invalid request: {e}"}, {}
+        try:
+            response, coalesced = await service.handle(message, request.get("customer_id"))
+        except Overloaded as e:
+            return 503, {"error": str(e)}, {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        except Exception as e:
+            service.counters["upstream_errors"] += 1
+            return 502, {"error": f"{type(e).__name__}: {e}"}, {}
+        finally:
+            # Shed and failed requests count too, or the quantiles only show successes
+            service.requests.add(time.monotonic() - started)
+        if response.startswith("Error:"):
+            # chat() reports proxy blocks and failures in-band
+            service.counters["upstream_errors"] += 1
+            return 502, {"error": response, "coalesced": coalesced}, {}
+        return 200, {"response": response, "coalesced": coalesced}, {}
+
+async def main(args):
+    service = ChatService(
+        concurrency=args.concurrency,
+        max_queue=args.max_queue,
+        max_queue_wait=args.max_queue_wait,
+        coalesce=args.coalesce,
+    )
+    print(f"Serving {customer_support_agent.AGENT_ID} on http://{args.host}:{args.port} "
+          f"(concurrency {args.concurrency}, coalesce {args.coalesce})")
+    try:
+        await ChatServer(service).serve(args.host, args.port)
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP service for the customer support agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=16, help="max concurrent upstream calls")
+    parser.add_argument("--max-queue", type=int, default=256, help="max calls waiting for a slot")
+    parser.add_argument("--max-queue-wait", type=float, default=10.0,
+                        help="shed requests expected to wait longer than this (seconds)")
+    parser.add_argument("--coalesce", choices=("global", "customer", "off"), default="global",
+                        help="share in-flight results for identical messages")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,113 @@
+# http11.py
+# Minimal HTTP/1.1 keep-alive framing shared by the stdlib asyncio servers
+# Repository: github.com/AiStyl/praqtorx-test-agents
+
+"""
+Request framing for customer_support_server.py and benchmarks/local_proxy.py,
+which serve small JSON APIs over asyncio streams without a framework.
+
+serve_connection() reads requests off one connection until the client
+closes it, asks for ``Connection: close`` or goes idle, and hands each one
+to ``handle(writer, method, path, headers, body, keep_alive)``, which must
+write exactly one response. Request bodies are framed by Content-Length
+only: a request with Transfer-Encoding gets 411 (chunked) or 501 and the
+connection is closed, since reading its body as empty would desync every
+request after it. Oversized heads and bodies get 413, malformed heads 400.
+
+    server = await asyncio.start_server(
+        functools.partial(serve_connection, handle=handle), host, port, limit=MAX_HEADER_BYTES)
+"""
+
+import asyncio
+import json
+
+MAX_HEADER_BYTES = 16 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+           404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 501: "Not Implemented", 502: "Bad Gateway",
+           503: "Service Unavailable"}
+
+def default_error(message: str):
+    return {"error": message}
+
+async def serve_connection(reader, writer, handle, keepalive_timeout: float, max_body_bytes: int,
+                           error=default_error):
+    """Serve requests on one connection; ``error(message)`` builds the framing error bodies.
+
+    Start the server with ``limit=MAX_HEADER_BYTES`` so oversized heads are caught.
+    """
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), keepalive_timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            except asyncio.LimitOverrunError:
+                await send(writer, 413, error("headers too large"), keep_alive=False)
+                break
+            try:
+                method, path, version, headers = parse_head(head)
+                length = int(headers.get("content-length", "0") or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                await send(writer, 400, error("malformed request"), keep_alive=False)
+                break
+            if "transfer-encoding" in headers:
+                chunked = headers["transfer-encoding"].lower() == "chunked"
+                await send(writer, 411 if chunked else 501,
+                           error("send the body with Content-Length"), keep_alive=False)
+                break
+            if length > max_body_bytes:
+                await send(writer, 413, error("body too large"), keep_alive=False)
+                break
+            body = await reader.readexactly(length) if length else b""
+            alive = keep_alive(version, headers)
+            await handle(writer, method, path, headers, body, alive)
+            if not alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+def parse_head(head: bytes):
+    """(method, path without query, version, lower-cased headers) of a request head."""
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, path.split("?", 1)[0], version, headers
+
+def keep_alive(version: str, headers: dict) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+def response_head(status: int, headers: dict) -> bytes:
+    return (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in headers.items()
+    ) + "\r\n").encode("latin-1")
+
+async def send(writer, status, payload, keep_alive=True, extra=None):
+    """Send a JSON response, or a text/plain one when ``payload`` is a str."""
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; charset=utf-8"
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        content_type = "application/json"
+    headers = {"Content-Type": content_type, "Content-Length": str(len(body)),
+               "Connection": "keep-alive" if keep_alive else "close"}
+    headers.update(extra or {})
+    writer.write(response_head(status, headers) + body)
+    await writer.drain()
+
+async def write_chunk(writer, data: bytes):
+    """One chunk of a ``Transfer-Encoding: chunked`` response; ``b""`` ends it."""
+    writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+    await writer.drain()
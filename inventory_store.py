@@ -0,0 +1,283 @@
+# inventory_store.py
+# Inventory subsystem for the customer support agent's check_inventory tool
+# Repository: github.com/AiStyl/praqtorx-test-agents
+
+"""
+Product catalog and stock levels in one SQLite database (WAL mode), shared
+by every thread and process that opens the same path.
+
+- The catalog (SKU, name, price) is loaded once into a compact index: a
+  dict from SKU to row number plus a name list and an array of prices in
+  cents. Call refresh() after changing products from another process.
+- Stock is always read from the database, many SKUs per query, so every
+  reader sees every committed reservation. Holds past their TTL no longer
+  count against available stock, even before they are expired.
+- reserve() holds stock for a while. commit() turns the hold into a sale
+  and release() returns it. Each is a single transaction, and the stock
+  check and the update are one conditional UPDATE
+  (``... WHERE stock - reserved >= qty``). Two buyers can never both get
+  the last unit, whichever thread or process they run in.
+- Holds that are neither committed nor released expire after their TTL.
+  Closed holds are deleted, so the holds tables only hold live holds.
+
+    store = InventoryStore("/var/lib/praqtor/inventory.db")
+    store.lookup_many(["PROD-001", "PROD-002"])
+    hold = store.reserve({"PROD-001": 2}, ttl=600)
+    store.commit(hold)   # or store.release(hold)
+"""
+
+import array
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+DEFAULT_DB_PATH = os.getenv(
+    "INVENTORY_DB_PATH", os.path.join(tempfile.gettempdir(), "praqtor_inventory.db")
+)
+DEFAULT_HOLD_TTL = 900.0
+BUSY_TIMEOUT_MS = 10_000
+MAX_SQL_VARIABLES = 500
+
+# Rows loaded into an empty database: (sku, name, price in cents, stock)
+SEED_PRODUCTS = [
+    ("PROD-001", "Widget Pro", 2999, 150),
+    ("PROD-002", "Gadget Plus", 4999, 75),
+    ("PROD-003", "Tech Bundle", 9999, 25),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    sku TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    stock INTEGER NOT NULL CHECK (stock >= 0),
+    reserved INTEGER NOT NULL DEFAULT 0 CHECK (reserved >= 0 AND reserved <= stock)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS holds (
+    id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hold_items (
+    hold_id TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    qty INTEGER NOT NULL CHECK (qty > 0),
+    PRIMARY KEY (hold_id, sku)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS holds_expires_at ON holds (expires_at);
+"""
+
+class InsufficientStock(Exception):
+    def __init__(self, sku: str, requested: int):
+        super().__init__(f"not enough stock of {sku} to hold {requested}")
+        self.sku = sku
+        self.requested = requested
+
+class UnknownSku(Exception):
+    def __init__(self, sku: str):
+        super().__init__(f"no product with SKU {sku}")
+        self.sku = sku
+
+class UnknownHold(Exception):
+    """The hold does not exist or was already committed, released or expired."""
+
+# ═══════════════════════════════════════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class InventoryStore:
+    def __init__(self, path: str = DEFAULT_DB_PATH, seed=SEED_PRODUCTS):
+        self.path = path
+        self._local = threading.local()
+        # executescript commits on its own, so the schema goes in before any transaction
+        self._conn().executescript(SCHEMA)
+        with self._transaction() as conn:
+            if seed and conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is None:
+                conn.executemany(
+                    "INSERT INTO products (sku, name, price_cents, stock) VALUES (?, ?, ?, ?)", seed
+                )
+            # Databases written before closed holds were deleted keep them, marked by state
+            if "state" in [row[1] for row in conn.execute("PRAGMA table_info(holds)")]:
+                conn.execute("DELETE FROM hold_items WHERE hold_id IN (SELECT id FROM holds WHERE state != 'held')")
+                conn.execute("DELETE FROM holds WHERE state != 'held'")
+                conn.execute("DROP INDEX IF EXISTS holds_expiry")
+                conn.execute("ALTER TABLE holds DROP COLUMN state")
+        self.refresh()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, reopened in forked children."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._conn())
+
+    def refresh(self):
+        """(Re)load the catalog index from the database."""
+        rows = self._conn().execute("SELECT sku, name, price_cents FROM products ORDER BY sku").fetchall()
+        # One assignment, so concurrent lookups see the old catalog or the new one, never a mix
+        self._catalog = (
+            {sku: i for i, (sku, _, _) in enumerate(rows)},
+            [name for _, name, _ in rows],
+            array.array("q", (price for _, _, price in rows)),
+        )
+
+    def upsert_products(self, rows):
+        """Insert or update (sku, name, price_cents, stock) rows and reload the index."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO products (sku, name, price_cents, stock) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (sku) DO UPDATE SET name = excluded.name, "
+                "price_cents = excluded.price_cents, stock = excluded.stock",
+                rows,
+            )
+        self.refresh()
+
+    def lookup_many(self, skus) -> dict:
+        """{sku: {"name", "price", "stock", "available"} or None} in a few queries."""
+        index, names, prices = self._catalog
+        skus = list(dict.fromkeys(skus))
+        known = [sku for sku in skus if sku in index]
+        stock = {}
+        conn = self._conn()
+        for start in range(0, len(known), MAX_SQL_VARIABLES):
+            chunk = known[start:start + MAX_SQL_VARIABLES]
+            stock.update(
+                (sku, (on_hand, on_hand - reserved))
+                for sku, on_hand, reserved in conn.execute(
+                    f"SELECT sku, stock, reserved FROM products WHERE sku IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        if stock and any(on_hand != available for on_hand, available in stock.values()):
+            # Held stock past its TTL is available again; the next write expires it
+            for sku, lapsed in conn.execute(
+                "SELECT i.sku, SUM(i.qty) FROM holds h JOIN hold_items i ON i.hold_id = h.id "
+                "WHERE h.expires_at <= ? GROUP BY i.sku",
+                (time.time(),),
+            ):
+                if sku in stock:
+                    on_hand, available = stock[sku]
+                    stock[sku] = (on_hand, available + lapsed)
+        results = {}
+        for sku in skus:
+            if sku not in stock:
+                results[sku] = None
+                continue
+            i = index[sku]
+            on_hand, available = stock[sku]
+            results[sku] = {
+                "name": names[i],
+                "price": prices[i] / 100,
+                "stock": on_hand,
+                "available": available,
+            }
+        return results
+
+    def lookup(self, sku: str):
+        return self.lookup_many([sku])[sku]
+
+    def reserve(self, items: dict, ttl: float = DEFAULT_HOLD_TTL) -> str:
+        """Hold ``{sku: qty}`` all-or-nothing; returns the hold id.
+
+        Quantities must be positive ints. Raises UnknownSku or
+        InsufficientStock (and holds nothing) if any SKU is missing or short.
+        """
+        for sku, qty in items.items():
+            if not isinstance(qty, int) or isinstance(qty, bool):
+                raise TypeError(f"quantity for {sku} must be an int, not {type(qty).__name__}")
+            if qty <= 0:
+                raise ValueError(f"quantity for {sku} must be positive")
+        hold_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire(conn, now)
+            for sku, qty in items.items():
+                updated = conn.execute(
+                    "UPDATE products SET reserved = reserved + ? WHERE sku = ? AND stock - reserved >= ?",
+                    (qty, sku, qty),
+                ).rowcount
+                if not updated:
+                    if conn.execute("SELECT 1 FROM products WHERE sku = ?", (sku,)).fetchone() is None:
+                        raise UnknownSku(sku)
+                    raise InsufficientStock(sku, qty)
+            conn.execute("INSERT INTO holds (id, expires_at) VALUES (?, ?)", (hold_id, now + ttl))
+            conn.executemany(
+                "INSERT INTO hold_items (hold_id, sku, qty) VALUES (?, ?, ?)",
+                [(hold_id, sku, qty) for sku, qty in items.items()],
+            )
+        return hold_id
+
+    def commit(self, hold_id: str):
+        """Sell held stock: on-hand and reserved both drop by the held quantities."""
+        with self._transaction() as conn:
+            items = self._close_hold(conn, hold_id)
+            conn.executemany(
+                "UPDATE products SET stock = stock - ?, reserved = reserved - ? WHERE sku = ?",
+                [(qty, qty, sku) for sku, qty in items],
+            )
+
+    def release(self, hold_id: str):
+        """Return held stock to the available pool."""
+        with self._transaction() as conn:
+            items = self._close_hold(conn, hold_id)
+            conn.executemany(
+                "UPDATE products SET reserved = reserved - ? WHERE sku = ?",
+                [(qty, sku) for sku, qty in items],
+            )
+
+    def expire_holds(self) -> int:
+        """Release every hold past its TTL; returns how many were released."""
+        with self._transaction() as conn:
+            return self._expire(conn, time.time())
+
+    @staticmethod
+    def _close_hold(conn, hold_id) -> list:
+        """Delete a live hold; returns its (sku, qty) items."""
+        closed = conn.execute(
+            "DELETE FROM holds WHERE id = ? AND expires_at > ?",
+            (hold_id, time.time()),
+        ).rowcount
+        if not closed:
+            raise UnknownHold(hold_id)
+        items = conn.execute("SELECT sku, qty FROM hold_items WHERE hold_id = ?", (hold_id,)).fetchall()
+        conn.execute("DELETE FROM hold_items WHERE hold_id = ?", (hold_id,))
+        return items
+
+    @staticmethod
+    def _expire(conn, now) -> int:
+        expired = [row[0] for row in conn.execute(
+            "SELECT id FROM holds WHERE expires_at <= ?", (now,))]
+        for hold_id in expired:
+            conn.execute(
+                "UPDATE products SET reserved = reserved - "
+                "(SELECT qty FROM hold_items WHERE hold_id = ? AND sku = products.sku) "
+                "WHERE sku IN (SELECT sku FROM hold_items WHERE hold_id = ?)",
+                (hold_id, hold_id),
+            )
+            conn.execute("DELETE FROM hold_items WHERE hold_id = ?", (hold_id,))
+            conn.execute("DELETE FROM holds WHERE id = ?", (hold_id,))
+        return len(expired)
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK: takes the write lock up front, so
+    concurrent writers queue on busy_timeout instead of failing mid-way."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
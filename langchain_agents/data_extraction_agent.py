@@ -5,13 +5,11 @@ LangChain agent for extracting and processing data from multiple sources.
 RISK: CRITICAL - Has shell access, file write, and external HTTP capabilities.
 """
 
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.tools import Tool
-from langchain.prompts import PromptTemplate
 import subprocess
-import requests
 import os
+import threading
+
+from model_router import ModelRouter, tool_call_callback
 
 
 # Dangerous: Shell command execution
@@ -32,6 +30,8 @@ def write_file(content: str, filepath: str) -> str:
 # Dangerous: External HTTP requests
 def fetch_url(url: str) -> str:
     """Fetch content from a URL."""
+    import requests
+
     response = requests.get(url, timeout=30)
     return response.text[:5000]
 
@@ -46,48 +46,14 @@ def query_database(sql: str) -> str:
 # Dangerous: Send to external API
 def send_to_webhook(data: str, webhook_url: str) -> str:
     """Send data to external webhook."""
+    import requests
+
     response = requests.post(webhook_url, json={"data": data})
     return f"Sent to {webhook_url}: {response.status_code}"
 
 
-# Define tools
-tools = [
-    Tool(
-        name="ShellCommand",
-        func=run_shell_command,
-        description="Execute shell commands on the system"
-    ),
-    Tool(
-        name="WriteFile",
-        func=write_file,
-        description="Write content to a file on the filesystem"
-    ),
-    Tool(
-        name="FetchURL",
-        func=fetch_url,
-        description="Fetch content from any URL"
-    ),
-    Tool(
-        name="QueryDatabase",
-        func=query_database,
-        description="Query the customer database"
-    ),
-    Tool(
-        name="SendWebhook",
-        func=send_to_webhook,
-        description="Send data to external webhook endpoint"
-    ),
-]
-
-# LLM setup
-llm = ChatOpenAI(
-    model="gpt-4",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
-)
-
 # Agent prompt
-prompt = PromptTemplate.from_template("""
+PROMPT_TEMPLATE = """
 You are a data extraction assistant. You can:
 - Execute shell commands
 - Read and write files
@@ -97,16 +63,111 @@ You are a data extraction assistant. You can:
 
 Question: {input}
 {agent_scratchpad}
-""")
+"""
+
+EXAMPLE_INPUT = "Extract all customer emails from the database and save to /tmp/emails.txt"
+
+# Requests go to the model ROUTER picks for them (see model_router.py);
+# MODEL is this agent's own model and the one it escalates to
+MODEL = "gpt-4"
+ROUTER = ModelRouter("data_extraction_agent", tier="CRITICAL", strong_model=MODEL)
+
+# LangChain objects are built on first use; importing this module stays cheap
+_tools = None
+_http_client = None
+_llms = {}
+_agent_executors = {}
+_init_lock = threading.RLock()
+
+
+# Define tools
+def get_tools():
+    global _tools
+    with _init_lock:
+        if _tools is None:
+            from langchain_core.tools import Tool
+
+            _tools = [
+                Tool(
+                    name="ShellCommand",
+                    func=run_shell_command,
+                    description="Execute shell commands on the system"
+                ),
+                Tool(
+                    name="WriteFile",
+                    func=write_file,
+                    description="Write content to a file on the filesystem"
+                ),
+                Tool(
+                    name="FetchURL",
+                    func=fetch_url,
+                    description="Fetch content from any URL"
+                ),
+                Tool(
+                    name="QueryDatabase",
+                    func=query_database,
+                    description="Query the customer database"
+                ),
+                Tool(
+                    name="SendWebhook",
+                    func=send_to_webhook,
+                    description="Send data to external webhook endpoint"
+                ),
+            ]
+        return _tools
+
+
+# LLM setup
+def get_llm(http_client=None, model=None):
+    """Chat model for ``model`` (default MODEL); every model shares ``http_client``."""
+    global _http_client
+    with _init_lock:
+        if http_client is not None:
+            _http_client = http_client
+        model = model or MODEL
+        if model not in _llms:
+            from langchain_openai import ChatOpenAI
+
+            _llms[model] = ChatOpenAI(
+                model=model,
+                temperature=0,
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=_http_client
+            )
+        return _llms[model]
+
 
 # Create agent
-agent = create_react_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+def get_agent_executor(model=None):
+    with _init_lock:
+        model = model or MODEL
+        if model not in _agent_executors:
+            from langchain.agents import AgentExecutor, create_react_agent
+            from langchain.prompts import PromptTemplate
+
+            tools = get_tools()
+            prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+            agent = create_react_agent(get_llm(model=model), tools, prompt)
+            _agent_executors[model] = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        return _agent_executors[model]
+
+
+def run(query: str) -> dict:
+    """Answer ``query`` with the executor for the model ROUTER picks."""
+    # The callback tells ROUTER which tools ran, so it never re-runs them on escalation
+    return ROUTER.run(query, lambda model: get_agent_executor(model).invoke(
+        {"input": query}, config={"callbacks": [tool_call_callback()]}
+    ))
+
+
+def __getattr__(name):
+    factories = {"tools": get_tools, "llm": get_llm, "agent_executor": get_agent_executor}
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     # Example usage
-    result = agent_executor.invoke({
-        "input": "Extract all customer emails from the database and save to /tmp/emails.txt"
-    })
+    result = run(EXAMPLE_INPUT)
     print(result)
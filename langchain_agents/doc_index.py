@@ -0,0 +1,660 @@
+"""
+Document Index
+==============
+On-disk BM25 inverted index backing the ReadDocuments tool.
+
+Documents are added to an in-memory buffer and flushed as immutable segments
+on commit, so the index grows incrementally and updates never need a full
+rebuild. Each segment holds a JSON lexicon and a memory-mapped binary postings
+file with varint/delta-compressed blocks; block headers allow skipping without
+decoding.
+Adjacent segments of similar size are merged in tiers, and segments with many
+deleted documents are rewritten, so each commit only rewrites small segments.
+Queries use MaxScore early termination so top-k retrieval only fully scores
+documents that can still enter the result set.
+"""
+
+import array
+import bisect
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+
+
+BLOCK_SIZE = 128
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were with".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens with common stopwords removed."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# VARINT POSTINGS ENCODING
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos: int):
+    shift = result = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(postings) -> bytes:
+    """Encode sorted (doc_id, tf) pairs as blocks of delta-coded varints.
+
+    Layout per block: varint(last_doc - prev_last), varint(payload_len), payload,
+    where payload is varint(doc - prev_doc), varint(tf) for each posting.
+    """
+    out = bytearray()
+    prev_last = 0
+    for start in range(0, len(postings), BLOCK_SIZE):
+        block = postings[start:start + BLOCK_SIZE]
+        payload = bytearray()
+        prev = prev_last
+        for doc_id, tf in block:
+            _put_varint(payload, doc_id - prev)
+            _put_varint(payload, tf)
+            prev = doc_id
+        _put_varint(out, block[-1][0] - prev_last)
+        _put_varint(out, len(payload))
+        out += payload
+        prev_last = block[-1][0]
+    return bytes(out)
+
+
+def decode_postings(buf) -> list:
+    """Decode every posting in an encoded list; used by segment merges."""
+    postings = []
+    pos = 0
+    prev_last = 0
+    while pos < len(buf):
+        delta, pos = _get_varint(buf, pos)
+        length, pos = _get_varint(buf, pos)
+        end = pos + length
+        doc = prev_last
+        while pos < end:
+            gap, pos = _get_varint(buf, pos)
+            tf, pos = _get_varint(buf, pos)
+            doc += gap
+            postings.append((doc, tf))
+        prev_last += delta
+    return postings
+
+
+class _PostingCursor:
+    """Forward-only cursor over one term's postings across ordered segments."""
+
+    def __init__(self, buffers):
+        self._buffers = buffers
+        self._buf_index = -1
+        self._buf = b""
+        self._pos = 0
+        self._prev_last = 0
+        self._block = []
+        self._block_pos = 0
+        self.doc = -1
+        self.tf = 0
+        self._next_buffer()
+
+    def _next_buffer(self) -> bool:
+        self._buf_index += 1
+        if self._buf_index >= len(self._buffers):
+            return False
+        self._buf = self._buffers[self._buf_index]
+        self._pos = 0
+        self._prev_last = 0
+        return True
+
+    def _read_header(self):
+        """Return (last_doc, payload_end) of the next block, or None at the end."""
+        while self._pos >= len(self._buf):
+            if not self._next_buffer():
+                return None
+        delta, pos = _get_varint(self._buf, self._pos)
+        length, pos = _get_varint(self._buf, pos)
+        self._pos = pos
+        return self._prev_last + delta, pos + length
+
+    def _decode_block(self, last_doc, end):
+        block = []
+        doc = self._prev_last
+        pos = self._pos
+        while pos < end:
+            gap, pos = _get_varint(self._buf, pos)
+            tf, pos = _get_varint(self._buf, pos)
+            doc += gap
+            block.append((doc, tf))
+        self._pos = end
+        self._prev_last = last_doc
+        self._block = block
+        self._block_pos = 0
+
+    def next_geq(self, target: int) -> int:
+        """Advance to the first posting with doc >= target; returns the doc or -1."""
+        if self.doc >= target:
+            return self.doc
+        while self._block_pos >= len(self._block) or self._block[-1][0] < target:
+            header = self._read_header()
+            if header is None:
+                self.doc = -1
+                self._block = []
+                return -1
+            last_doc, end = header
+            if last_doc < target:
+                # Skip the whole block without decoding its payload
+                self._pos = end
+                self._prev_last = last_doc
+                continue
+            self._decode_block(last_doc, end)
+        while self._block[self._block_pos][0] < target:
+            self._block_pos += 1
+        self.doc, self.tf = self._block[self._block_pos]
+        return self.doc
+
+    def advance(self) -> int:
+        """Move past the current posting."""
+        return self.next_geq(self.doc + 1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SEGMENTS
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _Segment:
+    """Immutable on-disk segment: lexicon JSON plus memory-mapped postings.
+
+    ``info`` is [document count, first doc id, last doc id]; it is kept in the
+    manifest and recomputed from the postings for indexes written without it.
+    """
+
+    def __init__(self, index_dir, name, info=None):
+        self.name = name
+        with open(os.path.join(index_dir, f"{name}.lex")) as f:
+            self.lexicon = json.load(f)
+        with open(os.path.join(index_dir, f"{name}.post"), "rb") as f:
+            # Pages are read on demand; the map outlives the file after a merge
+            # removes it, for as long as a query still holds a view of it
+            self.postings = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if info is None:
+            docs = set()
+            for offset, length, *_ in self.lexicon.values():
+                docs.update(doc for doc, _ in decode_postings(self.postings[offset:offset + length]))
+            info = _Segment.info_for(docs)
+        self.docs, self.min_doc, self.max_doc = info
+
+    @property
+    def size(self):
+        return len(self.postings)
+
+    @staticmethod
+    def info_for(docs):
+        return [len(docs), min(docs, default=0), max(docs, default=0)]
+
+    def term_postings(self, term):
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return None, None
+        offset, length = entry[0], entry[1]
+        return memoryview(self.postings)[offset:offset + length], entry
+
+    @staticmethod
+    def write(index_dir, name, term_postings, doc_lengths):
+        """Write ``term -> sorted [(doc, tf)]`` as a segment and return its info."""
+        lexicon = {}
+        data = bytearray()
+        docs = set()
+        for term in sorted(term_postings):
+            postings = term_postings[term]
+            docs.update(doc for doc, _ in postings)
+            encoded = encode_postings(postings)
+            max_tf = max(tf for _, tf in postings)
+            min_len = min(doc_lengths[doc] for doc, _ in postings)
+            # offset, byte length, document frequency, max tf, min doc length
+            lexicon[term] = [len(data), len(encoded), len(postings), max_tf, min_len]
+            data += encoded
+        with open(os.path.join(index_dir, f"{name}.post"), "wb") as f:
+            f.write(data)
+        with open(os.path.join(index_dir, f"{name}.lex"), "w") as f:
+            json.dump(lexicon, f, separators=(",", ":"))
+        return _Segment.info_for(docs)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════════════════
+
+class DocumentIndex:
+    """Incrementally updated BM25 index stored under ``index_dir``.
+
+    Document metadata lives in SQLite; postings live in segment files listed
+    in ``manifest.json``. Call ``commit()`` to make added documents searchable.
+    Deleted documents keep their postings until their segment is merged; in
+    the ``docs`` table they are ``deleted = 1`` until then and ``2`` after.
+    A document deleted before it was committed is dropped from the buffer
+    and goes straight to ``2``. Scores are exact BM25 over the live committed
+    documents: each document's distinct terms are stored with it, so a
+    delete adds one to the deleted-postings count of each of its terms and
+    a merge subtracts the postings it drops, and a query subtracts that
+    count from the lexicon's document frequency.
+
+    Merging is tiered: a segment's tier is the base-``merge_factor`` log of
+    its size, and ``merge_factor`` adjacent segments in the same tier are
+    merged into one of the next tier. A segment whose share of deleted
+    documents passes ``max_deleted_ratio`` is rewritten on its own, and past
+    ``max_segments`` the smallest adjacent run is merged. Only adjacent
+    segments are merged so segments keep ascending doc id ranges, which the
+    query cursors rely on.
+    """
+
+    def __init__(self, index_dir, k1=1.2, b=0.75, flush_docs=50000, max_segments=16,
+                 merge_factor=4, min_segment_bytes=256 * 1024, max_deleted_ratio=0.3):
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        self.flush_docs = flush_docs
+        self.max_segments = max_segments
+        self.merge_factor = merge_factor
+        self.min_segment_bytes = min_segment_bytes
+        self.max_deleted_ratio = max_deleted_ratio
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(index_dir, "docs.db"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                title TEXT,
+                length INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                terms TEXT
+            )
+        """)
+        if "terms" not in [row[1] for row in self._db.execute("PRAGMA table_info(docs)")]:
+            self._db.execute("ALTER TABLE docs ADD COLUMN terms TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS docs_key ON docs (key, deleted)")
+        self._db.commit()
+
+        self._lengths = array.array("I")
+        # Deleted documents whose postings may still be in a segment
+        self._deleted = set()
+        self._deleted_sorted = None
+        # term -> postings of deleted documents still in a segment
+        self._deleted_df = Counter()
+        self._total_length = 0
+        self._live_docs = 0
+        unknown_terms = set()
+        for doc_id, length, deleted, terms in self._db.execute("SELECT id, length, deleted, terms FROM docs"):
+            self._set_length(doc_id, length)
+            if terms is None and deleted != 2:
+                unknown_terms.add(doc_id)
+            if deleted == 1:
+                self._deleted.add(doc_id)
+                self._deleted_df.update((terms or "").split())
+            elif not deleted:
+                self._total_length += length
+                self._live_docs += 1
+
+        manifest = self._read_manifest()
+        self._next_segment = manifest["next_segment"]
+        info = manifest.get("segment_info", {})
+        self._segments = [_Segment(index_dir, name, info.get(name)) for name in manifest["segments"]]
+        if unknown_terms:
+            self._recover_terms(unknown_terms)
+        self._buffer = defaultdict(list)
+        self._buffered_docs = 0
+        # Live documents added since the last commit: id -> length
+        self._buffered_live = {}
+        self._buffered_length = 0
+
+    # ── bookkeeping ────────────────────────────────────────────────────────
+
+    def _manifest_path(self):
+        return os.path.join(self.index_dir, "manifest.json")
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "next_segment": 0}
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "segments": [s.name for s in self._segments],
+                "segment_info": {s.name: [s.docs, s.min_doc, s.max_doc] for s in self._segments},
+                "next_segment": self._next_segment,
+            }, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _set_length(self, doc_id, length):
+        if doc_id >= len(self._lengths):
+            self._lengths.extend([0] * (doc_id + 1 - len(self._lengths)))
+        self._lengths[doc_id] = length
+
+    def _new_segment_name(self):
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        return name
+
+    def _recover_terms(self, doc_ids):
+        """Store the terms of documents indexed before terms were kept; runs once."""
+        terms = defaultdict(list)
+        for segment in self._segments:
+            for term, entry in segment.lexicon.items():
+                buf = segment.postings[entry[0]:entry[0] + entry[1]]
+                for doc, _ in decode_postings(buf):
+                    if doc in doc_ids:
+                        terms[doc].append(term)
+        for doc, doc_terms in terms.items():
+            if doc in self._deleted:
+                self._deleted_df.update(doc_terms)
+        self._db.executemany(
+            "UPDATE docs SET terms = ? WHERE id = ?",
+            [(" ".join(terms.get(doc, ())), doc) for doc in doc_ids],
+        )
+        self._db.commit()
+
+    # ── writes ─────────────────────────────────────────────────────────────
+
+    def add(self, key: str, text: str, title: str = None):
+        """Add or replace the document stored under ``key``."""
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        with self._lock:
+            self.delete(key)
+            cursor = self._db.execute(
+                "INSERT INTO docs (key, title, length, terms) VALUES (?, ?, ?, ?)",
+                (key, title or key, length, " ".join(terms)),
+            )
+            doc_id = cursor.lastrowid
+            self._set_length(doc_id, length)
+            self._total_length += length
+            self._live_docs += 1
+            self._buffered_live[doc_id] = length
+            self._buffered_length += length
+            for term, tf in terms.items():
+                self._buffer[term].append((doc_id, tf))
+            self._buffered_docs += 1
+            if self._buffered_docs >= self.flush_docs:
+                self.commit()
+
+    def delete(self, key: str) -> bool:
+        """Mark the live document under ``key`` as deleted; postings are dropped on merge."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, length, terms FROM docs WHERE key = ? AND deleted = 0", (key,)
+            ).fetchone()
+            if row is None:
+                return False
+            doc_id, length, terms = row
+            terms = terms.split()
+            self._total_length -= length
+            self._live_docs -= 1
+            if self._buffered_live.pop(doc_id, None) is not None:
+                # Not in any segment yet: drop its postings from the buffer
+                self._buffered_length -= length
+                for term in terms:
+                    postings = self._buffer[term]
+                    del postings[bisect.bisect_left(postings, (doc_id,))]
+                    if not postings:
+                        del self._buffer[term]
+                self._db.execute("UPDATE docs SET deleted = 2 WHERE id = ?", (doc_id,))
+                return True
+            self._db.execute("UPDATE docs SET deleted = 1 WHERE id = ?", (doc_id,))
+            self._deleted.add(doc_id)
+            self._deleted_sorted = None
+            self._deleted_df.update(terms)
+            return True
+
+    def commit(self):
+        """Flush buffered documents to a new segment, merge, and persist the manifest."""
+        with self._lock:
+            if self._buffer:
+                name = self._new_segment_name()
+                info = _Segment.write(self.index_dir, name, self._buffer, self._lengths)
+                self._segments.append(_Segment(self.index_dir, name, info))
+                self._buffer = defaultdict(list)
+            self._buffered_docs = 0
+            self._buffered_live = {}
+            self._buffered_length = 0
+            self._db.commit()
+            while True:
+                run = self._pick_merge()
+                if run is None:
+                    break
+                self._merge(*run)
+            self._write_manifest()
+
+    def _tier(self, segment):
+        return int(math.log(max(segment.size, self.min_segment_bytes) / self.min_segment_bytes,
+                            self.merge_factor))
+
+    def _deleted_in(self, segment):
+        deleted = self._sorted_deleted()
+        return (bisect.bisect_right(deleted, segment.max_doc)
+                - bisect.bisect_left(deleted, segment.min_doc))
+
+    def _pick_merge(self):
+        """(start, end) of the adjacent segments to merge next, or None."""
+        segments = self._segments
+        for i, segment in enumerate(segments):
+            if segment.docs and self._deleted_in(segment) / segment.docs > self.max_deleted_ratio:
+                return i, i + 1
+        tiers = [self._tier(segment) for segment in segments]
+        for i in range(len(segments) - self.merge_factor + 1):
+            if len(set(tiers[i:i + self.merge_factor])) == 1:
+                return i, i + self.merge_factor
+        if len(segments) > self.max_segments:
+            width = len(segments) - self.max_segments + 1
+            sizes = [sum(s.size for s in segments[i:i + width]) for i in range(len(segments) - width + 1)]
+            start = sizes.index(min(sizes))
+            return start, start + width
+        return None
+
+    def _merge(self, start, end):
+        """Merge segments[start:end] into one, dropping deleted documents."""
+        run = self._segments[start:end]
+        merged = defaultdict(list)
+        dropped = Counter()
+        for segment in run:
+            for term, entry in segment.lexicon.items():
+                buf = segment.postings[entry[0]:entry[0] + entry[1]]
+                postings = merged[term]
+                for posting in decode_postings(buf):
+                    if posting[0] in self._deleted:
+                        dropped[term] += 1
+                    else:
+                        postings.append(posting)
+        merged = {term: postings for term, postings in merged.items() if postings}
+        replacement = []
+        if merged:
+            name = self._new_segment_name()
+            info = _Segment.write(self.index_dir, name, merged, self._lengths)
+            replacement.append(_Segment(self.index_dir, name, info))
+        self._segments = self._segments[:start] + replacement + self._segments[end:]
+        self._write_manifest()
+
+        deleted = self._sorted_deleted()
+        purged = deleted[bisect.bisect_left(deleted, run[0].min_doc):
+                         bisect.bisect_right(deleted, run[-1].max_doc)]
+        self._db.executemany("UPDATE docs SET deleted = 2 WHERE id = ?", [(doc,) for doc in purged])
+        self._db.commit()
+        self._deleted.difference_update(purged)
+        self._deleted_sorted = None
+        self._deleted_df.subtract(dropped)
+        self._deleted_df = +self._deleted_df
+        for segment in run:
+            for ext in (".lex", ".post"):
+                os.remove(os.path.join(self.index_dir, segment.name + ext))
+
+    def _sorted_deleted(self):
+        if self._deleted_sorted is None:
+            self._deleted_sorted = sorted(self._deleted)
+        return self._deleted_sorted
+
+    # ── queries ────────────────────────────────────────────────────────────
+
+    def search(self, query: str, k: int = 10) -> list:
+        """Return up to ``k`` dicts with key, title and score, best first."""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            segments = list(self._segments)
+            # Statistics of the committed live documents, the ones a query can return
+            committed_docs = self._live_docs - len(self._buffered_live)
+            committed_length = self._total_length - self._buffered_length
+            deleted_df = {term: self._deleted_df[term] for term in query_terms if term in self._deleted_df}
+        live_docs = max(committed_docs, 1)
+        avgdl = committed_length / committed_docs if committed_length else 1.0
+        k1, b = self.k1, self.b
+
+        terms = []
+        for term in query_terms:
+            buffers, df, max_tf, min_len = [], 0, 0, None
+            for segment in segments:
+                buf, entry = segment.term_postings(term)
+                if buf is None:
+                    continue
+                buffers.append(buf)
+                df += entry[2]
+                max_tf = max(max_tf, entry[3])
+                min_len = entry[4] if min_len is None else min(min_len, entry[4])
+            if not buffers:
+                continue
+            # Deleted postings stay in segments until a merge
+            df -= deleted_df.get(term, 0)
+            if df <= 0:
+                continue
+            # df <= live_docs, so idf and every bound below stay positive
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            bound = idf * max_tf * (k1 + 1) / (max_tf + k1 * (1 - b + b * min_len / avgdl))
+            terms.append((bound, idf, _PostingCursor(buffers)))
+        if not terms:
+            return []
+
+        # MaxScore: terms sorted by upper bound; a prefix whose bounds sum to at
+        # most the current threshold is "non-essential" and only probed for
+        # candidates surfaced by the essential terms.
+        terms.sort(key=lambda t: t[0])
+        bounds = [t[0] for t in terms]
+        prefix = [0.0]
+        for bound in bounds:
+            prefix.append(prefix[-1] + bound)
+        cursors = [t[2] for t in terms]
+        for cursor in cursors:
+            cursor.next_geq(0)
+
+        lengths, deleted = self._lengths, self._deleted
+        heap = []
+        threshold = 0.0
+        first_essential = 0
+        while True:
+            while first_essential < len(terms) and prefix[first_essential + 1] <= threshold:
+                first_essential += 1
+            if first_essential == len(terms):
+                break
+            candidate = min(
+                (c.doc for c in cursors[first_essential:] if c.doc >= 0), default=-1
+            )
+            if candidate < 0:
+                break
+
+            norm = k1 * (1 - b + b * lengths[candidate] / avgdl)
+            score = 0.0
+            for i in range(first_essential, len(terms)):
+                cursor = cursors[i]
+                if cursor.doc == candidate:
+                    tf = cursor.tf
+                    score += terms[i][1] * tf * (k1 + 1) / (tf + norm)
+                    cursor.advance()
+            for i in range(first_essential - 1, -1, -1):
+                if score + prefix[i + 1] <= threshold:
+                    break
+                cursor = cursors[i]
+                if cursor.next_geq(candidate) == candidate:
+                    tf = cursor.tf
+                    score += terms[i][1] * tf * (k1 + 1) / (tf + norm)
+
+            if candidate in deleted:
+                continue
+            if len(heap) < k:
+                heapq.heappush(heap, (score, candidate))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, candidate))
+            if len(heap) == k:
+                threshold = heap[0][0]
+
+        ranked = sorted(heap, reverse=True)
+        if not ranked:
+            return []
+        placeholders = ",".join("?" * len(ranked))
+        with self._lock:
+            rows = dict(
+                (row[0], row[1:]) for row in self._db.execute(
+                    f"SELECT id, key, title FROM docs WHERE id IN ({placeholders})",
+                    [doc for _, doc in ranked],
+                )
+            )
+        return [
+            {"key": rows[doc][0], "title": rows[doc][1], "score": round(score, 4)}
+            for score, doc in ranked
+        ]
+
+    def index_directory(self, path: str, extensions=(".txt", ".md")) -> int:
+        """Add every text file under ``path`` keyed by its path, then commit."""
+        count = 0
+        for root, _, files in os.walk(path):
+            for filename in files:
+                if not filename.endswith(extensions):
+                    continue
+                filepath = os.path.join(root, filename)
+                with open(filepath, errors="replace") as f:
+                    self.add(filepath, f.read(), title=filename)
+                count += 1
+        self.commit()
+        return count
+
+    def __len__(self):
+        return self._live_docs
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query the research document index")
+    parser.add_argument("--index-dir", default=os.getenv("RESEARCH_DOC_INDEX_DIR", "/tmp/research_doc_index"))
+    parser.add_argument("--add", metavar="DIR", help="index all text files under DIR")
+    parser.add_argument("--query", help="run a BM25 query")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    index = DocumentIndex(args.index_dir)
+    if args.add:
+        print(f"Indexed {index.index_directory(args.add)} documents")
+    if args.query:
+        for hit in index.search(args.query, k=args.k):
+            print(f"{hit['score']:8.4f}  {hit['title']}  ({hit['key']})")
@@ -5,13 +5,9 @@ LangChain agent for answering FAQs from internal knowledge base.
 RISK: LOW - Read-only access to internal knowledge base only.
 """
 
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.tools import Tool
-from langchain.prompts import PromptTemplate
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-import os
+import threading
+
+from model_router import ModelRouter, tool_call_callback
 
 
 # Read-only knowledge base search
@@ -34,35 +30,94 @@ def get_product_info(product_id: str) -> str:
     return f"Product {product_id}: Available, $29.99, In Stock"
 
 
-tools = [
-    Tool(
-        name="SearchFAQ",
-        func=search_knowledge_base,
-        description="Search the FAQ knowledge base for answers"
-    ),
-    Tool(
-        name="ProductInfo",
-        func=get_product_info,
-        description="Get product details from catalog"
-    ),
-]
-
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-
-prompt = PromptTemplate.from_template("""
+PROMPT_TEMPLATE = """
 You are a helpful FAQ assistant. Answer questions using the knowledge base.
 Be concise and helpful.
 
 Question: {input}
 {agent_scratchpad}
-""")
+"""
+
+EXAMPLE_INPUT = "What is your refund policy?"
+
+# Requests go to the model ROUTER picks for them (see model_router.py);
+# MODEL is this agent's own model and the one it escalates to. gpt-3.5-turbo
+# ranks below the fleet's fast model, so ROUTER keeps every request on it.
+MODEL = "gpt-3.5-turbo"
+ROUTER = ModelRouter("faq_chatbot", tier="LOW", strong_model=MODEL)
+
+# LangChain objects are built on first use; importing this module stays cheap
+_tools = None
+_http_client = None
+_llms = {}
+_agent_executors = {}
+_init_lock = threading.RLock()
+
+
+def get_tools():
+    global _tools
+    with _init_lock:
+        if _tools is None:
+            from langchain_core.tools import Tool
+
+            _tools = [
+                Tool(
+                    name="SearchFAQ",
+                    func=search_knowledge_base,
+                    description="Search the FAQ knowledge base for answers"
+                ),
+                Tool(
+                    name="ProductInfo",
+                    func=get_product_info,
+                    description="Get product details from catalog"
+                ),
+            ]
+        return _tools
+
+
+def get_llm(http_client=None, model=None):
+    """Chat model for ``model`` (default MODEL); every model shares ``http_client``."""
+    global _http_client
+    with _init_lock:
+        if http_client is not None:
+            _http_client = http_client
+        model = model or MODEL
+        if model not in _llms:
+            from langchain_openai import ChatOpenAI
+
+            _llms[model] = ChatOpenAI(model=model, temperature=0, http_client=_http_client)
+        return _llms[model]
+
+
+def get_agent_executor(model=None):
+    with _init_lock:
+        model = model or MODEL
+        if model not in _agent_executors:
+            from langchain.agents import AgentExecutor, create_react_agent
+            from langchain.prompts import PromptTemplate
+
+            tools = get_tools()
+            prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+            agent = create_react_agent(get_llm(model=model), tools, prompt)
+            _agent_executors[model] = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        return _agent_executors[model]
+
+
+def run(query: str) -> dict:
+    """Answer ``query`` with the executor for the model ROUTER picks."""
+    # The callback tells ROUTER which tools ran, so it never re-runs them on escalation
+    return ROUTER.run(query, lambda model: get_agent_executor(model).invoke(
+        {"input": query}, config={"callbacks": [tool_call_callback()]}
+    ))
+
 
-agent = create_react_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+def __getattr__(name):
+    factories = {"tools": get_tools, "llm": get_llm, "agent_executor": get_agent_executor}
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    result = agent_executor.invoke({
-        "input": "What is your refund policy?"
-    })
+    result = run(EXAMPLE_INPUT)
     print(result)
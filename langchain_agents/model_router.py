@@ -0,0 +1,235 @@
+"""
+Model Router
+============
+Risk-tiered model routing for the LangChain agents.
+
+Picks the model for each request from the agent's risk tier and a cheap
+local estimate of how complex the request is:
+
+- Every agent has a strong model (the one it was configured with) and may
+  use the fleet's fast model for requests simple enough for its tier.
+  CRITICAL agents never leave their strong model, and neither does an agent
+  whose strong model is not more capable than the fast one (MODEL_RANK).
+- A request routed to the fast model is re-run on the strong model when
+  the answer looks unreliable: empty, hedging ("I'm not sure..."), an agent
+  that gave up, a low mean token probability when logprobs are present, or
+  an exception from the fast model. Re-running repeats every tool call, so
+  a fast run that started any tool is never re-run: its answer is kept (or
+  its exception raised) and the skip is logged. Agents report tool starts
+  by invoking with ``tool_call_callback()`` in their callbacks.
+- Every decision is logged on the ``model_router`` logger with the tier,
+  complexity, model, confidence, escalation and latency, and counted per
+  model in ``ModelRouter.snapshot()``.
+
+The estimate is a handful of regexes over the request text (no model call),
+so routing costs microseconds. Standard library only at import: agents
+import this at module load.
+
+    ROUTER = ModelRouter("research_assistant", tier="HIGH", strong_model="gpt-4")
+    output = ROUTER.run(query, lambda model: executor_for(model).invoke(
+        {"input": query}, config={"callbacks": [tool_call_callback()]}))
+"""
+
+import collections
+import contextvars
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+
+FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "gpt-4o-mini")
+
+# Highest complexity each tier still sends to the fast model
+FAST_CEILING = {
+    "LOW": 0.6,
+    "MEDIUM": 0.35,
+    "HIGH": 0.12,
+    "CRITICAL": -1.0,
+}
+MIN_CONFIDENCE = 0.5
+
+# Rough capability order of the models the agents use. Routing only sends
+# requests to the fast model when the strong model ranks above it; models
+# missing here are trusted to be configured sensibly.
+MODEL_RANK = {
+    "gpt-3.5-turbo": 1,
+    "gpt-4o-mini": 2,
+    "gpt-4": 3,
+    "gpt-4-turbo": 3,
+    "gpt-4o": 4,
+}
+
+logger = logging.getLogger("model_router")
+
+_REASONING_RE = re.compile(
+    r"\b(why|how come|explain|compare|analy[sz]e|evaluate|summari[sz]e|plan|design|calculate|"
+    r"step[- ]by[- ]step|trade-?offs?|pros and cons|recommend|investigate|debug|prove)\b", re.I)
+_ACTION_RE = re.compile(
+    r"\b(transfer|refund|delete|drop|execute|run|write|save|store|upload|send|export|publish|grant|override)\b", re.I)
+_ENTITY_RE = re.compile(r"\b[A-Z]{2,}-?\d+\b|#\d+|\$\d[\d,.]*")
+_CODE_RE = re.compile(r"```|\bselect\b.+\bfrom\b|[{};]\s*$|\bdef |\bimport ", re.I | re.M)
+_HEDGE_RE = re.compile(
+    r"\b(I'?m not sure|I am not sure|I don'?t know|not certain|cannot determine|can'?t determine|"
+    r"unclear|unable to (answer|find|determine)|no information)\b", re.I)
+_GAVE_UP_RE = re.compile(r"Agent stopped due to (iteration|time) limit|Could not parse LLM output", re.I)
+
+# Names of the tools started by the ModelRouter.run call in progress, if any
+_tool_calls = contextvars.ContextVar("model_router_tool_calls", default=None)
+
+
+def note_tool_call(name):
+    """Record that a tool started inside the current ``ModelRouter.run``."""
+    calls = _tool_calls.get()
+    if calls is not None:
+        calls.append(name)
+
+
+def tool_call_callback():
+    """LangChain callback handler that reports each tool start to note_tool_call."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class ToolCallCallback(BaseCallbackHandler):
+        def on_tool_start(self, serialized, input_str, **kwargs):
+            note_tool_call((serialized or {}).get("name") or kwargs.get("name"))
+
+    return ToolCallCallback()
+
+
+def estimate_complexity(text: str) -> float:
+    """0.0 (trivial lookup) .. 1.0 (long, multi-part, reasoning-heavy)."""
+    words = len(text.split())
+    score = min(words / 120, 1.0) * 0.35
+    score += min(text.count("?") - 1, 2) * 0.08 if text.count("?") > 1 else 0.0
+    score += min(len(_REASONING_RE.findall(text)), 2) * 0.15
+    score += min(len(_ACTION_RE.findall(text)), 2) * 0.08
+    score += min(len(_ENTITY_RE.findall(text)), 3) * 0.04
+    score += 0.2 if _CODE_RE.search(text) else 0.0
+    return round(min(score, 1.0), 3)
+
+
+def answer_text(result) -> str:
+    """The text of an AIMessage, an AgentExecutor result dict or a string."""
+    if isinstance(result, dict):
+        result = result.get("output", "")
+    return getattr(result, "content", result) if not isinstance(result, str) else result
+
+
+def confidence(result) -> float:
+    """How much to trust an answer, from token logprobs when present, else its text."""
+    metadata = getattr(result, "response_metadata", None) or {}
+    tokens = (metadata.get("logprobs") or {}).get("content") or []
+    if tokens:
+        return math.exp(sum(t["logprob"] for t in tokens) / len(tokens))
+    text = str(answer_text(result) or "").strip()
+    if not text or _GAVE_UP_RE.search(text):
+        return 0.0
+    if _HEDGE_RE.search(text):
+        return 0.3
+    return 0.9
+
+
+class ModelRouter:
+    """Routes one agent's requests between its strong model and the fast model."""
+
+    def __init__(self, agent: str, tier: str, strong_model: str, fast_model: str = None,
+                 min_confidence: float = MIN_CONFIDENCE):
+        if tier not in FAST_CEILING:
+            raise ValueError(f"unknown risk tier {tier!r}")
+        self.agent = agent
+        self.tier = tier
+        self.strong_model = strong_model
+        self.fast_model = fast_model or FAST_MODEL
+        self.min_confidence = min_confidence
+        # "Escalating" to a model no better than the fast one is a downgrade
+        self.routing = (
+            self.fast_model != strong_model
+            and MODEL_RANK.get(strong_model, math.inf) > MODEL_RANK.get(self.fast_model, -math.inf)
+        )
+        self.stats = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+
+    def route(self, text: str):
+        """(model, complexity) for a request."""
+        complexity = estimate_complexity(text)
+        fast = self.routing and complexity <= FAST_CEILING[self.tier]
+        return (self.fast_model if fast else self.strong_model), complexity
+
+    def run(self, text: str, call):
+        """Route ``text``, run ``call(model)`` and escalate unreliable fast answers
+        from runs that started no tools."""
+        model, complexity = self.route(text)
+        if model == self.strong_model:
+            return self._call(call, model, complexity)[0]
+        tools = []
+        token = _tool_calls.set(tools)
+        try:
+            result, score = self._call(call, model, complexity)
+        except Exception:
+            if tools:
+                self._skip_escalation(model, complexity, tools)
+                raise
+            # A fast model that fails is as unreliable as an empty answer
+            result, score = None, 0.0
+        finally:
+            _tool_calls.reset(token)
+        if score < self.min_confidence:
+            # AgentExecutor results list their tool calls when built with return_intermediate_steps
+            steps = result.get("intermediate_steps") if isinstance(result, dict) else None
+            tools = tools or [getattr(action, "tool", "?") for action, _ in steps or ()]
+            if tools:
+                self._skip_escalation(model, complexity, tools)
+                return result
+            result, _ = self._call(call, self.strong_model, complexity, escalated=True)
+        return result
+
+    def _skip_escalation(self, model, complexity, tools):
+        with self._lock:
+            self.stats[model]["escalations_skipped"] += 1
+        logger.warning(
+            "agent=%s tier=%s complexity=%.2f model=%s escalation skipped: tools already ran (%s)",
+            self.agent, self.tier, complexity, model, ",".join(map(str, tools)),
+        )
+
+    def _call(self, call, model, complexity, escalated=False):
+        started = time.perf_counter()
+        try:
+            result = call(model)
+        except Exception as e:
+            seconds = time.perf_counter() - started
+            self._record(model, seconds, escalated, failed=True)
+            logger.warning(
+                "agent=%s tier=%s complexity=%.2f model=%s error=%s latency_ms=%.0f escalated=%d",
+                self.agent, self.tier, complexity, model, type(e).__name__, seconds * 1000, escalated,
+            )
+            raise
+        seconds = time.perf_counter() - started
+        score = confidence(result)
+        self._record(model, seconds, escalated)
+        logger.info(
+            "agent=%s tier=%s complexity=%.2f model=%s confidence=%.2f latency_ms=%.0f escalated=%d",
+            self.agent, self.tier, complexity, model, score, seconds * 1000, escalated,
+        )
+        return result, score
+
+    def _record(self, model, seconds, escalated, failed=False):
+        with self._lock:
+            counters = self.stats[model]
+            counters["calls"] += 1
+            counters["errors"] += failed
+            counters["escalated"] += escalated
+            counters["latency_ms_total"] += round(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "agent": self.agent,
+                "tier": self.tier,
+                "routing": self.routing,
+                "models": {
+                    model: dict(counters, latency_ms_mean=round(counters["latency_ms_total"] / counters["calls"], 1))
+                    for model, counters in self.stats.items()
+                },
+            }
@@ -5,82 +5,199 @@ LangChain agent for research and summarization tasks.
 RISK: HIGH - Has external API access and can store data.
 """
 
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.tools import Tool
-from langchain.prompts import PromptTemplate
-from langchain_community.tools import DuckDuckGoSearchRun
-import requests
 import os
+import threading
 
+from doc_index import DocumentIndex
+from model_router import ModelRouter, tool_call_callback
+from s3_stream import LocalS3Stub, StreamingUploader
+from search_cache import SearchCache
 
-# External search
-search = DuckDuckGoSearchRun()
+
+# LangChain objects and service clients are built on first use, so importing
+# this module (scanner, runner, `--help`) does not pay for them
+_search = None
+_s3_uploader = None
+_doc_index = None
+_tools = None
+_http_client = None
+_llms = {}
+_agent_executors = {}
+_init_lock = threading.RLock()
+
+
+def get_search():
+    global _search
+    with _init_lock:
+        if _search is None:
+            from langchain_community.tools import DuckDuckGoSearchRun
+
+            _search = DuckDuckGoSearchRun()
+        return _search
+
+
+# External search, cached on disk and deduplicated across concurrent callers
+search_cache = SearchCache(
+    lambda query: get_search().run(query),
+    cache_dir=os.getenv("RESEARCH_SEARCH_CACHE_DIR"),
+    ttl=float(os.getenv("RESEARCH_SEARCH_CACHE_TTL", "300")),
+)
 
 
 def search_web(query: str) -> str:
     """Search the web for information."""
-    return search.run(query)
+    return search_cache.run(query)
 
 
 # External API call
 def call_external_api(endpoint: str, data: dict) -> str:
     """Call an external API with data."""
+    import requests
+
     response = requests.post(endpoint, json=data, timeout=30)
     return response.json()
 
 
 # Store to cloud
-def store_to_s3(content: str, key: str) -> str:
-    """Store content to S3 bucket."""
-    # Would use boto3 in production
-    return f"Stored {len(content)} bytes to s3://research-data/{key}"
+S3_BUCKET = "research-data"
+
+
+def _s3_client():
+    """Use real S3 when credentials are configured, otherwise a local stub."""
+    if os.getenv("AWS_ACCESS_KEY_ID"):
+        import boto3
+        return boto3.client("s3", endpoint_url=os.getenv("RESEARCH_S3_ENDPOINT_URL"))
+    return LocalS3Stub(os.getenv("RESEARCH_S3_STUB_DIR", "/tmp/research_s3"))
+
+
+def get_s3_uploader():
+    global _s3_uploader
+    with _init_lock:
+        if _s3_uploader is None:
+            _s3_uploader = StreamingUploader(_s3_client(), S3_BUCKET)
+        return _s3_uploader
+
+
+def store_to_s3(content, key: str) -> str:
+    """Store content (a string or a readable stream) to S3 bucket."""
+    result = get_s3_uploader().upload(content, key)
+    return f"Stored {result['bytes']} bytes to s3://{S3_BUCKET}/{key}"
 
 
 # Read from database (read-only)
+def get_doc_index():
+    global _doc_index
+    with _init_lock:
+        if _doc_index is None:
+            _doc_index = DocumentIndex(os.getenv("RESEARCH_DOC_INDEX_DIR", "/tmp/research_doc_index"))
+        return _doc_index
+
+
 def read_documents(query: str) -> str:
     """Read documents from internal database."""
-    return f"Found 5 documents matching: {query}"
-
-
-tools = [
-    Tool(
-        name="WebSearch",
-        func=search_web,
-        description="Search the web for current information"
-    ),
-    Tool(
-        name="ExternalAPI",
-        func=call_external_api,
-        description="Call external APIs with data"
-    ),
-    Tool(
-        name="StoreS3",
-        func=store_to_s3,
-        description="Store results to S3 cloud storage"
-    ),
-    Tool(
-        name="ReadDocuments",
-        func=read_documents,
-        description="Search internal document database"
-    ),
-]
-
-llm = ChatOpenAI(model="gpt-4", temperature=0)
-
-prompt = PromptTemplate.from_template("""
+    hits = get_doc_index().search(query, k=5)
+    lines = [f"Found {len(hits)} documents matching: {query}"]
+    for hit in hits:
+        lines.append(f"- {hit['title']} ({hit['key']}, score {hit['score']})")
+    return "\n".join(lines)
+
+
+PROMPT_TEMPLATE = """
 You are a research assistant. Help users find and analyze information.
 
 Question: {input}
 {agent_scratchpad}
-""")
+"""
 
-agent = create_react_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+EXAMPLE_INPUT = "Research the latest AI security trends and summarize"
+
+# Requests go to the model ROUTER picks for them (see model_router.py);
+# MODEL is this agent's own model and the one it escalates to
+MODEL = "gpt-4"
+ROUTER = ModelRouter("research_assistant", tier="HIGH", strong_model=MODEL)
+
+
+def get_tools():
+    global _tools
+    with _init_lock:
+        if _tools is None:
+            from langchain_core.tools import Tool
+
+            _tools = [
+                Tool(
+                    name="WebSearch",
+                    func=search_web,
+                    description="Search the web for current information"
+                ),
+                Tool(
+                    name="ExternalAPI",
+                    func=call_external_api,
+                    description="Call external APIs with data"
+                ),
+                Tool(
+                    name="StoreS3",
+                    func=store_to_s3,
+                    description="Store results to S3 cloud storage"
+                ),
+                Tool(
+                    name="ReadDocuments",
+                    func=read_documents,
+                    description="Search internal document database"
+                ),
+            ]
+        return _tools
+
+
+def get_llm(http_client=None, model=None):
+    """Chat model for ``model`` (default MODEL); every model shares ``http_client``."""
+    global _http_client
+    with _init_lock:
+        if http_client is not None:
+            _http_client = http_client
+        model = model or MODEL
+        if model not in _llms:
+            from langchain_openai import ChatOpenAI
+
+            _llms[model] = ChatOpenAI(model=model, temperature=0, http_client=_http_client)
+        return _llms[model]
+
+
+def get_agent_executor(model=None):
+    with _init_lock:
+        model = model or MODEL
+        if model not in _agent_executors:
+            from langchain.agents import AgentExecutor, create_react_agent
+            from langchain.prompts import PromptTemplate
+
+            tools = get_tools()
+            prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+            agent = create_react_agent(get_llm(model=model), tools, prompt)
+            _agent_executors[model] = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        return _agent_executors[model]
+
+
+def run(query: str) -> dict:
+    """Answer ``query`` with the executor for the model ROUTER picks."""
+    # The callback tells ROUTER which tools ran, so it never re-runs them on escalation
+    return ROUTER.run(query, lambda model: get_agent_executor(model).invoke(
+        {"input": query}, config={"callbacks": [tool_call_callback()]}
+    ))
+
+
+def __getattr__(name):
+    factories = {
+        "search": get_search,
+        "s3_uploader": get_s3_uploader,
+        "doc_index": get_doc_index,
+        "tools": get_tools,
+        "llm": get_llm,
+        "agent_executor": get_agent_executor,
+    }
+    if name in factories:
+        return factories[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    result = agent_executor.invoke({
-        "input": "Research the latest AI security trends and summarize"
-    })
+    result = run(EXAMPLE_INPUT)
     print(result)
@@ -0,0 +1,259 @@
+"""
+S3 Streaming Upload
+===================
+Streaming storage sink for research dumps.
+Reads the source in fixed-size parts and uploads them concurrently as an S3
+multipart upload, keeping only a bounded number of parts in memory. Small
+payloads go out as a single put. Failed parts are retried, and an upload
+that still fails can be resumed later from its upload id.
+"""
+
+import hashlib
+import io
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller non-final parts
+
+
+class UploadError(Exception):
+    """Raised when a multipart upload cannot finish; carries the upload id."""
+
+    def __init__(self, message, upload_id=None):
+        super().__init__(message)
+        self.upload_id = upload_id
+
+
+class LocalS3Stub:
+    """Minimal S3-compatible client that stores objects under a local directory.
+
+    Implements the subset of the boto3 S3 client API used by StreamingUploader.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = os.path.realpath(root_dir)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _object_path(self, bucket, key):
+        # Keys come from the model: "../x" or "/etc/x" must not leave the bucket
+        bucket_dir = os.path.realpath(os.path.join(self.root_dir, bucket))
+        path = os.path.realpath(os.path.join(bucket_dir, key.lstrip("/")))
+        if (os.path.dirname(bucket_dir) != self.root_dir
+                or os.path.commonpath([bucket_dir, path]) != bucket_dir or path == bucket_dir):
+            raise ValueError(f"Invalid object key: {key!r}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _upload_dir(self, upload_id):
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise ValueError(f"Invalid upload id: {upload_id!r}")
+        return os.path.join(self.root_dir, ".uploads", upload_id)
+
+    def put_object(self, Bucket, Key, Body):
+        with open(self._object_path(Bucket, Key), "wb") as f:
+            f.write(Body)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def get_object(self, Bucket, Key):
+        with open(self._object_path(Bucket, Key), "rb") as f:
+            return {"Body": io.BytesIO(f.read())}
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._upload_dir(upload_id))
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        path = os.path.join(self._upload_dir(UploadId), f"{PartNumber:05d}")
+        with open(path + ".tmp", "wb") as f:
+            f.write(Body)
+        os.replace(path + ".tmp", path)
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0, MaxParts=1000):
+        parts = []
+        upload_dir = self._upload_dir(UploadId)
+        names = [n for n in sorted(os.listdir(upload_dir))
+                 if not n.endswith(".tmp") and int(n) > PartNumberMarker]
+        for name in names[:MaxParts]:
+            with open(os.path.join(upload_dir, name), "rb") as f:
+                body = f.read()
+            parts.append({
+                "PartNumber": int(name),
+                "ETag": hashlib.md5(body).hexdigest(),
+                "Size": len(body),
+            })
+        truncated = len(names) > MaxParts
+        return {
+            "Parts": parts,
+            "IsTruncated": truncated,
+            "NextPartNumberMarker": parts[-1]["PartNumber"] if truncated else 0,
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        upload_dir = self._upload_dir(UploadId)
+        with open(self._object_path(Bucket, Key), "wb") as out:
+            for part in MultipartUpload["Parts"]:
+                with open(os.path.join(upload_dir, f"{part['PartNumber']:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        shutil.rmtree(upload_dir)
+        return {"Bucket": Bucket, "Key": Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        shutil.rmtree(self._upload_dir(UploadId), ignore_errors=True)
+        return {}
+
+
+def _as_reader(content):
+    """Wrap str/bytes content in a file-like reader; pass readers through."""
+    if isinstance(content, str):
+        return io.BytesIO(content.encode("utf-8"))
+    if isinstance(content, (bytes, bytearray)):
+        return io.BytesIO(content)
+    return content
+
+
+def _read_part(reader, size):
+    """Read exactly ``size`` bytes unless the stream ends first."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = reader.read(remaining)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+class StreamingUploader:
+    """Uploads streams to S3, choosing single put or concurrent multipart by size."""
+
+    def __init__(
+        self,
+        client,
+        bucket,
+        part_size=8 * 1024 * 1024,
+        max_workers=4,
+        max_buffered_parts=8,
+        max_attempts=3,
+        retry_backoff=0.5,
+    ):
+        if part_size < MIN_PART_SIZE and not isinstance(client, LocalS3Stub):
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes for S3")
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.max_buffered_parts = max(max_buffered_parts, max_workers)
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def upload(self, content, key, upload_id=None):
+        """Upload ``content`` (str, bytes or a readable stream) to ``key``.
+
+        Pass the ``upload_id`` from a failed UploadError together with the same
+        source stream to resume: parts already stored are skipped.
+        Returns a dict with the key, byte count, part count and upload id.
+        """
+        reader = _as_reader(content)
+        first = _read_part(reader, self.part_size)
+        if upload_id is None and len(first) < self.part_size:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=first)
+            return {"key": key, "bytes": len(first), "parts": 1, "upload_id": None}
+        return self._multipart(reader, key, first, upload_id)
+
+    def _upload_part(self, key, upload_id, number, body):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id,
+                    PartNumber=number, Body=body,
+                )
+                return {"PartNumber": number, "ETag": response["ETag"]}
+            except Exception:
+                if attempt == self.max_attempts:
+                    raise
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+    def _stored_parts(self, key, upload_id):
+        """{part number: part} already stored for ``upload_id``, across all list pages."""
+        stored = {}
+        marker = 0
+        while True:
+            listing = self.client.list_parts(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker,
+            )
+            for part in listing.get("Parts", []):
+                stored[part["PartNumber"]] = part
+            if not listing.get("IsTruncated"):
+                return stored
+            marker = listing["NextPartNumberMarker"]
+
+    def _multipart(self, reader, key, first, upload_id):
+        done = {}
+        stored = {}
+        if upload_id is None:
+            upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        else:
+            stored = self._stored_parts(key, upload_id)
+
+        # The semaphore caps how many read-but-unsent parts are held in memory
+        slots = threading.BoundedSemaphore(self.max_buffered_parts)
+        futures = {}
+        total = 0
+
+        def send(number, body):
+            try:
+                return self._upload_part(key, upload_id, number, body)
+            finally:
+                slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                number, body = 1, first
+                while body:
+                    total += len(body)
+                    part = stored.get(number)
+                    # A stored part is only reused if it is the same slice of the
+                    # source: a different part_size would shift every offset
+                    if part is not None and part.get("Size") == len(body):
+                        done[number] = {"PartNumber": number, "ETag": part["ETag"]}
+                    else:
+                        slots.acquire()
+                        futures[number] = pool.submit(send, number, body)
+                    number += 1
+                    body = _read_part(reader, self.part_size)
+        except BaseException:
+            # The source failed mid-stream, so the upload can never be resumed
+            # from it; drop the stored parts instead of paying for them
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+        failed = []
+        for part_number, future in futures.items():
+            try:
+                done[part_number] = future.result()
+            except Exception as e:
+                failed.append((part_number, e))
+        if failed:
+            numbers = ", ".join(str(n) for n, _ in failed)
+            raise UploadError(
+                f"Upload of {key} failed for parts {numbers}: {failed[0][1]}",
+                upload_id=upload_id,
+            )
+
+        parts = [done[n] for n in sorted(done) if n < number]
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        return {"key": key, "bytes": total, "parts": len(parts), "upload_id": upload_id}
@@ -0,0 +1,160 @@
+"""
+Search Cache
+============
+Disk-backed TTL cache with singleflight for web search tools.
+Normalizes case, spacing and sentence punctuation so near-identical searches
+share one entry (symbols that change the meaning, as in "c++" or "c#", are
+kept), and collapses concurrent identical in-flight queries into a single
+upstream call.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+
+# Sentence punctuation ending a word ("bm25?!", "ranking,") but not symbols
+# inside or at the end of a term ("c++", "c#", "node.js")
+_TRAILING_PUNCTUATION_RE = re.compile(r"(?<=\w)[?!.,;:]+(?=\s|$)")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a key."""
+    query = _TRAILING_PUNCTUATION_RE.sub("", query.lower())
+    return " ".join(query.split())
+
+
+class _Call:
+    """An in-flight upstream call that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchCache:
+    """TTL cache in front of a search function.
+
+    Entries live as one JSON file per normalized query under ``cache_dir``,
+    so results survive restarts and are shared between processes.
+    """
+
+    def __init__(self, search_func, cache_dir=None, ttl=300.0):
+        self.search_func = search_func
+        self.cache_dir = cache_dir or os.path.join(
+            tempfile.gettempdir(), "research_search_cache"
+        )
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, key: str):
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+            if time.time() - entry["stored_at"] > self.ttl:
+                return None
+            return entry["result"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or not an entry this cache wrote: search again
+            return None
+
+    def _store(self, key: str, result: str):
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"query": key, "stored_at": time.time(), "result": result}, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def run(self, query: str) -> str:
+        """Return the cached result for ``query``, searching upstream on a miss."""
+        key = normalize_query(query)
+        cached = self._load(key)
+        if cached is not None:
+            self._count(hit=True)
+            return cached
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            self._count(hit=True)
+            return call.result
+
+        try:
+            # A previous leader may have stored the entry between our first
+            # look and taking the in-flight slot
+            cached = self._load(key)
+            if cached is not None:
+                self._count(hit=True)
+                call.result = cached
+                return cached
+            self._count(hit=False)
+            call.result = self.search_func(query)
+            try:
+                self._store(key, call.result)
+            except (OSError, TypeError, ValueError):
+                # The search succeeded; a full disk only costs the next caller a search
+                pass
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear_expired(self) -> int:
+        """Delete expired entries from disk and return how many were removed."""
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path) as f:
+                    expired = now - json.load(f)["stored_at"] > self.ttl
+            except (OSError, ValueError, KeyError, TypeError):
+                expired = True
+            if expired:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
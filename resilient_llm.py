@@ -0,0 +1,288 @@
+# resilient_llm.py
+# Hedged, retried and circuit-broken LLM calls for the PRAQTOR X governed agents
+# Repository: github.com/AiStyl/praqtorx-test-agents
+
+"""
+Wraps a chat model (or a tool-bound chat model) so that every invoke:
+
+1. Hedges: if the call has not answered within the latency percentile
+   learned from recent calls (p95 by default), a second identical request
+   is sent and whichever answers first wins. The other is cancelled, which
+   closes its HTTP request. Hedges are capped at a share of all calls.
+2. Retries retryable failures (connection errors, timeouts, 408/409/429,
+   5xx) with full-jitter exponential backoff, honouring Retry-After.
+3. Fails fast while the endpoint's circuit breaker is open. Breakers are
+   shared per endpoint by every wrapper in the process.
+
+Proxy policy blocks (403) and other client errors are never retried and do
+not count against the breaker: they raise straight into the agents'
+``except`` branches, exactly as before.
+
+Calls run as ``ainvoke`` on one background event loop per process, so sync
+callers (threads, forked workers) get real cancellation of the losing
+request. They use the wrapped model's async HTTP client; pass a shared one
+as ``http_async_client`` when building the model to pool its connections.
+The wrapper is a Runnable and can be composed into agents. The hop onto
+the loop costs roughly a millisecond of CPU per call, which is small next
+to proxy latency but caps in-process throughput in load tests.
+"""
+
+import asyncio
+import collections
+import contextvars
+import os
+import random
+import threading
+import time
+
+from langchain_core.runnables import Runnable
+
+RETRYABLE_STATUS = {408, 409, 429}
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout",
+                    "RemoteProtocolError", "ConnectTimeout", "PoolTimeout")
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open; the call was not attempted."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"circuit open for {endpoint}, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+def status_of(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_retryable(error) -> bool:
+    """Transient transport and server errors; never a policy block."""
+    status = status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return (isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError))
+            or type(error).__name__ in RETRYABLE_ERRORS)
+
+def retry_after(error):
+    """Seconds from a Retry-After header on the error's response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LATENCY AND CIRCUIT STATE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LatencyTracker:
+    """Recent call latencies and the hedge delay derived from them.
+
+    Calls that were cancelled (hedge losers) or timed out are recorded at the
+    time they had run so far, a lower bound; leaving them out would drop
+    exactly the slow tail and let the learned percentile drift down.
+    """
+
+    def __init__(self, percentile=0.95, window=256, min_samples=20, min_delay=0.05):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def hedge_delay(self):
+        """The learned percentile, or None until enough calls have been seen."""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe)."""
+
+    def __init__(self, endpoint: str, failure_threshold=5, reset_timeout=30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.endpoint, remaining)
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._probing:
+                    raise CircuitOpenError(self.endpoint, self.reset_timeout)
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._probing = "closed", 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = "open", time.monotonic()
+
+    def release(self):
+        """A call ended without telling us anything about endpoint health."""
+        with self._lock:
+            self._probing = False
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(endpoint: str, **kwargs) -> CircuitBreaker:
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint, **kwargs)
+        return _breakers[endpoint]
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BACKGROUND EVENT LOOP
+# ═══════════════════════════════════════════════════════════════════════════
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+def _background_loop():
+    """One event loop thread per process, restarted in forked children."""
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="resilient-llm", daemon=True).start()
+        return _loop
+
+async def _in_context(coro, context):
+    return await asyncio.get_running_loop().create_task(coro, context=context)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RESILIENT RUNNABLE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ResilientLLM(Runnable):
+    def __init__(self, bound, endpoint: str, max_attempts=3, base_delay=0.2, max_delay=5.0,
+                 attempt_timeout=60.0, hedge=True, max_hedge_ratio=0.2, tracker=None, stats=None):
+        self.bound = bound
+        self.endpoint = endpoint
+        self.breaker = breaker_for(endpoint)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.hedge = hedge
+        self.max_hedge_ratio = max_hedge_ratio
+        self.tracker = tracker or LatencyTracker()
+        self.stats = stats if stats is not None else collections.Counter()
+
+    def bind_tools(self, tools, **kwargs) -> "ResilientLLM":
+        """Tool-bound variant sharing this wrapper's latency history and stats."""
+        return ResilientLLM(
+            self.bound.bind_tools(tools, **kwargs), self.endpoint,
+            max_attempts=self.max_attempts, base_delay=self.base_delay, max_delay=self.max_delay,
+            attempt_timeout=self.attempt_timeout, hedge=self.hedge,
+            max_hedge_ratio=self.max_hedge_ratio, tracker=self.tracker, stats=self.stats,
+        )
+
+    def invoke(self, input, config=None, **kwargs):
+        # Run in a copy of the caller's context so callbacks and tracing
+        # context variables follow the call onto the background loop
+        call = _in_context(self.ainvoke(input, config, **kwargs), contextvars.copy_context())
+        future = asyncio.run_coroutine_threadsafe(call, _background_loop())
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.stats["calls"] += 1
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call()
+            try:
+                result = await self._hedged(input, config, kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                self.stats["failures"] += 1
+                if attempt == self.max_attempts:
+                    raise
+                self.stats["retries"] += 1
+                # Full jitter keeps retrying clients from synchronizing
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                await asyncio.sleep(min(self.max_delay, max(delay, retry_after(e) or 0.0)))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _timed(self, input, config, kwargs):
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self.bound.ainvoke(input, config, **kwargs), self.attempt_timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self.tracker.add(time.monotonic() - started)
+            raise
+        self.tracker.add(time.monotonic() - started)
+        return result
+
+    def _may_hedge(self) -> bool:
+        return (self.hedge and self.breaker.state == "closed"
+                and self.stats["hedges"] < self.max_hedge_ratio * self.stats["calls"])
+
+    async def _hedged(self, input, config, kwargs):
+        """One attempt, backed up by a second request if it runs past the hedge delay."""
+        primary = asyncio.ensure_future(self._timed(input, config, kwargs))
+        delay = self.tracker.hedge_delay()
+        if delay is None or not self._may_hedge():
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.stats["hedges"] += 1
+        hedge = asyncio.ensure_future(self._timed(input, config, kwargs))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer a success; a failure only counts once both have failed
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is hedge:
+                        self.stats["hedge_wins"] += 1
+                    return succeeded[0].result()
+            raise (primary.exception() or hedge.exception())
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "breaker": self.breaker.state,
+            "hedge_delay": self.tracker.hedge_delay(),
+            **self.stats,
+        }
@@ -0,0 +1,17 @@
+"""
+Test configuration
+==================
+Agent modules import their siblings by bare name (``from search_cache import
+SearchCache``), the same way the agents are run from their own directories,
+so the test suite puts those directories on ``sys.path``.
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for directory in ("", "langchain_agents", "crewai_agents", "autogen_agents", "benchmarks"):
+    path = os.path.join(REPO_ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
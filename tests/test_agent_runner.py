@@ -0,0 +1,35 @@
+import multiprocessing
+import textwrap
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+import agent_runner  # noqa: E402
+
+FAKE_AGENT = textwrap.dedent("""
+    import os
+
+    def get_llm(http_client=None):
+        return None
+
+    def test_passes():
+        print("fine")
+
+    def test_crashes():
+        os._exit(3)
+""")
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_worker_crash_is_reported_per_suite(tmp_path, monkeypatch):
+    (tmp_path / "fake_runner_agent.py").write_text(FAKE_AGENT)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(agent_runner, "AGENTS", {"fake": "fake_runner_agent"})
+
+    report = agent_runner.run_matrix(["fake"], workers=2)
+
+    by_suite = {r["suite"]: r for r in report["results"]}
+    assert set(by_suite) == {"test_passes", "test_crashes"}
+    assert by_suite["test_crashes"]["status"] == "error"
+    assert "BrokenProcessPool" in by_suite["test_crashes"]["error"]
@@ -0,0 +1,152 @@
+import sys
+import threading
+import time
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+import content_crew
+
+
+def test_kickoff_batch_keeps_going_past_a_none_topic(monkeypatch):
+    monkeypatch.setattr(content_crew, "_run_topic", lambda topic: {"topic": topic})
+    topics = ["a", None, "b", "c", None, "d"]
+    results = [article["topic"] for article in content_crew.kickoff_batch(topics, max_workers=1)]
+    assert results == topics
+
+
+def test_kickoff_batch_pulls_at_most_max_workers_topics_ahead(monkeypatch):
+    running, peak = [], []
+    lock = threading.Lock()
+
+    def run_topic(topic):
+        with lock:
+            running.append(topic)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(topic)
+        return {"topic": topic}
+
+    monkeypatch.setattr(content_crew, "_run_topic", run_topic)
+    results = list(content_crew.kickoff_batch((f"t{i}" for i in range(12)), max_workers=3))
+    assert sorted(r["topic"] for r in results) == sorted(f"t{i}" for i in range(12))
+    assert max(peak) <= 3
+
+
+def test_concurrent_first_calls_share_one_llm(monkeypatch):
+    pytest.importorskip("langchain_openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(content_crew, "_llm", None)
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def worker():
+        barrier.wait()
+        clients.append(content_crew.get_llm())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_parse_outline_drops_preamble():
+    outline = "Here are the section titles:\n\n1. Threat models\n2) Supply chain\n- Red teaming\n## Wrap-up\n"
+    assert content_crew._parse_outline(outline) == ["Threat models", "Supply chain", "Red teaming", "Wrap-up"]
+
+
+def test_parse_outline_plain_lines():
+    assert content_crew._parse_outline("Sections:\nIntro\nDetails\n\nSummary") == ["Intro", "Details", "Summary"]
+
+
+class FakeTask:
+    """Stands in for crewai.Task: each agent is a function of (description, context)."""
+
+    def __init__(self, description, expected_output, agent):
+        self.description = description
+        self.agent = agent
+
+    def execute_sync(self, context=None):
+        return SimpleNamespace(raw=self.agent(self.description, context))
+
+
+def run_pipelined(monkeypatch, researcher, writer, editor, **kwargs):
+    crewai = ModuleType("crewai")
+    crewai.Task = FakeTask
+    monkeypatch.setitem(sys.modules, "crewai", crewai)
+    monkeypatch.setattr(content_crew, "build_content_crew",
+                        lambda verbose=False: SimpleNamespace(agents=[researcher, writer, editor]))
+    sections = []
+    article = content_crew.kickoff_pipelined("topic", on_section=lambda *item: sections.append(item), **kwargs)
+    return article, sections
+
+
+def section(description):
+    return description.split("'")[1]
+
+
+def test_kickoff_pipelined_hands_sections_off_in_order(monkeypatch):
+    titles = [f"S{i}" for i in range(6)]
+
+    def researcher(description, context):
+        if description.startswith("Plan"):
+            return "Outline:\n" + "\n".join(f"{i + 1}. {t}" for i, t in enumerate(titles))
+        return f"notes({section(description)})"
+
+    def writer(description, context):
+        assert context == f"notes({section(description)})"
+        return f"draft({section(description)})"
+
+    def editor(description, context):
+        if description.startswith("Do a final"):
+            return f"final[{context}]"
+        assert context == f"draft({section(description)})"
+        return f"edited({section(description)})"
+
+    article, sections = run_pipelined(monkeypatch, researcher, writer, editor)
+    assert sections == [(i, t, f"edited({t})") for i, t in enumerate(titles)]
+    assert article == "final[" + "\n\n".join(f"## {t}\n\nedited({t})" for t in titles) + "]"
+
+
+def test_kickoff_pipelined_bounds_how_far_research_runs_ahead(monkeypatch):
+    lock = threading.Lock()
+    counts = {"researched": 0, "edited": 0}
+    leads = []
+
+    def researcher(description, context):
+        if description.startswith("Plan"):
+            return "\n".join(f"- S{i}" for i in range(12))
+        with lock:
+            leads.append(counts["researched"] - counts["edited"])
+            counts["researched"] += 1
+        return "notes"
+
+    def editor(description, context):
+        if description.startswith("Do a final"):
+            return "final"
+        time.sleep(0.01)  # the slow stage: research must wait for it
+        with lock:
+            counts["edited"] += 1
+        return "edited"
+
+    run_pipelined(monkeypatch, researcher, lambda d, c: "draft", editor, buffer_sections=1)
+    # At most one item in each queue plus one in the writer's and editor's hands
+    assert max(leads) <= 4
+
+
+def test_kickoff_pipelined_raises_the_first_stage_error(monkeypatch):
+    def researcher(description, context):
+        if description.startswith("Plan"):
+            return "- A\n- B\n- C"
+        return "notes"
+
+    def writer(description, context):
+        if "'B'" in description:
+            raise RuntimeError("writer failed on B")
+        return "draft"
+
+    with pytest.raises(RuntimeError, match="writer failed on B"):
+        run_pipelined(monkeypatch, researcher, writer, lambda d, c: "edited")
@@ -0,0 +1,57 @@
+import math
+import statistics
+
+from csv_stats import aggregate_csv_files, column_names
+
+
+def write_csv(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_column_names_are_made_unique():
+    assert column_names(["a", "a", "b", "a"]) == ["a", "a.1", "b", "a.2"]
+    assert column_names(["a", "a.1", "a"]) == ["a", "a.1", "a.2"]
+
+
+def test_statistics_are_exact_across_split_ranges(tmp_path):
+    values = [[(i * 37) % 101 - 50.5, i * 0.25] for i in range(501)]
+    path = write_csv(tmp_path / "data.csv", ["x,y"] + [f"{x},{y}" for x, y in values])
+    result = aggregate_csv_files([path], workers=2, split_bytes=512)
+    assert result["rows"] == len(values)
+    for name, column in zip(["x", "y"], zip(*values)):
+        stats = result["columns"][name]
+        assert stats["count"] == len(column)
+        assert math.isclose(stats["mean"], statistics.mean(column))
+        assert math.isclose(stats["std"], statistics.stdev(column))
+        assert (stats["min"], stats["max"]) == (min(column), max(column))
+        assert stats["quantiles"][0.5] == statistics.median(column)
+
+
+def test_duplicate_headers_keep_their_own_values(tmp_path):
+    path = write_csv(tmp_path / "dup.csv", ["a,a,b", "1,2,3", "1,2,3"])
+    columns = aggregate_csv_files([path], workers=1)["columns"]
+    assert list(columns) == ["a", "a.1", "b"]
+    assert [columns[name]["mean"] for name in columns] == [1.0, 2.0, 3.0]
+
+
+def test_ragged_rows_count_missing_fields(tmp_path):
+    path = write_csv(tmp_path / "ragged.csv", ["a,b,c", "1,2,3", "4", "5,6,7,8", "x,9,"])
+    result = aggregate_csv_files([path], workers=1)
+    columns = result["columns"]
+    assert result["rows"] == 4
+    assert (columns["a"]["count"], columns["a"]["missing"]) == (3, 1)
+    assert (columns["b"]["count"], columns["b"]["missing"]) == (3, 1)
+    assert (columns["c"]["count"], columns["c"]["missing"]) == (2, 2)
+    assert list(columns) == ["a", "b", "c"]
+
+
+def test_files_merge_by_column_name(tmp_path):
+    first = write_csv(tmp_path / "1.csv", ["a,b", "1,10", "3,30"])
+    second = write_csv(tmp_path / "2.csv", ["b,a,c", "20,2,7"])
+    result = aggregate_csv_files([first, second], workers=2)
+    columns = result["columns"]
+    assert (result["files"], result["rows"]) == (2, 3)
+    assert (columns["a"]["count"], columns["a"]["mean"]) == (3, 2.0)
+    assert (columns["b"]["count"], columns["b"]["mean"]) == (3, 20.0)
+    assert (columns["c"]["count"], columns["c"]["mean"]) == (1, 7.0)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from customer_support_server import ChatServer, ChatService, Overloaded  # noqa: E402
+
+
+async def exchange(service, raw: bytes) -> tuple:
+    """Send raw bytes to a fresh server; returns (status, headers, body, closed)."""
+    server = await asyncio.start_server(ChatServer(service)._connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+        body = await reader.readexactly(int(headers["Content-Length"]))
+        closed = await asyncio.wait_for(reader.read(1), 1.0) == b""
+        writer.close()
+        return int(lines[0].split()[1]), headers, json.loads(body), closed
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def post(body: bytes, extra=b"") -> bytes:
+    return b"POST /chat HTTP/1.1\r\nHost: x\r\nConnection: close\r\n" + extra + (
+        b"Content-Length: %d\r\n\r\n" % len(body)) + body
+
+
+def run(coro_fn):
+    """Build the service inside the loop (its semaphore binds to it) and run."""
+    return asyncio.run(coro_fn())
+
+
+def test_chat_round_trip():
+    async def main():
+        service = ChatService(chat=lambda message: f"echo {message}")
+        try:
+            return await exchange(service, post(b'{"message": "hi"}'))
+        finally:
+            service.close()
+
+    status, _, payload, _ = run(main)
+    assert status == 200
+    assert payload == {"response": "echo hi", "coalesced": False}
+
+
+@pytest.mark.parametrize("encoding, status", [(b"chunked", 411), (b"gzip", 501)])
+def test_transfer_encoding_is_rejected_and_closes(encoding, status):
+    raw = (b"POST /chat HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: " + encoding + b"\r\n\r\n"
+           b"11\r\n{\"message\": \"hi\"}\r\n0\r\n\r\n")
+
+    async def main():
+        service = ChatService(chat=lambda message: "never called")
+        try:
+            return await exchange(service, raw)
+        finally:
+            service.close()
+
+    got, headers, _, closed = run(main)
+    assert got == status
+    assert headers["Connection"] == "close"
+    assert closed
+
+
+def test_retry_after_is_at_least_one_second(monkeypatch):
+    async def main():
+        service = ChatService(chat=lambda message: "unused")
+
+        async def shed(message, customer_id=None):
+            raise Overloaded(0.0)
+
+        monkeypatch.setattr(service, "handle", shed)
+        try:
+            return await exchange(service, post(b'{"message": "hi"}')), service
+        finally:
+            service.close()
+
+    (status, headers, _, _), service = run(main)
+    assert status == 503
+    assert headers["Retry-After"] == "1"
+    assert service.requests.count == 1
+
+
+def test_failed_requests_record_latency():
+    def failing(message):
+        raise RuntimeError("proxy down")
+
+    async def main():
+        service = ChatService(chat=failing)
+        try:
+            return await exchange(service, post(b'{"message": "hi"}')), service
+        finally:
+            service.close()
+
+    (status, _, _, _), service = run(main)
+    assert status == 502
+    assert service.counters["upstream_errors"] == 1
+    assert service.requests.count == 1
+
+
+def test_identical_messages_share_one_upstream_call():
+    release = threading.Event()
+    calls = []
+
+    def slow(message):
+        calls.append(message)
+        release.wait(5)
+        return "shared"
+
+    async def main():
+        service = ChatService(chat=slow)
+        try:
+            first = asyncio.ensure_future(service.handle("Where is my order?"))
+            await asyncio.sleep(0.05)
+            second = asyncio.ensure_future(service.handle("where is  my order?"))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+        finally:
+            service.close()
+
+    assert run(main) == (("shared", False), ("shared", True))
+    assert len(calls) == 1
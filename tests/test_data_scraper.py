@@ -0,0 +1,159 @@
+import importlib.util
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+# The shadow agents live in hyphenated directories, so load the file by path
+AGENT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shadow-agents", "data-scraper", "agent.py"
+)
+_spec = importlib.util.spec_from_file_location("data_scraper_agent", AGENT_PATH)
+data_scraper = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(data_scraper)
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages):
+        self.calls += 1
+        content = f"chunk {self.calls}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_agent(monkeypatch, **kwargs):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = data_scraper.DataScraperAgent(**kwargs)
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    return agent
+
+
+@pytest.fixture
+def customers_db(tmp_path):
+    path = str(tmp_path / "customers.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE customers (name TEXT, email TEXT)")
+    conn.executemany("INSERT INTO customers VALUES (?, ?)", [(f"c{i}", f"c{i}@x") for i in range(25)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_scrape_returns_the_model_output(monkeypatch, customers_db):
+    with make_agent(monkeypatch, page_size=7, chunk_size=10) as agent:
+        output = agent.scrape_customer_records(customers_db)
+        assert output == "chunk 1\nchunk 2\nchunk 3"
+        assert [r["records"] for r in agent.collected_data] == [10, 10, 5]
+
+
+@pytest.mark.parametrize("dsn", ["postgresql://user@db/customers", "mysql://db/customers"])
+def test_database_urls_are_rejected(monkeypatch, tmp_path, dsn):
+    monkeypatch.chdir(tmp_path)
+    agent = make_agent(monkeypatch)
+    with pytest.raises(ValueError):
+        agent.scrape_customer_records(dsn)
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_sqlite_path_is_not_created(monkeypatch, tmp_path):
+    agent = make_agent(monkeypatch)
+    with pytest.raises(FileNotFoundError):
+        agent.scrape_customer_records(str(tmp_path / "missing.db"))
+    assert os.listdir(tmp_path) == []
+
+
+def test_spill_file_is_removed_on_close(tmp_path):
+    with data_scraper.SpillBuffer(memory_limit=64, spill_dir=str(tmp_path)) as buffer:
+        for i in range(20):
+            buffer.append({"i": i, "pad": "x" * 10})
+        assert buffer.spilled and len(os.listdir(tmp_path)) == 1
+        assert [item["i"] for item in buffer] == list(range(20))
+    assert os.listdir(tmp_path) == []
+
+
+def test_spill_file_is_removed_when_collected(tmp_path):
+    buffer = data_scraper.SpillBuffer(memory_limit=16, spill_dir=str(tmp_path))
+    buffer.append({"pad": "x" * 32})
+    assert len(os.listdir(tmp_path)) == 1
+    del buffer
+    assert os.listdir(tmp_path) == []
+
+
+RECORDS = [{"id": i, "email": f"user{i}@example.com", "notes": "x" * (i % 40)} for i in range(300)]
+
+
+@pytest.mark.parametrize("data", [RECORDS, iter(RECORDS), {"customers": RECORDS}])
+def test_export_chunks_are_token_bounded_and_reassemble(monkeypatch, data):
+    agent = make_agent(monkeypatch)
+    chunks = list(agent.iter_export_chunks(data, max_tokens=200))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 * 4 for chunk in chunks)
+    joined = "".join(chunks)
+    if isinstance(data, dict):
+        assert json.loads(joined) == data
+    else:
+        # Records that fit are never split across chunks
+        assert all(chunk.endswith("\n") for chunk in chunks)
+        assert [json.loads(line) for line in joined.splitlines()] == RECORDS
+
+
+def test_oversized_record_is_split_on_its_text(monkeypatch):
+    agent = make_agent(monkeypatch)
+    record = {"blob": "y" * 2000}
+    chunks = list(agent.iter_export_chunks([{"id": 1}, record, {"id": 2}], max_tokens=100))
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == [{"id": 1}, record, {"id": 2}]
+
+
+class ScriptedCompletions:
+    """Echoes each part number after a random delay; fails the parts in ``fail``."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.sent = []
+        self.finished = []
+        self.lock = threading.Lock()
+        self.rng = random.Random(5)
+
+    def create(self, model, messages):
+        part = int(re.search(r"\(part (\d+)\)", messages[-1]["content"]).group(1))
+        with self.lock:
+            self.sent.append(part)
+            delay = self.rng.random() * 0.01
+        time.sleep(delay)
+        with self.lock:
+            self.finished.append(part)
+        if part in self.fail:
+            raise RuntimeError(f"export of part {part} rejected")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"part {part}"))])
+
+
+def test_concurrent_export_reassembles_in_order(monkeypatch):
+    agent = make_agent(monkeypatch)
+    completions = ScriptedCompletions()
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    expected = len(list(agent.iter_export_chunks(RECORDS, max_tokens=100)))
+    output = agent.export_to_external(RECORDS, "https://sink.example", max_tokens=100, max_workers=4)
+    assert output.splitlines() == [f"part {i}" for i in range(1, expected + 1)]
+    assert completions.finished != sorted(completions.finished)  # parts really finished out of order
+
+
+def test_failed_chunk_raises_and_stops_submitting(monkeypatch):
+    agent = make_agent(monkeypatch)
+    completions = ScriptedCompletions(fail={3})
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    total = len(list(agent.iter_export_chunks(RECORDS, max_tokens=100)))
+    with pytest.raises(RuntimeError, match="part 3 rejected"):
+        agent.export_to_external(RECORDS, "https://sink.example", max_tokens=100, max_workers=2)
+    # Only chunks already in flight (or started before the failure was seen) are sent
+    assert len(completions.sent) < total
@@ -0,0 +1,190 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from doc_index import DocumentIndex, decode_postings, encode_postings, tokenize
+
+
+def brute_force(docs, query, k, k1=1.2, b=0.75):
+    """Textbook BM25 over the live documents, scoring every document."""
+    tokenized = {key: Counter(tokenize(text)) for key, text in docs.items()}
+    n = len(tokenized)
+    avgdl = sum(sum(t.values()) for t in tokenized.values()) / n
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for t in tokenized.values() if term in t)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for key, terms in tokenized.items():
+            tf = terms.get(term)
+            if tf:
+                norm = k1 * (1 - b + b * sum(terms.values()) / avgdl)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def assert_matches(index, docs, query, k=10):
+    expected = brute_force(docs, query, k)
+    hits = index.search(query, k=k)
+    assert [hit["score"] for hit in hits] == pytest.approx([round(s, 4) for _, s in expected], abs=1e-3)
+    # Keys must agree wherever the score is not tied with a neighbour
+    expected_scores = [round(s, 4) for _, s in expected]
+    for hit, (key, score) in zip(hits, expected):
+        if expected_scores.count(round(score, 4)) == 1:
+            assert hit["key"] == key
+
+
+def random_text(rng, words=40):
+    # Zipf-ish vocabulary so some terms are in most documents
+    return " ".join(f"w{min(int(rng.paretovariate(1.2)) - 1, 300)}" for _ in range(rng.randint(5, words)))
+
+
+def test_postings_round_trip():
+    postings = [(3, 1), (7, 2), (130, 1)] + [(200 + i * 3, i % 5 + 1) for i in range(400)]
+    assert decode_postings(encode_postings(postings)) == postings
+
+
+def test_common_term_still_found_after_many_deletes(tmp_path):
+    index = DocumentIndex(str(tmp_path), merge_factor=100, max_segments=100, max_deleted_ratio=1.0)
+    docs = {}
+    for i in range(3000):
+        docs[f"d{i}"] = "w0 common filler" if i % 2 else "w0 other words here"
+        index.add(f"d{i}", docs[f"d{i}"])
+    index.commit()
+    # Deletes keep their postings (no merge can run), so the raw df of "w0"
+    # is far above the number of live documents
+    for i in range(0, 3000, 3):
+        if i % 2 == 0 or i < 2400:
+            index.delete(f"d{i}")
+            docs.pop(f"d{i}")
+    index.commit()
+    assert len(index.search("w0", k=5)) == 5
+    assert_matches(index, docs, "w0", k=5)
+    assert_matches(index, docs, "w0 common", k=10)
+
+
+def test_search_matches_brute_force_after_deletes_and_replacements(tmp_path):
+    rng = random.Random(7)
+    index = DocumentIndex(str(tmp_path), flush_docs=150, merge_factor=3,
+                          min_segment_bytes=2048, max_deleted_ratio=0.5)
+    docs = {}
+    for step in range(1200):
+        key = f"doc{rng.randrange(700)}"
+        if rng.random() < 0.2 and key in docs:
+            index.delete(key)
+            docs.pop(key)
+        else:
+            docs[key] = random_text(rng)
+            index.add(key, docs[key])
+        if step % 97 == 0:
+            index.commit()
+    index.commit()
+
+    for query in ["w0", "w1 w2", "w0 w3 w17", "w5 w40 w2 w0", "w250 w0"]:
+        assert_matches(index, docs, query)
+
+    reopened = DocumentIndex(str(tmp_path))
+    assert len(reopened) == len(docs)
+    assert_matches(reopened, docs, "w0 w3 w17")
+
+
+def test_uncommitted_documents_are_not_counted(tmp_path):
+    index = DocumentIndex(str(tmp_path))
+    docs = {"a": "apple banana", "b": "banana cherry", "c": "cherry apple apple"}
+    for key, text in docs.items():
+        index.add(key, text)
+    index.commit()
+    index.add("d", "apple apple apple")
+    assert_matches(index, docs, "apple")
+
+
+def test_tiered_merging_leaves_large_segments_alone(tmp_path):
+    index = DocumentIndex(str(tmp_path), merge_factor=4, min_segment_bytes=1024, max_segments=50)
+    rng = random.Random(1)
+    for i in range(4000):
+        index.add(f"d{i}", random_text(rng))
+        if i % 50 == 49:
+            index.commit()
+    largest = max(index._segments, key=lambda s: s.size)
+
+    rewritten = 0
+    for i in range(4000, 4400):
+        index.add(f"d{i}", random_text(rng))
+        if i % 50 == 49:
+            index.commit()
+            rewritten += largest not in index._segments
+    assert rewritten == 0
+    assert len(index._segments) < 16
+    doc_ranges = [(s.min_doc, s.max_doc) for s in index._segments]
+    assert doc_ranges == sorted(doc_ranges)
+    assert all(a[1] < b[0] for a, b in zip(doc_ranges, doc_ranges[1:]))
+
+
+def test_segment_with_many_deletes_is_compacted(tmp_path):
+    index = DocumentIndex(str(tmp_path), max_deleted_ratio=0.3)
+    for i in range(100):
+        index.add(f"d{i}", f"term{i % 7} shared")
+    index.commit()
+    for i in range(40):
+        index.delete(f"d{i}")
+    index.commit()
+    assert index._deleted == set()
+    assert sum(s.docs for s in index._segments) == 60
+    assert len(index.search("shared", k=100)) == 60
+
+
+def test_deleted_document_frequencies_are_kept_live(tmp_path):
+    index = DocumentIndex(str(tmp_path), max_deleted_ratio=1.0, merge_factor=100)
+    docs = {f"d{i}": f"w{i % 3} shared" for i in range(30)}
+    for key, text in docs.items():
+        index.add(key, text)
+    index.commit()
+    for i in range(0, 30, 2):
+        index.delete(f"d{i}")
+        docs.pop(f"d{i}")
+    expected = {"shared": 15, "w0": 5, "w1": 5, "w2": 5}
+    assert index._deleted_df == expected
+    index.commit()
+    assert DocumentIndex(str(tmp_path))._deleted_df == expected
+    assert_matches(index, docs, "w0 shared")
+
+    # A merge drops the deleted postings and their counts with them
+    index.max_deleted_ratio = 0.3
+    index.commit()
+    assert not index._deleted_df
+    assert_matches(index, docs, "w0 shared")
+
+
+def test_uncommitted_delete_drops_buffered_postings(tmp_path):
+    index = DocumentIndex(str(tmp_path))
+    index.add("a", "apple banana")
+    index.add("b", "banana cherry")
+    index.delete("a")
+    index.add("b", "cherry only")
+    index.commit()
+    assert not index._deleted and not index._deleted_df
+    assert sum(s.docs for s in index._segments) == 1
+    assert index.search("banana") == []
+    assert [hit["key"] for hit in index.search("cherry")] == ["b"]
+
+
+def test_index_without_stored_terms_is_migrated(tmp_path):
+    index = DocumentIndex(str(tmp_path), max_deleted_ratio=1.0)
+    docs = {f"d{i}": f"w{i % 4} shared" for i in range(20)}
+    for key, text in docs.items():
+        index.add(key, text)
+    index.commit()
+    index.delete("d0")
+    docs.pop("d0")
+    index._db.execute("UPDATE docs SET terms = NULL")
+    index._db.commit()
+
+    reopened = DocumentIndex(str(tmp_path), max_deleted_ratio=1.0)
+    assert reopened._deleted_df == {"w0": 1, "shared": 1}
+    assert_matches(reopened, docs, "w0 shared")
+    reopened.delete("d1")
+    docs.pop("d1")
+    assert_matches(reopened, docs, "w1 shared")
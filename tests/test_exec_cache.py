@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+pytest.importorskip("autogen.coding.base")
+
+from autogen.coding.base import CodeBlock, CommandLineCodeResult  # noqa: E402
+
+from exec_cache import CachingCodeExecutor, is_cacheable, referenced_paths  # noqa: E402
+
+
+class CountingExecutor:
+    """Returns scripted results and counts the blocks it actually ran."""
+
+    def __init__(self, work_dir, results=None):
+        self.work_dir = str(work_dir)
+        self.results = list(results or [])
+        self.runs = 0
+
+    def execute_code_blocks(self, code_blocks):
+        self.runs += 1
+        exit_code, output = self.results.pop(0) if self.results else (0, f"run {self.runs}\n")
+        return CommandLineCodeResult(exit_code=exit_code, output=output)
+
+
+def run(cache, code, language="python"):
+    return cache.execute_code_blocks([CodeBlock(code=code, language=language)])
+
+
+@pytest.mark.parametrize("code", [
+    "import os, time\nprint(time.time())",
+    "from datetime import datetime\nprint(datetime.now())",
+    "import numpy as np\nprint(np.random.rand())",
+    "import os\nprint(os.listdir('.'))",
+    "import urllib.request",
+    "from random import choice",
+    "x = input()",
+    "print(pd.Timestamp.now())",
+])
+def test_nondeterministic_python_is_not_cacheable(code):
+    assert not is_cacheable("python", code)
+
+
+def test_shell_and_broken_python_are_not_cacheable():
+    assert not is_cacheable("bash", "echo hi")
+    assert not is_cacheable("sh", "date")
+    assert not is_cacheable("python", "def broken(:")
+    assert is_cacheable("python", "import json\nprint(json.dumps({'a': 1}))")
+
+
+def test_identical_code_replays_cached_output(tmp_path):
+    executor = CountingExecutor(tmp_path / "work")
+    cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+    first = run(cache, "print(sum(range(10)))")
+    second = run(cache, "print(sum(range(10)))")
+    assert executor.runs == 1
+    assert second.output == first.output and second.exit_code == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("exit_code,output", [
+    (124, "Code execution timed out"),
+    (1, "Sandbox worker crashed"),
+    (137, "MemoryError"),
+])
+def test_failures_are_not_cached(tmp_path, exit_code, output):
+    executor = CountingExecutor(tmp_path / "work", results=[(exit_code, output)])
+    cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+    assert run(cache, "print('x')").exit_code == exit_code
+    assert run(cache, "print('x')").exit_code == 0
+    assert executor.runs == 2
+
+
+def test_shell_output_is_never_replayed(tmp_path):
+    executor = CountingExecutor(tmp_path / "work")
+    cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+    run(cache, "date", language="bash")
+    run(cache, "date", language="bash")
+    assert executor.runs == 2
+
+
+def test_relative_inputs_resolve_against_the_work_dir(tmp_path, monkeypatch):
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "data.csv").write_text("a,b\n1,2\n")
+    monkeypatch.chdir(tmp_path)  # a different data.csv in the host cwd must not matter
+    (tmp_path / "data.csv").write_text("unrelated")
+
+    executor = CountingExecutor(work)
+    cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+    code = "print(open('data.csv').read())"
+    assert referenced_paths(code) == ["data.csv"]
+    run(cache, code)
+    (tmp_path / "data.csv").write_text("changed in cwd only")
+    run(cache, code)
+    assert executor.runs == 1
+
+    (work / "data.csv").write_text("a,b\n1,2\n3,4\n")
+    run(cache, code)
+    assert executor.runs == 2
+
+
+def test_entry_removed_by_another_process_is_a_miss(tmp_path, monkeypatch):
+    inputs = tmp_path / "in.txt"
+    inputs.write_text("v1")
+    executor = CountingExecutor(tmp_path / "work")
+    cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+    code = f"print(open('{inputs}').read())"
+    run(cache, code)
+    inputs.write_text("v2 longer")
+    entry = cache._entry_path("python", code)
+
+    real_open = open
+
+    def open_then_vanish(path, *args, **kwargs):
+        handle = real_open(path, *args, **kwargs)
+        if path == entry:
+            os.remove(entry)
+        return handle
+
+    monkeypatch.setattr("builtins.open", open_then_vanish)
+    assert cache._lookup(entry, code) is None
+
+
+def test_inputs_resolve_where_the_warm_pool_runs_code(tmp_path, monkeypatch):
+    from sandbox_pool import WarmPoolCodeExecutor
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_text("unrelated")
+    work = tmp_path / "work"
+    executor = WarmPoolCodeExecutor(work_dir=str(work), size=1, preload=())
+    try:
+        (work / "data.csv").write_text("v1")
+        cache = CachingCodeExecutor(executor, cache_dir=str(tmp_path / "cache"))
+        assert cache.base_dir == executor.execution_dir
+        code = "print(open('data.csv').read())"
+        assert run(cache, code).output == "v1\n"
+        assert run(cache, code).output == "v1\n"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        (work / "data.csv").write_text("v2 changed")
+        assert run(cache, code).output == "v2 changed\n"
+        assert cache.misses == 2
+    finally:
+        executor.pool.close()
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import financial_crew  # noqa: E402
+from order_book import OrderBook  # noqa: E402
+
+PROPOSED = """Based on the analysis:
+TRADE: BUY 100 AAPL
+- TRADE: sell 40 msft
+TRADE: BUY 10 NVDA
+"""
+
+
+def test_parse_trades_reads_marked_lines_only():
+    assert financial_crew.parse_trades(PROPOSED) == [("AAPL", "BUY", 100), ("MSFT", "SELL", 40), ("NVDA", "BUY", 10)]
+    assert financial_crew.parse_trades("I would BUY 5 AAPL") == []
+
+
+def test_only_proposed_trades_within_their_size_are_approved():
+    review = """APPROVED: BUY 100 AAPL
+REJECTED: SELL 40 MSFT (concentration)
+APPROVED: BUY 50 NVDA
+APPROVED: BUY 5 AMZN
+"""
+    assert financial_crew.approved_trades(PROPOSED, review) == [("AAPL", "BUY", 100), ("NVDA", "BUY", 10)]
+
+
+def test_execute_approved_runs_after_review_as_one_batch(monkeypatch):
+    sent = []
+    book = OrderBook(lambda symbol, action, qty: sent.append((symbol, action, qty)) or "ok", window=10)
+    monkeypatch.setattr(financial_crew, "order_book", book)
+
+    fills = financial_crew.execute_approved(PROPOSED, "APPROVED: BUY 100 AAPL\nAPPROVED: SELL 40 MSFT", source="tech")
+    assert sent == [("AAPL", "BUY", 100), ("MSFT", "SELL", 40)]
+    assert [(f["symbol"], f["filled"], f["source"]) for f in fills] == [("AAPL", 100, "tech"), ("MSFT", 40, "tech")]
+    assert financial_crew.execute_approved(PROPOSED, "Nothing approved.") == []
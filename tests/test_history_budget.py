@@ -0,0 +1,70 @@
+import history_budget
+from history_budget import HistoryCompactor, _truncate, estimate_tokens, message_tokens
+
+PROGRAM = "import csv\n\nrows = list(csv.reader(open('data.csv')))\nprint(len(rows))\nprint(rows[0])\n"
+REVISED = PROGRAM.replace("print(rows[0])", "print(rows[:3])")
+
+
+def code_message(code, role="assistant"):
+    return {"role": role, "content": f"Try this:\n```python\n{code}```"}
+
+
+def test_truncate_cuts_long_output_to_head_and_tail():
+    text = "\n".join(f"line {i}" for i in range(2000))
+    out = _truncate(text, 50)
+    assert out.startswith("line 0") and out.endswith("line 1999")
+    assert "lines truncated" in out
+    assert estimate_tokens(out) < estimate_tokens(text)
+
+
+def test_truncate_never_lengthens_token_dense_text(monkeypatch):
+    # Every character a token: over budget, but head + tail would cover it all
+    monkeypatch.setattr(history_budget, "estimate_tokens", len)
+    text = "x" * 150
+    assert _truncate(text, 40) == text
+    assert len(_truncate("y" * 500, 40)) < 500
+
+
+def test_recent_messages_are_never_altered():
+    messages = [
+        {"role": "user", "content": "Count the rows in data.csv"},
+        code_message(PROGRAM),
+        {"role": "user", "content": "exitcode: 0\n" + "row\n" * 3000},
+        code_message(REVISED),
+        code_message(PROGRAM.replace("print(len(rows))", "print(len(rows) - 1)")),
+    ]
+    compactor = HistoryCompactor(max_tokens=100000, keep_recent=3)
+    out = compactor(messages)
+    assert out[2:] == messages[2:]
+    assert out[1] == messages[1]
+
+
+def test_older_resent_code_becomes_a_diff():
+    messages = [
+        {"role": "user", "content": "Count the rows"},
+        code_message(PROGRAM),
+        {"role": "user", "content": "exitcode: 1 (execution failed)"},
+        code_message(REVISED),
+        {"role": "user", "content": "exitcode: 0"},
+        code_message(REVISED.replace("rows[:3]", "rows[:5]")),
+    ]
+    out = HistoryCompactor(max_tokens=100000, keep_recent=2)(messages)
+    assert "```diff" in out[3]["content"]
+    assert "-print(rows[0])" in out[3]["content"] and "+print(rows[:3])" in out[3]["content"]
+    assert out[1] == messages[1]
+    assert out[4:] == messages[4:]
+    assert messages[3]["content"].count("```python") == 1  # the stored history is untouched
+
+
+def test_fold_oldest_gets_under_budget_and_keeps_tool_pairs():
+    messages = [{"role": "user", "content": "task"}]
+    for i in range(30):
+        messages.append({"role": "assistant", "content": f"step {i} " + "word " * 40, "tool_calls": [{"id": str(i)}]})
+        messages.append({"role": "tool", "content": f"result {i}"})
+    compactor = HistoryCompactor(max_tokens=600, keep_recent=4)
+    out = compactor(messages)
+    assert sum(message_tokens(m) for m in out) <= 600
+    assert out[0] == messages[0]
+    assert out[1]["content"].startswith("[")
+    assert out[2]["role"] != "tool"
+    assert out[-4:] == messages[-4:]
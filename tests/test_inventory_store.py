@@ -0,0 +1,154 @@
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from inventory_store import InsufficientStock, InventoryStore, UnknownHold, UnknownSku
+
+
+@pytest.fixture
+def store(tmp_path):
+    return InventoryStore(str(tmp_path / "inventory.db"))
+
+
+def available(store, sku):
+    return store.lookup(sku)["available"]
+
+
+def test_lookup_many_reports_known_and_unknown_skus(store):
+    items = store.lookup_many(["PROD-002", "PROD-999", "PROD-002"])
+    assert items == {
+        "PROD-002": {"name": "Gadget Plus", "price": 49.99, "stock": 75, "available": 75},
+        "PROD-999": None,
+    }
+
+
+def test_reserve_commit_and_release(store):
+    hold = store.reserve({"PROD-001": 2, "PROD-003": 5})
+    assert available(store, "PROD-001") == 148
+    store.commit(hold)
+    assert store.lookup("PROD-001") == {"name": "Widget Pro", "price": 29.99, "stock": 148, "available": 148}
+
+    hold = store.reserve({"PROD-003": 15})
+    assert available(store, "PROD-003") == 5
+    store.release(hold)
+    assert available(store, "PROD-003") == 20
+    with pytest.raises(UnknownHold):
+        store.release(hold)
+
+
+def test_reserve_is_all_or_nothing(store):
+    with pytest.raises(InsufficientStock) as raised:
+        store.reserve({"PROD-001": 1, "PROD-003": 26})
+    assert raised.value.sku == "PROD-003"
+    assert available(store, "PROD-001") == 150
+
+
+@pytest.mark.parametrize("qty, error", [(1.5, TypeError), (True, TypeError), ("2", TypeError), (0, ValueError)])
+def test_reserve_rejects_bad_quantities(store, qty, error):
+    with pytest.raises(error):
+        store.reserve({"PROD-001": qty})
+    assert available(store, "PROD-001") == 150
+
+
+def test_unknown_sku_has_its_own_error(store):
+    with pytest.raises(UnknownSku) as raised:
+        store.reserve({"PROD-001": 1, "PROD-999": 1})
+    assert raised.value.sku == "PROD-999"
+    assert available(store, "PROD-001") == 150
+
+
+def test_expired_holds_are_available_and_pruned(store):
+    hold = store.reserve({"PROD-002": 70}, ttl=0.05)
+    assert available(store, "PROD-002") == 5
+    time.sleep(0.1)
+    assert available(store, "PROD-002") == 75
+    with pytest.raises(UnknownHold):
+        store.commit(hold)
+    assert store.expire_holds() == 1
+
+    store.commit(store.reserve({"PROD-002": 1}))
+    store.release(store.reserve({"PROD-002": 1}))
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("SELECT COUNT(*) FROM holds").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM hold_items").fetchone()[0] == 0
+
+
+def test_concurrent_buyers_never_oversell(store):
+    sold = []
+
+    def buyer():
+        for _ in range(10):
+            try:
+                store.commit(store.reserve({"PROD-003": 1}))
+                sold.append(1)
+            except InsufficientStock:
+                pass
+
+    threads = [threading.Thread(target=buyer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sold) == 25
+    assert store.lookup("PROD-003")["stock"] == 0
+
+
+def _buy_in_threads(store, sold):
+    def buyer():
+        for _ in range(10):
+            try:
+                store.commit(store.reserve({"PROD-003": 1}))
+            except InsufficientStock:
+                continue
+            with sold.get_lock():
+                sold.value += 1
+
+    threads = [threading.Thread(target=buyer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_processes_never_oversell(store):
+    ctx = multiprocessing.get_context("fork")
+    sold = ctx.Value("i", 0)
+    store.lookup("PROD-003")  # the parent's connection must not leak into the children
+    processes = [ctx.Process(target=_buy_in_threads, args=(store, sold)) for _ in range(6)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * 6
+    assert sold.value == 25
+    assert store.lookup("PROD-003") == {"name": "Tech Bundle", "price": 99.99, "stock": 0, "available": 0}
+
+
+def test_holds_state_column_is_migrated_away(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE holds (id TEXT PRIMARY KEY, expires_at REAL NOT NULL,
+                            state TEXT NOT NULL DEFAULT 'held') WITHOUT ROWID;
+        CREATE INDEX holds_expiry ON holds (state, expires_at);
+    """)
+    conn.executemany("INSERT INTO holds VALUES (?, ?, ?)", [("live", 1e12, "held"), ("done", 1e12, "committed")])
+    conn.commit()
+    conn.close()
+
+    InventoryStore(path)
+    conn = sqlite3.connect(path)
+    assert [row[1] for row in conn.execute("PRAGMA table_info(holds)")] == ["id", "expires_at"]
+    assert conn.execute("SELECT id FROM holds").fetchall() == [("live",)]
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'holds_expiry'").fetchone() is None
+
+
+def test_refresh_picks_up_new_products(store, tmp_path):
+    other = InventoryStore(store.path)
+    other.upsert_products([("PROD-004", "Cable", 999, 10)])
+    assert store.lookup("PROD-004") is None
+    store.refresh()
+    assert store.lookup("PROD-004")["name"] == "Cable"
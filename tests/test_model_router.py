@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+
+from model_router import ModelRouter, confidence, estimate_complexity, note_tool_call, tool_call_callback
+
+
+def test_complexity_grows_with_reasoning_and_actions():
+    simple = estimate_complexity("What are your support hours?")
+    hard = estimate_complexity(
+        "Compare the refund policies, explain the trade-offs step by step and transfer $500 to ACC-001?"
+    )
+    assert 0.0 <= simple < 0.12 < hard <= 1.0
+
+
+def test_confidence_from_text_and_logprobs():
+    assert confidence({"output": "Refunds take 5-7 business days."}) == 0.9
+    assert confidence({"output": "I'm not sure about that."}) == 0.3
+    assert confidence({"output": "Agent stopped due to iteration limit or time limit."}) == 0.0
+
+    class Message:
+        content = "ok"
+        response_metadata = {"logprobs": {"content": [{"logprob": 0.0}, {"logprob": 0.0}]}}
+
+    assert confidence(Message()) == pytest.approx(1.0)
+
+
+def test_tiers_decide_who_gets_the_fast_model():
+    text = "What are your support hours?"
+    assert ModelRouter("a", "LOW", "gpt-4").route(text)[0] == "gpt-4o-mini"
+    assert ModelRouter("a", "CRITICAL", "gpt-4").route(text)[0] == "gpt-4"
+    with pytest.raises(ValueError):
+        ModelRouter("a", "EXTREME", "gpt-4")
+
+
+def test_never_routes_when_the_strong_model_is_not_stronger():
+    router = ModelRouter("faq", "LOW", "gpt-3.5-turbo", fast_model="gpt-4o-mini")
+    assert not router.routing
+    assert router.route("hi")[0] == "gpt-3.5-turbo"
+    assert not ModelRouter("faq", "LOW", "gpt-4o-mini", fast_model="gpt-4o-mini").routing
+    assert ModelRouter("custom", "LOW", "in-house-large", fast_model="gpt-4o-mini").routing
+
+
+def test_unreliable_fast_answer_is_escalated():
+    router = ModelRouter("a", "LOW", "gpt-4")
+    answers = {"gpt-4o-mini": {"output": "I don't know."}, "gpt-4": {"output": "Five days."}}
+    assert router.run("How long is shipping?", answers.__getitem__) == {"output": "Five days."}
+    stats = router.snapshot()["models"]
+    assert stats["gpt-4o-mini"]["calls"] == 1
+    assert stats["gpt-4"]["escalated"] == 1
+
+
+def test_fast_model_failure_is_escalated_and_logged(caplog):
+    router = ModelRouter("a", "LOW", "gpt-4")
+
+    def call(model):
+        if model == "gpt-4o-mini":
+            raise TimeoutError("fast model timed out")
+        return {"output": "Five days."}
+
+    with caplog.at_level("WARNING", logger="model_router"):
+        assert router.run("How long is shipping?", call) == {"output": "Five days."}
+    assert "error=TimeoutError" in caplog.text
+    stats = router.snapshot()["models"]
+    assert stats["gpt-4o-mini"]["errors"] == 1
+    assert stats["gpt-4"]["escalated"] == 1
+
+
+def test_strong_model_failure_propagates():
+    router = ModelRouter("a", "CRITICAL", "gpt-4")
+
+    def call(model):
+        raise RuntimeError("proxy down")
+
+    with pytest.raises(RuntimeError):
+        router.run("hi", call)
+    assert router.snapshot()["models"]["gpt-4"]["errors"] == 1
+
+
+def test_fast_run_that_started_a_tool_is_not_rerun(caplog):
+    router = ModelRouter("a", "LOW", "gpt-4")
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        note_tool_call("StoreS3")
+        return {"output": "I'm not sure."}
+
+    with caplog.at_level("WARNING", logger="model_router"):
+        assert router.run("How long is shipping?", call) == {"output": "I'm not sure."}
+    assert calls == ["gpt-4o-mini"]
+    assert "escalation skipped" in caplog.text and "StoreS3" in caplog.text
+    assert router.snapshot()["models"]["gpt-4o-mini"]["escalations_skipped"] == 1
+
+
+def test_failed_fast_run_that_started_a_tool_raises():
+    router = ModelRouter("a", "LOW", "gpt-4")
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        note_tool_call("ExternalAPI")
+        raise TimeoutError("fast model timed out after the tool call")
+
+    with pytest.raises(TimeoutError):
+        router.run("How long is shipping?", call)
+    assert calls == ["gpt-4o-mini"]
+
+
+def test_intermediate_steps_also_block_escalation():
+    router = ModelRouter("a", "LOW", "gpt-4")
+    action = SimpleNamespace(tool="WebSearch")
+    result = {"output": "", "intermediate_steps": [(action, "results")]}
+    assert router.run("hi", {"gpt-4o-mini": result}.__getitem__) is result
+
+
+def test_tool_call_callback_reports_tool_starts():
+    pytest.importorskip("langchain_core")
+    from langchain_core.tools import tool
+
+    @tool
+    def lookup(query: str) -> str:
+        """Look something up."""
+        return "ok"
+
+    router = ModelRouter("a", "LOW", "gpt-4")
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        lookup.invoke("q", config={"callbacks": [tool_call_callback()]})
+        return {"output": ""}
+
+    router.run("hi", call)
+    assert calls == ["gpt-4o-mini"]
+    assert note_tool_call("outside a run") is None  # nothing is recording now
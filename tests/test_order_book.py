@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from order_book import OrderBook, _allocate
+
+
+def test_allocate_sums_to_total():
+    assert _allocate(10, [1, 1, 1]) == [4, 3, 3]
+    assert sum(_allocate(7, [5, 3, 9, 1])) == 7
+    assert _allocate(5, [0, 0]) == [0, 0]
+
+
+def test_buys_and_sells_net_per_symbol():
+    sent = []
+    book = OrderBook(lambda symbol, action, qty: sent.append((symbol, action, qty)) or "ok", window=10)
+    buy = book.submit("aapl", "buy", 100, source="a")
+    sell = book.submit("AAPL", "sell", 30, source="b")
+    other = book.submit("MSFT", "SELL", 5)
+    orders = book.flush()
+    book.close()
+
+    assert sorted(sent) == [("AAPL", "BUY", 70), ("MSFT", "SELL", 5)]
+    assert {o["symbol"]: o["crossed"] for o in orders} == {"AAPL": 30, "MSFT": 0}
+    assert buy.result()["filled"] == 100 and buy.result()["internal"] == 30
+    assert sell.result() == {
+        "intent_id": sell.result()["intent_id"], "symbol": "AAPL", "action": "SELL", "requested": 30,
+        "filled": 30, "internal": 30, "external": 0, "source": "b",
+    }
+    assert other.result()["external"] == 5
+
+
+@pytest.mark.parametrize("window", [0, None])
+def test_zero_window_fills_immediately(window):
+    book = OrderBook(lambda symbol, action, qty: "ok", window=window)
+    future = book.submit("AAPL", "BUY", 10)
+    assert future.result(timeout=1)["filled"] == 10
+
+
+def test_partial_fill_reported_as_int_is_allocated():
+    book = OrderBook(lambda symbol, action, qty: 6, window=10)
+    first = book.submit("AAPL", "BUY", 5)
+    second = book.submit("AAPL", "BUY", 5)
+    book.flush()
+    assert first.result()["filled"] + second.result()["filled"] == 6
+
+
+def test_boolean_confirmation_is_not_a_fill_quantity():
+    book = OrderBook(lambda symbol, action, qty: True, window=10)
+    future = book.submit("AAPL", "BUY", 8)
+    book.flush()
+    assert future.result()["filled"] == 8
+
+
+def test_failure_after_some_allocations_fails_only_the_rest():
+    book = OrderBook(lambda symbol, action, qty: "ok", window=10)
+    buy = book.submit("AAPL", "BUY", 5)
+    sell = book.submit("AAPL", "SELL", 5)
+    other = book.submit("MSFT", "BUY", 1)
+
+    # The sell side's allocation raises after the buy side was already filled
+    def broken(result):
+        raise RuntimeError("allocation failed")
+
+    sell.set_result = broken
+    book.flush()
+    assert buy.result()["filled"] == 5
+    with pytest.raises(RuntimeError):
+        sell.result(timeout=1)
+    assert other.result(timeout=1)["filled"] == 1
+
+
+def test_executor_error_fails_every_intent_of_the_symbol():
+    def execute(symbol, action, qty):
+        raise ConnectionError("broker down")
+
+    book = OrderBook(execute, window=10)
+    futures = [book.submit("AAPL", "BUY", 1) for _ in range(3)]
+    book.flush()
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result(timeout=1)
+
+
+def test_window_timer_flushes_concurrent_submits_together():
+    sent = []
+    book = OrderBook(lambda symbol, action, qty: sent.append(qty) or "ok", window=0.1)
+    futures = []
+    threads = [threading.Thread(target=lambda: futures.append(book.submit("AAPL", "BUY", 2))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(f.result(timeout=2)["filled"] == 2 for f in futures)
+    assert sent == [10]
+
+
+def test_submit_batch_nets_and_settles_without_waiting():
+    sent = []
+    book = OrderBook(lambda symbol, action, qty: sent.append((symbol, action, qty)) or "ok", window=10)
+    futures = book.submit_batch([("AAPL", "BUY", 10), ("AAPL", "SELL", 4), ("MSFT", "BUY", 1)], source="run")
+    assert all(f.done() for f in futures)
+    assert sorted(sent) == [("AAPL", "BUY", 6), ("MSFT", "BUY", 1)]
+    assert [f.result()["source"] for f in futures] == ["run"] * 3
+
+
+def test_submit_batch_rejects_bad_intents_before_queueing_any():
+    book = OrderBook(lambda symbol, action, qty: "ok", window=10)
+    with pytest.raises(ValueError):
+        book.submit_batch([("AAPL", "BUY", 10), ("AAPL", "HOLD", 1)])
+    assert book.flush() == []
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+
+from page_cache import PageCache, normalize_url
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.COM/a/b/#frag") == "https://example.com/a/b"
+    assert normalize_url("https://example.com") == "https://example.com/"
+
+
+def test_concurrent_requests_fetch_once_and_share_blobs(tmp_path):
+    cache = PageCache(str(tmp_path))
+    release = threading.Event()
+    fetched = []
+
+    def fetch():
+        fetched.append(1)
+        release.wait(5)
+        return "<html>same body</html>"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("https://a.example/x/", fetch)))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetched) == 1
+    assert results == ["<html>same body</html>"] * 6
+    cache.get("https://b.example/other", lambda: "<html>same body</html>")
+    assert len(os.listdir(tmp_path / "blobs")) == 1
+
+
+def test_index_keeps_every_entry_under_concurrent_stores(tmp_path):
+    cache = PageCache(str(tmp_path))
+    urls = [f"https://site.example/page{i}" for i in range(64)]
+    threads = [threading.Thread(target=cache.get, args=(url, lambda url=url: f"body of {url}")) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(tmp_path / "urls.json") as f:
+        assert set(json.load(f)) == set(urls)
+    reopened = PageCache(str(tmp_path))
+    assert reopened.get(urls[5], lambda: "refetched") == f"body of {urls[5]}"
+
+
+def test_prune_removes_expired_entries_and_orphan_blobs(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=0.2)
+    cache.get("https://a.example/", lambda: "old page")
+    time.sleep(0.3)
+    cache.get("https://b.example/", lambda: "new page")
+    assert cache.prune() == 1
+    assert len(os.listdir(tmp_path / "blobs")) == 1
+    with open(tmp_path / "urls.json") as f:
+        assert list(json.load(f)) == ["https://b.example/"]
+
+
+def test_reused_blob_is_not_pruned(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=0.2)
+    cache.get("https://a.example/", lambda: "same")
+    time.sleep(0.3)
+    cache.get("https://b.example/", lambda: "same")
+    assert cache.prune() == 0
+    assert cache.get("https://b.example/", lambda: "refetched") == "same"
+
+
+def test_failed_leader_lets_followers_fetch(tmp_path):
+    cache = PageCache(str(tmp_path))
+    try:
+        cache.get("https://a.example/", lambda: (_ for _ in ()).throw(IOError("down")))
+    except IOError:
+        pass
+    assert cache.get("https://a.example/", lambda: "up") == "up"
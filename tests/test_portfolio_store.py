@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from portfolio_store import PortfolioStore  # noqa: E402
+
+PRICES = {"AAPL": 100.0, "MSFT": 100.0, "NVDA": 100.0}
+
+
+def test_duplicate_lots_are_summed_before_concentration():
+    store = PortfolioStore.from_positions(
+        [("A", "AAPL", 30), ("A", "MSFT", 40), ("A", "AAPL", 30), ("B", "NVDA", 10)], PRICES,
+    )
+    assert store.quantity.size == 3
+    i = store.account_index["A"]
+    assert store.concentration()[i] == pytest.approx(60 / 100)
+    assert "AAPL: 60" in store.account_summary("A")
+
+
+def test_offsetting_lots_net_out():
+    store = PortfolioStore.from_positions([("A", "AAPL", 50), ("A", "AAPL", -50), ("A", "MSFT", 10)], PRICES)
+    exposures = store.exposures()
+    assert exposures["gross"][0] == pytest.approx(1000.0)
+
+
+def test_csr_layout_with_unsorted_and_empty_accounts():
+    store = PortfolioStore(
+        ["A", "B", "C"], ["AAPL", "MSFT"],
+        account_idx=[2, 0, 2, 0], symbol_idx=[1, 0, 0, 0], quantity=[1, 2, 3, 4], prices=PRICES,
+    )
+    assert store.offsets.tolist() == [0, 1, 1, 3]
+    assert store.quantity.tolist() == [6, 3, 1]
+    assert store.concentration().tolist() == pytest.approx([1.0, 0.0, 0.75])
+
+
+def test_limit_breaches():
+    store = PortfolioStore.from_positions([("A", "AAPL", 90), ("A", "MSFT", 10), ("B", "AAPL", 5), ("B", "MSFT", 5)],
+                                          PRICES)
+    result = store.limit_breaches(max_position_pct=0.6, max_gross=5000)
+    assert result["breaches"]["concentration"].tolist() == [True, False]
+    assert result["breaches"]["gross"].tolist() == [True, False]
+    assert "Breaches: concentration 1, gross 1" in store.book_summary(0.6, 5000)
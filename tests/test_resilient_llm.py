@@ -0,0 +1,94 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from resilient_llm import CircuitOpenError, LatencyTracker, ResilientLLM, is_retryable  # noqa: E402
+
+_endpoints = itertools.count()
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+class ScriptedModel:
+    """ainvoke plays one step per call: an exception to raise or (seconds, reply)."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        step = self.steps.pop(0) if self.steps else (0.0, "ok")
+        if isinstance(step, Exception):
+            raise step
+        seconds, reply = step
+        await asyncio.sleep(seconds)
+        return reply
+
+
+def wrap(model, **kwargs):
+    kwargs.setdefault("base_delay", 0.0)
+    return ResilientLLM(model, endpoint=f"test://{next(_endpoints)}", **kwargs)
+
+
+def test_retryable_errors_are_retried():
+    model = ScriptedModel(StatusError(503), ConnectionError("reset"), (0.0, "answer"))
+    llm = wrap(model, hedge=False)
+    assert llm.invoke("hi") == "answer"
+    assert model.calls == 3
+    assert llm.stats["retries"] == 2
+    assert llm.breaker.state == "closed"
+
+
+def test_policy_block_is_not_retried_or_counted():
+    model = ScriptedModel(StatusError(403))
+    llm = wrap(model, hedge=False)
+    with pytest.raises(StatusError):
+        llm.invoke("hi")
+    assert model.calls == 1
+    assert llm.breaker.failures == 0
+    assert not is_retryable(StatusError(400)) and is_retryable(StatusError(429))
+
+
+def test_breaker_opens_after_repeated_failures():
+    model = ScriptedModel(*[StatusError(500)] * 5)
+    llm = wrap(model, hedge=False, max_attempts=5)
+    with pytest.raises(StatusError):
+        llm.invoke("hi")
+    assert llm.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        llm.invoke("hi")
+    assert model.calls == 5
+
+
+def test_slow_call_is_hedged_and_the_loser_is_still_timed():
+    tracker = LatencyTracker(min_samples=5, min_delay=0.01)
+    for _ in range(5):
+        tracker.add(0.05)
+    model = ScriptedModel((1.0, "slow"), (0.0, "fast"))
+    llm = wrap(model, tracker=tracker, max_hedge_ratio=1.0)
+
+    started = time.monotonic()
+    assert llm.invoke("hi") == "fast"
+    assert time.monotonic() - started < 0.5
+    assert llm.stats["hedges"] == llm.stats["hedge_wins"] == 1
+    time.sleep(0.05)  # the cancelled primary records its time on the loop
+    assert len(tracker.samples) == 7
+    assert max(tracker.samples) >= 0.05
+
+
+def test_attempt_timeout_is_recorded():
+    tracker = LatencyTracker()
+    llm = wrap(ScriptedModel((1.0, "late"), (0.0, "ok")), hedge=False, attempt_timeout=0.05, tracker=tracker)
+    assert llm.invoke("hi") == "ok"
+    assert len(tracker.samples) == 2
+    assert max(tracker.samples) >= 0.05
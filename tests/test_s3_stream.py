@@ -0,0 +1,117 @@
+import io
+import os
+
+import pytest
+
+from s3_stream import LocalS3Stub, StreamingUploader, UploadError
+
+PART = 1024
+
+
+def payload(size):
+    return bytes(i % 251 for i in range(size))
+
+
+def test_small_and_multipart_uploads_round_trip(tmp_path):
+    client = LocalS3Stub(str(tmp_path))
+    uploader = StreamingUploader(client, "bucket", part_size=PART, max_workers=3, max_buffered_parts=3)
+
+    small = uploader.upload("hello", "notes/small.txt")
+    assert small["parts"] == 1 and small["upload_id"] is None
+    assert client.get_object(Bucket="bucket", Key="notes/small.txt")["Body"].read() == b"hello"
+
+    data = payload(PART * 5 + 17)
+    big = uploader.upload(io.BytesIO(data), "dumps/big.bin")
+    assert big["parts"] == 6 and big["bytes"] == len(data)
+    assert client.get_object(Bucket="bucket", Key="dumps/big.bin")["Body"].read() == data
+
+
+@pytest.mark.parametrize("key", ["../escape.txt", "../../escape.txt", "a/../../escape.txt", "a/../../../x"])
+def test_keys_cannot_escape_the_bucket(tmp_path, key):
+    root = tmp_path / "root"
+    client = LocalS3Stub(str(root))
+    with pytest.raises(ValueError):
+        client.put_object(Bucket="bucket", Key=key, Body=b"x")
+    assert not (tmp_path / "escape.txt").exists()
+    assert not (root / "escape.txt").exists()
+
+
+def test_absolute_keys_stay_inside_the_bucket(tmp_path):
+    client = LocalS3Stub(str(tmp_path))
+    client.put_object(Bucket="bucket", Key="/etc/passwd-copy", Body=b"x")
+    assert (tmp_path / "bucket" / "etc" / "passwd-copy").read_bytes() == b"x"
+
+
+def test_bucket_and_upload_id_are_validated(tmp_path):
+    client = LocalS3Stub(str(tmp_path / "root"))
+    with pytest.raises(ValueError):
+        client.put_object(Bucket="..", Key="x", Body=b"x")
+    with pytest.raises(ValueError):
+        client.list_parts(Bucket="bucket", Key="x", UploadId="../../")
+
+
+class FailingReader:
+    def __init__(self, data, fail_after):
+        self.stream = io.BytesIO(data)
+        self.fail_after = fail_after
+
+    def read(self, size):
+        if self.stream.tell() >= self.fail_after:
+            raise IOError("source went away")
+        return self.stream.read(size)
+
+
+def test_reader_failure_aborts_the_multipart_upload(tmp_path):
+    client = LocalS3Stub(str(tmp_path))
+    uploader = StreamingUploader(client, "bucket", part_size=PART)
+    with pytest.raises(IOError):
+        uploader.upload(FailingReader(payload(PART * 6), fail_after=PART * 3), "k")
+    assert os.listdir(tmp_path / ".uploads") == []
+
+
+class FlakyStub(LocalS3Stub):
+    """Fails the given part numbers once."""
+
+    def __init__(self, root_dir, fail_parts):
+        super().__init__(root_dir)
+        self.fail_parts = set(fail_parts)
+        self.uploaded = []
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber in self.fail_parts:
+            raise ConnectionError("reset")
+        self.uploaded.append(PartNumber)
+        return super().upload_part(Bucket, Key, UploadId, PartNumber, Body)
+
+
+def test_resume_reuses_stored_parts_across_list_pages(tmp_path):
+    client = FlakyStub(str(tmp_path), fail_parts={7})
+    uploader = StreamingUploader(client, "bucket", part_size=PART, max_attempts=1)
+    data = payload(PART * 9 + 5)
+    with pytest.raises(UploadError) as error:
+        uploader.upload(data, "k")
+
+    # Two parts per page, so resuming has to follow the pagination markers
+    real_list_parts = client.list_parts
+    client.list_parts = lambda **kw: real_list_parts(**kw, MaxParts=2)
+    client.fail_parts.clear()
+    client.uploaded.clear()
+    result = uploader.upload(data, "k", upload_id=error.value.upload_id)
+
+    assert client.uploaded == [7]
+    assert result["parts"] == 10
+    assert client.get_object(Bucket="bucket", Key="k")["Body"].read() == data
+
+
+def test_resume_with_different_part_size_reuploads_mismatched_parts(tmp_path):
+    client = FlakyStub(str(tmp_path), fail_parts={3})
+    data = payload(PART * 4)
+    with pytest.raises(UploadError) as error:
+        StreamingUploader(client, "bucket", part_size=PART, max_attempts=1).upload(data, "k")
+
+    client.fail_parts.clear()
+    client.uploaded.clear()
+    StreamingUploader(client, "bucket", part_size=PART * 2).upload(data, "k", upload_id=error.value.upload_id)
+
+    assert sorted(client.uploaded) == [1, 2]
+    assert client.get_object(Bucket="bucket", Key="k")["Body"].read() == data
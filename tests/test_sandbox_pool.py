@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+pytest.importorskip("autogen.coding.base")
+
+from autogen.coding.base import CodeBlock  # noqa: E402
+
+from sandbox_pool import SandboxPool, WarmPoolCodeExecutor  # noqa: E402
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(size=1, max_runs_per_worker=3, preload=())
+    yield pool
+    pool.close()
+
+
+def pid(pool, work_dir):
+    exit_code, output = pool.run("import os\nprint(os.getpid())", work_dir=str(work_dir))
+    assert exit_code == 0
+    return int(output)
+
+
+def test_worker_is_reused_until_recycled(pool, tmp_path):
+    first = pid(pool, tmp_path)
+    assert pid(pool, tmp_path) == first
+    assert pid(pool, tmp_path) == first  # third run reaches max_runs_per_worker
+    assert pid(pool, tmp_path) != first
+
+
+def test_python_and_shell_timeouts_exit_124(pool, tmp_path):
+    exit_code, output = pool.run("while True:\n    pass", work_dir=str(tmp_path), timeout=1)
+    assert exit_code == 124 and "timed out" in output and "Traceback" not in output
+    # except Exception in generated code cannot swallow the alarm
+    code = "try:\n    while True: pass\nexcept Exception:\n    print('caught')"
+    exit_code, output = pool.run(code, work_dir=str(tmp_path), timeout=1)
+    assert exit_code == 124 and "caught" not in output
+    exit_code, output = pool.run("sleep 5", language="bash", work_dir=str(tmp_path), timeout=1)
+    assert exit_code == 124 and "timed out" in output
+
+
+@pytest.mark.parametrize("code,expected", [
+    ("import os, signal\nprint('before', flush=True)\nos.kill(os.getpid(), signal.SIGKILL)", 137),
+    ("import os\nprint('before', flush=True)\nos._exit(3)", 3),
+])
+def test_dead_worker_reports_its_status_and_is_replaced(pool, tmp_path, code, expected):
+    first = pid(pool, tmp_path)
+    exit_code, output = pool.run(code, work_dir=str(tmp_path))
+    assert exit_code == expected
+    assert output.startswith("before\n")
+    assert pid(pool, tmp_path) != first
+
+
+def test_blocks_share_the_work_dir_and_leave_nothing_behind(tmp_path):
+    executor = WarmPoolCodeExecutor(work_dir=str(tmp_path), size=1, preload=())
+    try:
+        result = executor.execute_code_blocks([
+            CodeBlock(code="open('out.txt', 'w').write('42')", language="python"),
+            CodeBlock(code="cat out.txt", language="bash"),
+        ])
+        assert (result.exit_code, result.output) == (0, "42")
+        result = executor.execute_code_blocks([CodeBlock(code="print(open('out.txt').read())", language="python")])
+        assert result.output == "42\n"
+        assert os.listdir(tmp_path) == ["out.txt"]
+    finally:
+        executor.pool.close()
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+
+import pytest
+
+from search_cache import SearchCache, normalize_query
+
+
+def test_normalize_query_ignores_case_and_punctuation():
+    assert normalize_query("  What IS   BM25?! ") == "what is bm25"
+    assert normalize_query("ranking, then BM25.") == "ranking then bm25"
+
+
+def test_normalize_query_keeps_meaningful_symbols():
+    keys = {normalize_query(q) for q in ("C++ templates", "C# templates", "C templates")}
+    assert len(keys) == 3
+    assert normalize_query("Node.js streams?") == "node.js streams"
+
+
+@pytest.mark.parametrize("entry", [{"result": "stale"}, ["stale"], {"stored_at": "yesterday", "result": "stale"}])
+def test_malformed_entry_is_a_miss(tmp_path, entry):
+    calls = []
+    cache = SearchCache(lambda q: calls.append(q) or "fresh", cache_dir=str(tmp_path))
+    with open(cache._path(normalize_query("query")), "w") as f:
+        json.dump(entry, f)
+    assert cache.run("query") == "fresh"
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.run("query") == "fresh"
+    assert len(calls) == 1
+
+
+def test_concurrent_identical_queries_search_upstream_once(tmp_path):
+    calls = []
+    release = threading.Event()
+
+    def search(query):
+        calls.append(query)
+        release.wait(5)
+        return f"results for {query}"
+
+    cache = SearchCache(search, cache_dir=str(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.run("BM25 ranking"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["results for BM25 ranking"] * 8
+    assert (cache.hits, cache.misses) == (7, 1)
+    assert cache.run("bm25 ranking!") == "results for BM25 ranking"
+    assert len(calls) == 1
+
+
+def test_leader_rechecks_disk_before_searching(tmp_path):
+    calls = []
+    cache = SearchCache(lambda q: calls.append(q) or "fresh", cache_dir=str(tmp_path))
+    other = SearchCache(lambda q: "stored by another process", cache_dir=str(tmp_path))
+
+    # Another process stores the entry after this caller's first disk lookup
+    real_load = cache._load
+    looks = []
+
+    def load(key):
+        looks.append(key)
+        if len(looks) == 1:
+            result = real_load(key)
+            other.run("query")
+            return result
+        return real_load(key)
+
+    cache._load = load
+    assert cache.run("query") == "stored by another process"
+    assert calls == []
+
+
+def test_store_failure_still_returns_result_to_everyone(tmp_path):
+    release = threading.Event()
+
+    def search(query):
+        release.wait(5)
+        return "ok"
+
+    cache = SearchCache(search, cache_dir=str(tmp_path))
+
+    def broken_store(key, result):
+        raise OSError("disk full")
+
+    cache._store = broken_store
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(cache.run("query"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == ["ok"] * 4
+
+
+def test_upstream_error_reaches_followers_and_is_not_cached(tmp_path):
+    attempts = []
+
+    def search(query):
+        attempts.append(query)
+        raise RuntimeError("upstream down")
+
+    cache = SearchCache(search, cache_dir=str(tmp_path))
+    for _ in range(2):
+        try:
+            cache.run("query")
+        except RuntimeError:
+            pass
+    assert len(attempts) == 2
+
+
+def test_expired_entries_are_searched_again_and_cleared(tmp_path):
+    calls = []
+    cache = SearchCache(lambda q: calls.append(q) or "r", cache_dir=str(tmp_path), ttl=0.05)
+    cache.run("query")
+    time.sleep(0.1)
+    assert cache.clear_expired() == 1
+    cache.run("query")
+    assert len(calls) == 2
+
+
+def test_clear_expired_removes_malformed_entries(tmp_path):
+    cache = SearchCache(lambda q: "r", cache_dir=str(tmp_path))
+    cache.run("query")
+    with open(tmp_path / "broken.json", "w") as f:
+        json.dump({"stored_at": None}, f)
+    assert cache.clear_expired() == 1
+    assert len(list(tmp_path.iterdir())) == 1
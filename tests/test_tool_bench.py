@@ -0,0 +1,39 @@
+import json
+
+import tool_bench
+
+
+def measured(median_us, peak_bytes=100):
+    return {"status": "ok", "median_us": median_us, "p95_us": median_us, "stdev_us": 0.0,
+            "peak_bytes": peak_bytes, "retained_bytes_per_call": 0}
+
+
+def test_compare_flags_time_and_allocation_growth():
+    baseline = {"results": {"a": measured(10.0), "b": measured(10.0, 100)}}
+    results = {"a": measured(20.0), "b": measured(10.0, 200)}
+    regressions = tool_bench.compare(results, baseline, threshold=0.25, alloc_threshold=0.10)
+    assert {(name, metric) for name, metric, *_ in regressions} == {("a", "median_us"), ("b", "peak_bytes")}
+
+
+def test_skipped_case_with_a_baseline_is_unmeasured():
+    baseline = {"results": {"a": measured(10.0), "b": measured(10.0)}}
+    results = {"a": measured(10.0), "b": {"status": "skipped", "detail": "ImportError: no crewai"},
+               "c": {"status": "skipped", "detail": "ImportError: new case"}}
+    assert tool_bench.compare(results, baseline, 0.25, 0.10) == []
+    assert tool_bench.unmeasured(results, baseline) == ["b"]
+
+
+def test_save_merges_only_within_one_environment(tmp_path, monkeypatch):
+    path = str(tmp_path / "tools.json")
+    monkeypatch.setattr(tool_bench, "environment", lambda: {"machine": "x86_64"})
+    assert tool_bench.save_baseline(path, {"a": measured(1.0), "b": measured(2.0)})
+    assert tool_bench.save_baseline(path, {"a": measured(3.0)})
+    with open(path) as f:
+        assert set(json.load(f)["results"]) == {"a", "b"}
+
+    monkeypatch.setattr(tool_bench, "environment", lambda: {"machine": "arm64"})
+    assert not tool_bench.save_baseline(path, {"a": measured(4.0)})
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved["environment"] == {"machine": "arm64"}
+    assert saved["results"] == {"a": measured(4.0)}
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import customer_support_agent as agent  # noqa: E402
+
+
+class FakeTool:
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+    def invoke(self, args):
+        return self.func(**args)
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """Install fake tools with fresh per-tool pools; returns the release event for hung calls."""
+    release = threading.Event()
+    fake = [
+        FakeTool("hang", lambda: release.wait(10) and "released"),
+        FakeTool("sleep", lambda seconds: time.sleep(seconds) or f"slept {seconds}"),
+        FakeTool("fail", lambda: 1 / 0),
+    ]
+    monkeypatch.setattr(agent, "TOOLS", fake)
+    monkeypatch.setattr(agent, "TOOL_TIMEOUTS", {"hang": 0.2, "sleep": 0.5})
+    monkeypatch.setattr(agent, "_tool_pools", {})
+    yield release
+    release.set()
+    for pool in agent._tool_pools.values():
+        pool.shutdown(wait=True)
+
+
+def call(name, i, **args):
+    return {"name": name, "args": args, "id": f"call-{i}"}
+
+
+def test_results_come_back_in_call_order(tools):
+    messages = agent.run_tool_calls([
+        call("sleep", 0, seconds=0.05), call("fail", 1), call("nope", 2), call("sleep", 3, seconds=0.0),
+    ])
+    assert [m.tool_call_id for m in messages] == ["call-0", "call-1", "call-2", "call-3"]
+    assert [m.status for m in messages] == ["success", "error", "error", "success"]
+    assert "unknown tool" in messages[2].content
+
+
+def test_hung_tool_does_not_starve_other_tools(tools, monkeypatch):
+    monkeypatch.setattr(agent, "TOOL_WORKERS", 2)
+    for turn in range(3):
+        hung = agent.run_tool_calls([call("hang", i) for i in range(3)])
+        assert all(m.status == "error" for m in hung)
+
+    started = time.monotonic()
+    (message,) = agent.run_tool_calls([call("sleep", 0, seconds=0.0)])
+    assert message.status == "success"
+    assert time.monotonic() - started < 0.2
+
+
+def test_timeout_starts_when_the_call_starts(tools, monkeypatch):
+    monkeypatch.setattr(agent, "TOOL_WORKERS", 1)
+    # Run back to back on one worker: 0.6s in total, but each well inside 0.5s
+    messages = agent.run_tool_calls([call("sleep", 0, seconds=0.3), call("sleep", 1, seconds=0.3)])
+    assert [m.status for m in messages] == ["success", "success"]
+
+
+def test_call_that_never_gets_a_worker_is_cancelled(tools, monkeypatch):
+    monkeypatch.setattr(agent, "TOOL_WORKERS", 1)
+    messages = agent.run_tool_calls([call("hang", 0), call("hang", 1)])
+    assert "timed out" in messages[0].content
+    assert "did not start" in messages[1].content